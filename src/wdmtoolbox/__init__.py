@@ -1,10 +1,13 @@
 """Package __init__.py."""
 
 __all__ = [
+    "WDMReader",
+    "batch",
     "cleancopywdm",
     "copydsn",
     "copydsnlabel",
     "createnewdsn",
+    "createnewdsns",
     "createnewwdm",
     "csvtowdm",
     "deletedsn",
@@ -12,16 +15,22 @@ __all__ = [
     "extract",
     "hydhrseqtowdm",
     "listdsns",
+    "parquettowdm",
+    "read_array",
     "renumberdsn",
     "setattrib",
     "stdtowdm",
+    "wdmtoparquet",
     "wdmtoswmm5rdii",
 ]
+from .wdmreader import WDMReader
 from .wdmtoolbox import (
+    batch,
     cleancopywdm,
     copydsn,
     copydsnlabel,
     createnewdsn,
+    createnewdsns,
     createnewwdm,
     csvtowdm,
     deletedsn,
@@ -29,8 +38,11 @@ from .wdmtoolbox import (
     extract,
     hydhrseqtowdm,
     listdsns,
+    parquettowdm,
+    read_array,
     renumberdsn,
     setattrib,
     stdtowdm,
+    wdmtoparquet,
     wdmtoswmm5rdii,
 )
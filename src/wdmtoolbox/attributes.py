@@ -0,0 +1,458 @@
+"""Attribute catalog of the WDM message file.
+
+Maps the attribute index used by the WDM library to the attribute name, type
+and length as stored in the "message.wdm" file that ships with wdmtoolbox.
+The table was generated from the message file with the WDM library function
+"wdsagy", so attributes can be looked up without opening the message file.
+
+The type is 1 for integer, 2 for real, and 3 for character attributes.  The
+length is the number of values, or for character attributes the number of
+characters.
+"""
+
+ATTRIBUTES = {
+    1: ("TSTYPE", 3, 4),
+    2: ("STAID", 3, 16),
+    3: ("STCODE", 3, 4),
+    4: ("HUCODE", 1, 1),
+    5: ("SUBHUC", 1, 1),
+    6: ("COCODE", 1, 1),
+    7: ("ELEV", 2, 1),
+    8: ("LATDEG", 2, 1),
+    9: ("LNGDEG", 2, 1),
+    10: ("DESCRP", 3, 80),
+    11: ("DAREA", 2, 1),
+    12: ("MINVAL", 2, 1),
+    13: ("MAXVAL", 2, 1),
+    14: ("MEANVL", 2, 1),
+    15: ("STDDEV", 2, 1),
+    16: ("SKEWCF", 2, 1),
+    17: ("TCODE", 1, 1),
+    18: ("LCODE", 1, 1),
+    19: ("ACODE", 1, 1),
+    20: ("VCODE", 1, 1),
+    21: ("VLCODE", 1, 1),
+    22: ("DCODE", 1, 1),
+    23: ("GCODE", 1, 1),
+    24: ("SLOPE", 2, 1),
+    25: ("RMILE", 2, 1),
+    26: ("LENGTH", 2, 1),
+    27: ("TSBYR", 1, 1),
+    28: ("TSBMO", 1, 1),
+    29: ("TSBDY", 1, 1),
+    30: ("TSBHR", 1, 1),
+    31: ("TSPREC", 1, 1),
+    32: ("TSFILL", 2, 1),
+    33: ("TSSTEP", 1, 1),
+    34: ("TGROUP", 1, 1),
+    35: ("RWFLAG", 1, 1),
+    36: ("TOLR", 2, 1),
+    37: ("HELP", 3, 8),
+    38: ("DONE", 3, 8),
+    39: ("ALL", 3, 8),
+    40: ("AGENCY", 3, 8),
+    41: ("STFIPS", 1, 1),
+    42: ("DSCODE", 1, 1),
+    43: ("CONTDA", 2, 1),
+    44: ("SITECO", 3, 4),
+    45: ("STANAM", 3, 48),
+    46: ("GUCODE", 3, 12),
+    47: ("WELLDP", 2, 1),
+    48: ("AQTYPE", 3, 4),
+    49: ("BASEQ", 2, 1),
+    50: ("DATE", 1, 6),
+    51: ("ISTAID", 1, 1),
+    52: ("START", 1, 6),
+    53: ("END", 1, 6),
+    54: ("LATDMS", 1, 1),
+    55: ("LNGDMS", 1, 1),
+    56: ("PARMCD", 1, 1),
+    57: ("STATCD", 1, 1),
+    58: ("PRECIP", 2, 1),
+    59: ("STORAG", 2, 1),
+    60: ("TSPTAD", 1, 1),
+    61: ("FOREST", 2, 1),
+    62: ("SOILIN", 2, 1),
+    63: ("I24-2.", 2, 1),
+    64: ("JANMIN", 2, 1),
+    65: ("P1.25", 2, 1),
+    66: ("P2.", 2, 1),
+    67: ("P5.", 2, 1),
+    68: ("P10.", 2, 1),
+    69: ("P25.", 2, 1),
+    70: ("P50.", 2, 1),
+    71: ("P100.", 2, 1),
+    72: ("P200.", 2, 1),
+    73: ("P500.", 2, 1),
+    74: ("MEANPK", 2, 1),
+    75: ("SDPK", 2, 1),
+    76: ("SKWPK", 2, 1),
+    77: ("WRCSKW", 2, 1),
+    78: ("WRCMN", 2, 1),
+    79: ("WRCSD", 2, 1),
+    80: ("YRSPK", 2, 1),
+    81: ("YRSHPK", 2, 1),
+    82: ("CHEAT", 1, 1),
+    83: ("COMPFG", 1, 1),
+    84: ("TSFORM", 1, 1),
+    85: ("VBTIME", 1, 1),
+    86: ("BSLOPE", 2, 1),
+    87: ("BLNGTH", 2, 1),
+    88: ("VALLGH", 2, 1),
+    89: ("EL1085", 2, 1),
+    90: ("EL5000", 2, 1),
+    91: ("EL6000", 2, 1),
+    92: ("LAKE", 2, 1),
+    93: ("GLACER", 2, 1),
+    94: ("LOESS", 2, 1),
+    95: ("AZMUTH", 2, 1),
+    96: ("LATCTR", 2, 1),
+    97: ("LNGCTR", 2, 1),
+    98: ("TMTOPK", 2, 1),
+    99: ("I24010", 2, 1),
+    100: ("I24025", 2, 1),
+    101: ("I24050", 2, 1),
+    102: ("I24100", 2, 1),
+    103: ("PRCOCT", 2, 1),
+    104: ("PRCNOV", 2, 1),
+    105: ("PRCDEC", 2, 1),
+    106: ("PRCJAN", 2, 1),
+    107: ("PRCFEB", 2, 1),
+    108: ("PRCMAR", 2, 1),
+    109: ("PRCAPR", 2, 1),
+    110: ("PRCMAY", 2, 1),
+    111: ("PRCJUN", 2, 1),
+    112: ("PRCJUL", 2, 1),
+    113: ("PRCAUG", 2, 1),
+    114: ("PRCSEP", 2, 1),
+    115: ("SNOFAL", 2, 1),
+    116: ("SNOMAR", 2, 1),
+    117: ("SNOAPR", 2, 1),
+    118: ("SN002", 2, 1),
+    119: ("SN010", 2, 1),
+    120: ("SN025", 2, 1),
+    121: ("SN100", 2, 1),
+    122: ("JANAVE", 2, 1),
+    123: ("MARMAX", 2, 1),
+    124: ("JULMAX", 2, 1),
+    125: ("JULAVE", 2, 1),
+    126: ("WEMAR2", 2, 1),
+    127: ("LKEVAP", 2, 1),
+    128: ("PNEVAP", 2, 1),
+    129: ("FROST", 2, 1),
+    130: ("QANN", 2, 1),
+    131: ("QSDANN", 2, 1),
+    132: ("QOCT", 2, 1),
+    133: ("QNOV", 2, 1),
+    134: ("QDEC", 2, 1),
+    135: ("QJAN", 2, 1),
+    136: ("QFEB", 2, 1),
+    137: ("QMAR", 2, 1),
+    138: ("QAPR", 2, 1),
+    139: ("QMAY", 2, 1),
+    140: ("QJUN", 2, 1),
+    141: ("QJUL", 2, 1),
+    142: ("QAUG", 2, 1),
+    143: ("QSEP", 2, 1),
+    144: ("QSDOCT", 2, 1),
+    145: ("QSDNOV", 2, 1),
+    146: ("QSDDEC", 2, 1),
+    147: ("QSDJAN", 2, 1),
+    148: ("QSDFEB", 2, 1),
+    149: ("QSDMAR", 2, 1),
+    150: ("QSDAPR", 2, 1),
+    151: ("QSDMAY", 2, 1),
+    152: ("QSDJUN", 2, 1),
+    153: ("QSDJUL", 2, 1),
+    154: ("QSDAUG", 2, 1),
+    155: ("QSDSEP", 2, 1),
+    156: ("L01002", 2, 1),
+    157: ("L01010", 2, 1),
+    158: ("L01020", 2, 1),
+    159: ("L03002", 2, 1),
+    160: ("L03010", 2, 1),
+    161: ("L03020", 2, 1),
+    162: ("L07002", 2, 1),
+    163: ("L07005", 2, 1),
+    164: ("L07010", 2, 1),
+    165: ("L07020", 2, 1),
+    166: ("L14002", 2, 1),
+    167: ("L14010", 2, 1),
+    168: ("L14020", 2, 1),
+    169: ("L30002", 2, 1),
+    170: ("L30010", 2, 1),
+    171: ("L30020", 2, 1),
+    172: ("L90002", 2, 1),
+    173: ("L90010", 2, 1),
+    174: ("L90020", 2, 1),
+    175: ("H01002", 2, 1),
+    176: ("H01005", 2, 1),
+    177: ("H01010", 2, 1),
+    178: ("H01020", 2, 1),
+    179: ("H01025", 2, 1),
+    180: ("H01050", 2, 1),
+    181: ("H01100", 2, 1),
+    182: ("H03002", 2, 1),
+    183: ("H03005", 2, 1),
+    184: ("H03010", 2, 1),
+    185: ("H03020", 2, 1),
+    186: ("H03025", 2, 1),
+    187: ("H03050", 2, 1),
+    188: ("H03100", 2, 1),
+    189: ("H07002", 2, 1),
+    190: ("H07005", 2, 1),
+    191: ("H07010", 2, 1),
+    192: ("H07020", 2, 1),
+    193: ("H07025", 2, 1),
+    194: ("H07050", 2, 1),
+    195: ("H07100", 2, 1),
+    196: ("H15002", 2, 1),
+    197: ("H15005", 2, 1),
+    198: ("H15010", 2, 1),
+    199: ("H15020", 2, 1),
+    200: ("H15025", 2, 1),
+    201: ("H15050", 2, 1),
+    202: ("H15100", 2, 1),
+    203: ("H30002", 2, 1),
+    204: ("H30005", 2, 1),
+    205: ("H30010", 2, 1),
+    206: ("H30020", 2, 1),
+    207: ("H30025", 2, 1),
+    208: ("H30050", 2, 1),
+    209: ("H30100", 2, 1),
+    210: ("DEPH25", 2, 1),
+    211: ("QEX95P", 2, 1),
+    212: ("QEX90P", 2, 1),
+    213: ("QEX75P", 2, 1),
+    214: ("QEX70P", 2, 1),
+    215: ("QEX50P", 2, 1),
+    216: ("QEX25P", 2, 1),
+    217: ("QEX10P", 2, 1),
+    218: ("YRSDAY", 2, 1),
+    219: ("YRSLOW", 2, 1),
+    220: ("UBC024", 2, 1),
+    221: ("UBC025", 2, 1),
+    222: ("UBC026", 2, 1),
+    223: ("UBC027", 2, 1),
+    224: ("UBC028", 2, 1),
+    225: ("UBC029", 2, 1),
+    226: ("UBC030", 2, 1),
+    227: ("UBC031", 2, 1),
+    228: ("UBC038", 2, 1),
+    229: ("UBC039", 2, 1),
+    230: ("UBC040", 2, 1),
+    231: ("UBC066", 2, 1),
+    232: ("UBC067", 2, 1),
+    233: ("UBC068", 2, 1),
+    234: ("UBC069", 2, 1),
+    235: ("UBC073", 2, 1),
+    236: ("UBC074", 2, 1),
+    237: ("UBC166", 2, 1),
+    238: ("UBC167", 2, 1),
+    239: ("UBC169", 2, 1),
+    240: ("UBC170", 2, 1),
+    241: ("UBC182", 2, 1),
+    242: ("UBC183", 2, 1),
+    243: ("UBC184", 2, 1),
+    244: ("UBC185", 2, 1),
+    245: ("UBC186", 2, 1),
+    246: ("UBC187", 2, 1),
+    247: ("UBC188", 2, 1),
+    248: ("UBC189", 2, 1),
+    249: ("UBC190", 2, 1),
+    250: ("UBC191", 2, 1),
+    251: ("UBC192", 2, 1),
+    252: ("UBC193", 2, 1),
+    253: ("UBC194", 2, 1),
+    254: ("UBC195", 2, 1),
+    255: ("UBC200", 2, 1),
+    256: ("SEASBG", 1, 1),
+    257: ("SEASND", 1, 1),
+    258: ("XSECLC", 2, 1),
+    259: ("DEPTH", 2, 1),
+    260: ("RFOOT", 2, 1),
+    261: ("BRANCH", 1, 1),
+    262: ("TMZONE", 1, 1),
+    263: ("GRPNAM", 3, 8),
+    264: ("DATUM", 2, 1),
+    265: ("STDTYP", 3, 4),
+    266: ("STDIMX", 1, 1),
+    267: ("STDIMY", 1, 1),
+    268: ("STDIMZ", 1, 1),
+    269: ("J407LO", 2, 1),
+    270: ("J407HO", 2, 1),
+    271: ("J407SO", 1, 1),
+    272: ("J407GS", 2, 1),
+    273: ("J407BQ", 2, 1),
+    274: ("J407NH", 1, 1),
+    275: ("J407SE", 2, 1),
+    276: ("J407UR", 1, 1),
+    277: ("J407HP", 1, 1),
+    278: ("J407BY", 1, 1),
+    279: ("J407EY", 1, 1),
+    280: ("MEANND", 2, 1),
+    281: ("SDND", 2, 1),
+    282: ("SKWND", 2, 1),
+    283: ("KENTAU", 2, 1),
+    284: ("KENPLV", 2, 1),
+    285: ("KENSLP", 2, 1),
+    286: ("NONZRO", 1, 1),
+    287: ("NUMZRO", 1, 1),
+    288: ("IDSCEN", 3, 8),
+    289: ("IDCONS", 3, 8),
+    290: ("IDLOCN", 3, 8),
+    291: ("L07050", 2, 1),
+    292: ("L07100", 2, 1),
+    300: ("PCLT01", 2, 1),
+    301: ("PCLT02", 2, 1),
+    302: ("PCLT05", 2, 1),
+    303: ("PCLT10", 2, 1),
+    304: ("PCLT20", 2, 1),
+    305: ("PCLT25", 2, 1),
+    306: ("PCLT50", 2, 1),
+    307: ("PCLT75", 2, 1),
+    308: ("PCLT80", 2, 1),
+    309: ("PCLT90", 2, 1),
+    310: ("PCLT95", 2, 1),
+    311: ("PCLT98", 2, 1),
+    312: ("PCLT99", 2, 1),
+    313: ("LQU010", 2, 1),
+    314: ("LQU020", 2, 1),
+    315: ("LQU050", 2, 1),
+    316: ("LQU100", 2, 1),
+    317: ("LQU200", 2, 1),
+    318: ("LQU500", 2, 1),
+    319: ("LQU800", 2, 1),
+    320: ("LQU900", 2, 1),
+    321: ("LQU950", 2, 1),
+    322: ("LQU980", 2, 1),
+    323: ("LQU990", 2, 1),
+    324: ("LQU995", 2, 1),
+    325: ("LQU998", 2, 1),
+    326: ("LDIST", 3, 4),
+    327: ("LMOM1", 2, 1),
+    328: ("LMOM2", 2, 1),
+    329: ("LMOM3", 2, 1),
+    330: ("LMOM4", 2, 1),
+    331: ("LMOM5", 2, 1),
+    332: ("PQU010", 2, 1),
+    333: ("PQU020", 2, 1),
+    334: ("PQU050", 2, 1),
+    335: ("PQU100", 2, 1),
+    336: ("PQU200", 2, 1),
+    337: ("PQU500", 2, 1),
+    338: ("PQU800", 2, 1),
+    339: ("PQU900", 2, 1),
+    340: ("PQU950", 2, 1),
+    341: ("PQU980", 2, 1),
+    342: ("PQU990", 2, 1),
+    343: ("PQU995", 2, 1),
+    344: ("PQU998", 2, 1),
+    345: ("GQU010", 2, 1),
+    346: ("GQU020", 2, 1),
+    347: ("GQU050", 2, 1),
+    348: ("GQU100", 2, 1),
+    349: ("GQU200", 2, 1),
+    350: ("GQU500", 2, 1),
+    351: ("GQU800", 2, 1),
+    352: ("GQU900", 2, 1),
+    353: ("GQU950", 2, 1),
+    354: ("GQU980", 2, 1),
+    355: ("GQU990", 2, 1),
+    356: ("GQU995", 2, 1),
+    357: ("GQU998", 2, 1),
+    358: ("LMO002", 2, 1),
+    359: ("LMO005", 2, 1),
+    360: ("LMO010", 2, 1),
+    361: ("LMO020", 2, 1),
+    362: ("LMO050", 2, 1),
+    363: ("LMO100", 2, 1),
+    364: ("LMO200", 2, 1),
+    365: ("LMO500", 2, 1),
+    366: ("GMO002", 2, 1),
+    367: ("GMO005", 2, 1),
+    368: ("GMO010", 2, 1),
+    369: ("GMO020", 2, 1),
+    370: ("GMO050", 2, 1),
+    371: ("GMO100", 2, 1),
+    372: ("GMO200", 2, 1),
+    373: ("GMO500", 2, 1),
+    374: ("PMO002", 2, 1),
+    375: ("PMO005", 2, 1),
+    376: ("PMO010", 2, 1),
+    377: ("PMO020", 2, 1),
+    378: ("PMO050", 2, 1),
+    379: ("PMO100", 2, 1),
+    380: ("PMO200", 2, 1),
+    381: ("PMO500", 2, 1),
+    382: ("LML002", 2, 1),
+    383: ("LML005", 2, 1),
+    384: ("LML010", 2, 1),
+    385: ("LML020", 2, 1),
+    386: ("LML050", 2, 1),
+    387: ("LML100", 2, 1),
+    388: ("LML200", 2, 1),
+    389: ("LML500", 2, 1),
+    390: ("GML002", 2, 1),
+    391: ("GML005", 2, 1),
+    392: ("GML010", 2, 1),
+    393: ("GML020", 2, 1),
+    394: ("GML050", 2, 1),
+    395: ("GML100", 2, 1),
+    396: ("GML200", 2, 1),
+    397: ("GML500", 2, 1),
+    398: ("CML002", 2, 1),
+    399: ("CML005", 2, 1),
+    400: ("CML010", 2, 1),
+    401: ("CML020", 2, 1),
+    402: ("CML050", 2, 1),
+    403: ("CML100", 2, 1),
+    404: ("CML200", 2, 1),
+    405: ("CML500", 2, 1),
+    406: ("PML002", 2, 1),
+    407: ("PML005", 2, 1),
+    408: ("PML010", 2, 1),
+    409: ("PML020", 2, 1),
+    410: ("PML050", 2, 1),
+    411: ("PML100", 2, 1),
+    412: ("PML200", 2, 1),
+    413: ("PML500", 2, 1),
+    414: ("NQU010", 2, 1),
+    415: ("NQU020", 2, 1),
+    416: ("NQU050", 2, 1),
+    417: ("NQU100", 2, 1),
+    418: ("NQU200", 2, 1),
+    419: ("NQU500", 2, 1),
+    420: ("NQU800", 2, 1),
+    421: ("NQU900", 2, 1),
+    422: ("NQU950", 2, 1),
+    423: ("NQU980", 2, 1),
+    424: ("NQU990", 2, 1),
+    425: ("NQU995", 2, 1),
+    426: ("NQU998", 2, 1),
+    427: ("QEX99P", 2, 1),
+    428: ("QEX98P", 2, 1),
+    429: ("QEX85P", 2, 1),
+    430: ("QEX80P", 2, 1),
+    431: ("QEX65P", 2, 1),
+    432: ("QEX60P", 2, 1),
+    433: ("QEX55P", 2, 1),
+    434: ("QEX45P", 2, 1),
+    435: ("QEX40P", 2, 1),
+    436: ("QEX35P", 2, 1),
+    437: ("QEX30P", 2, 1),
+    438: ("QEX20P", 2, 1),
+    439: ("QEX15P", 2, 1),
+    440: ("QEXO5P", 2, 1),
+    441: ("QEX02P", 2, 1),
+    442: ("QEX01P", 2, 1),
+    443: ("DATCRE", 3, 16),
+    444: ("DATMOD", 3, 16),
+    445: ("L04003", 2, 1),
+    446: ("SEADBG", 1, 1),
+    447: ("SEADND", 1, 1),
+    448: ("P1.5", 2, 1),
+    449: ("P02.33", 2, 1),
+}
+
+INDEX_BY_NAME = {name: index for index, (name, _, _) in ATTRIBUTES.items()}
@@ -0,0 +1,487 @@
+"""Read WDM files with NumPy.
+
+The WDMReader class memory maps a WDM file and decodes the directory, the
+DSN labels, the attributes and the time-series groups directly, without the
+FORTRAN WDM library.  There is no shared record buffer or unit number to
+manage, so any number of readers can be used at the same time, including
+from different threads.  The WDM file is never written.
+"""
+
+import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .attributes import ATTRIBUTES
+from .toolbox_utils.src.toolbox_utils import tsutils
+from .wdmutil import (
+    _DSNS_PER_DIRECTORY,
+    _MAPECODE,
+    _MAPTCODE,
+    _NOTPRESENT,
+    _PDIRPT,
+    _RECORD_WORDS,
+    _TCODE_MONTHS,
+    _TCODE_SECONDS,
+    WDMError,
+    _attribute_index,
+    _check_window,
+    _directory_dsns,
+    _dsn_frame,
+    _llsdat,
+    _timadd,
+    _window,
+)
+
+# Words (zero based) of a DSN label record.
+_DSTYPE = 5
+_PSA = 9
+_PDAT = 10
+_PDATV = 11
+
+_DEFAULT_ATTRIBUTES = [33, 17, 32, 290, 288, 289, 27, 45, 1]
+
+
+def _split_bcw(bcw):
+    """Split block control words into NOV, TSTEP, TCODE, COMPCD and QUALCD.
+
+    Works on a single block control word or on an array of them.
+    """
+    bcw = np.asarray(bcw).astype(np.int64) & 0xFFFFFFFF
+    return bcw >> 16, (bcw >> 10) & 63, (bcw >> 7) & 7, (bcw >> 5) & 3, bcw & 31
+
+
+def _offsets(sdat, dates, tcode, tstep):
+    """Number of tstep TCODE intervals from sdat to each of the dates.
+
+    The array version of `_timdif`.
+    """
+    if tcode in _TCODE_SECONDS:
+        return (dates - sdat) // np.timedelta64(int(tstep) * _TCODE_SECONDS[tcode], "s")
+    months = (dates.astype("datetime64[M]") - sdat.astype("datetime64[M]")).astype(
+        np.int64
+    )
+    nval = months // (int(tstep) * _TCODE_MONTHS[tcode])
+    month = sdat.astype("datetime64[M]")
+    offset = sdat - month.astype("datetime64[s]")
+    later = (month + nval * int(tstep) * _TCODE_MONTHS[tcode]).astype(
+        "datetime64[s]"
+    ) + offset > dates
+    return nval - later
+
+
+class WDMReader:
+    """Read-only access to a WDM file without the WDM library.
+
+    Parameters
+    ----------
+    wdmpath : str
+        Path to an existing WDM file.
+
+    The returned DataFrames and dictionaries are the same as those from
+    `WDM.read_dsn` and `WDM.describe_dsn`::
+
+        with WDMReader("data.wdm") as wdm:
+            df = wdm.read_dsn(101, start_date="2000-01-01")
+    """
+
+    def __init__(self, wdmpath):
+        """Memory map the WDM file."""
+        self.wdmpath = str(wdmpath).strip()
+        if not Path(self.wdmpath).exists():
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    File {self.wdmpath} does not exist.
+                    """
+                )
+            )
+        size = Path(self.wdmpath).stat().st_size
+        if size == 0 or size % (4 * _RECORD_WORDS):
+            self._int = np.zeros(1, dtype=np.int32)
+        else:
+            self._int = np.memmap(self.wdmpath, dtype=np.int32, mode="r")
+        if self._int[0] != -998:
+            raise WDMError(
+                tsutils.error_wrapper(
+                    f"""
+                    {self.wdmpath} is not a WDM file.
+                    """
+                )
+            )
+        self._real = self._int.view(np.float32)
+
+    def __enter__(self):
+        """Return the reader for use in a with statement."""
+        return self
+
+    def __exit__(self, *args):
+        """Release the memory map."""
+        self.close()
+
+    def close(self):
+        """Release the memory map."""
+        self._int = None
+        self._real = None
+
+    def _record(self, rec):
+        """Return the int32 words of the one based record number rec."""
+        return self._int[(rec - 1) * _RECORD_WORDS : rec * _RECORD_WORDS]
+
+    def enumerate_dsns(self):
+        """Return (DSN, label record number) for every DSN in the WDM file.
+
+        The same as `WDM.enumerate_dsns`.
+        """
+        return _directory_dsns(self._record(1), self._record)
+
+    def _label(self, dsn):
+        """Return the label record of a time-series DSN."""
+        if dsn < 1 or dsn > 32000:
+            raise WDMError(
+                tsutils.error_wrapper(
+                    f"""
+                    WDM file error code -84. file={self.wdmpath} DSN={dsn}
+                    WDM error: data set number out of valid range.
+                    """
+                )
+            )
+        dirrec = self._int[_PDIRPT - 1 + (dsn - 1) // _DSNS_PER_DIRECTORY]
+        labrec = 0
+        if dirrec > 0:
+            labrec = self._record(dirrec)[4 + (dsn - 1) % _DSNS_PER_DIRECTORY]
+        if labrec <= 0:
+            raise WDMError(
+                tsutils.error_wrapper(
+                    f"""
+                    WDM file error code -81. file={self.wdmpath} DSN={dsn}
+                    WDM error: data set does not exist.
+                    """
+                )
+            )
+        label = self._record(labrec)
+        if label[_DSTYPE] != 1:
+            raise WDMError(
+                tsutils.error_wrapper(
+                    f"""
+                    WDM file error code -82. file={self.wdmpath} DSN={dsn}
+                    WDM error: data set exists, but is wrong DSTYP.
+                    """
+                )
+            )
+        return labrec, label
+
+    @staticmethod
+    def _attribute_positions(label):
+        """Return {attribute index: zero based word in label} of the label."""
+        psa = label[_PSA]
+        samax = label[psa - 1]
+        pairs = np.asarray(label[psa + 1 : psa + 1 + 2 * samax]).reshape(-1, 2)
+        return {int(index): int(pos) - 1 for index, pos in pairs}
+
+    def _attribute(self, labrec, pos, index):
+        """Return the value of attribute index stored at word pos of labrec."""
+        _, attrib_type, attrib_len = ATTRIBUTES[index]
+        word = (labrec - 1) * _RECORD_WORDS + pos
+        if attrib_type == 1:
+            return self._int[word]
+        if attrib_type == 2:
+            return self._real[word]
+        return (
+            self._int[word : word + attrib_len // 4]
+            .tobytes()
+            .decode("ascii", errors="replace")
+            .strip()
+        )
+
+    def _groups(self, label, positions, labrec):
+        """Return the base date, TGROUP and group pointers of a label."""
+
+        def _ival(index, default):
+            if index in positions:
+                return int(self._int[(labrec - 1) * _RECORD_WORDS + positions[index]])
+            return default
+
+        base = np.datetime64(
+            f"{_ival(27, 1900):04d}-{_ival(28, 1):02d}-{_ival(29, 1):02d}", "s"
+        ) + np.timedelta64(_ival(30, 0), "h")
+        pdat = label[_PDAT]
+        pdatv = label[_PDATV]
+        return base, _ival(34, 6), label[pdat + 1 : pdatv - 1]
+
+    def _blocks(self, ptr, gstart, gend):
+        """Return the blocks of the group that starts at ptr as arrays.
+
+        The data words of the chain of records of the group are collected
+        into one stream, the block control words are found by stepping
+        through the stream, and then decoded together.  Returns (start, end,
+        tcode, tstep, nov, compcd, qualcd, offset, data) with start and end
+        datetime64[s] arrays, offset the index of each block control word in
+        data and data the float32 stream.  A block with NOV of zero ends the
+        group and is the last block returned.
+        """
+        rec, pos = divmod(int(ptr), _RECORD_WORDS)
+        rec, pos = self._skip(rec, pos, 1)
+        recs = [rec]
+        words = self._record(rec)[4:].tolist()
+        at = pos - 5
+        need = at + 1
+        bstart = int(gstart.astype(np.int64))
+        bend = int(gend.astype(np.int64))
+        starts = []
+        offsets = []
+        while bstart < bend:
+            while at >= len(words):
+                recs.append(int(self._record(recs[-1])[3]))
+                words.extend(self._record(recs[-1])[4:].tolist())
+            bcw = words[at] & 0xFFFFFFFF
+            starts.append(bstart)
+            offsets.append(at)
+            nov = bcw >> 16
+            if nov == 0:
+                break
+            tcode = (bcw >> 7) & 7
+            tstep = (bcw >> 10) & 63
+            if tcode in _TCODE_SECONDS:
+                bstart += nov * tstep * _TCODE_SECONDS[tcode]
+            else:
+                bstart = int(
+                    _timadd(np.datetime64(bstart, "s"), tcode, tstep, nov).astype(
+                        np.int64
+                    )
+                )
+            nskip = nov + 1 if (bcw >> 5) & 3 == 0 else 2
+            need = at + nskip
+            # Like _skip, the last word of a record is never a control word.
+            if at % (_RECORD_WORDS - 4) + nskip == _RECORD_WORDS - 5:
+                nskip += 1
+            at += nskip
+        while need > len(words):
+            recs.append(int(self._record(recs[-1])[3]))
+            words.extend(self._record(recs[-1])[4:].tolist())
+        data = np.concatenate(
+            [
+                self._real[(rec - 1) * _RECORD_WORDS + 4 : rec * _RECORD_WORDS]
+                for rec in recs
+            ]
+        )
+        offsets = np.array(offsets, dtype=np.int64)
+        start = np.array(starts, dtype=np.int64).astype("datetime64[s]")
+        end = np.append(start[1:], np.datetime64(bstart, "s"))
+        nov, tstep, tcode, compcd, qualcd = _split_bcw(data.view(np.int32)[offsets])
+        return start, end, tcode, tstep, nov, compcd, qualcd, offsets, data
+
+    def _skip(self, rec, pos, nskip):
+        """Skip nskip words of data from the one based rec and pos."""
+        pos += nskip
+        if pos == _RECORD_WORDS:
+            pos += 1
+        while pos > _RECORD_WORDS:
+            rec = int(self._record(rec)[3])
+            pos -= _RECORD_WORDS - 4
+        return rec, pos
+
+    def _period(self, base, tgroup, gptrs):
+        """Return the start and end datetime64 of the data like WTFNDT."""
+        used = np.flatnonzero(gptrs)
+        if len(used) == 0:
+            return None, None
+
+        first, last = int(used[0]), int(used[-1])
+        gstart = _timadd(base, tgroup, 1, first)
+        gend = _timadd(base, tgroup, 1, first + 1)
+        start, end, *_, qualcd, _, _ = self._blocks(gptrs[first], gstart, gend)
+
+        # The data starts after the leading blocks of missing values.
+        lead = int(np.argmin(qualcd == 31)) if np.any(qualcd != 31) else len(qualcd)
+        sdat = end[lead - 1] if lead else gstart
+        block = min(lead, len(qualcd) - 1)
+        if first == last:
+            # Continue in the first group after the first block of data.
+            xdat = end[block]
+            if xdat == gend:
+                return sdat, xdat
+            start, end, qualcd = (
+                start[block + 1 :],
+                end[block + 1 :],
+                qualcd[block + 1 :],
+            )
+        else:
+            xdat = _timadd(base, tgroup, 1, last)
+            start, end, *_, qualcd, _, _ = self._blocks(
+                gptrs[last], xdat, _timadd(base, tgroup, 1, last + 1)
+            )
+        edat = xdat
+        msflg = 0
+        for bstart, bend, bqualcd in zip(start, end, qualcd):
+            if bqualcd == 31 and msflg == 0:
+                edat = bstart
+                msflg = 1
+            else:
+                msflg = 0
+            xdat = bend
+        if msflg <= 0:
+            edat = xdat
+        return sdat, edat
+
+    def _values(self, base, tgroup, gptrs, sdat, nval, tcode, tsstep, fill):
+        """Return nval float32 values at tsstep TCODE intervals from sdat.
+
+        The blocks of every group in the window are collected first, then
+        the position of each value in the data streams of the groups is
+        computed for all of the blocks at once and the values are gathered
+        with one index.
+        """
+        values = np.full(nval, fill, dtype=np.float32)
+        edat = _timadd(sdat, tcode, tsstep, nval)
+        blocks = []
+        for group in np.flatnonzero(gptrs):
+            gstart = _timadd(base, tgroup, 1, group)
+            gend = _timadd(base, tgroup, 1, group + 1)
+            if gend <= sdat or gstart >= edat:
+                continue
+            blocks.append(self._blocks(gptrs[group], gstart, gend))
+        if not blocks:
+            return values
+        # Shift the control word offsets to index the joined data streams.
+        shift = np.cumsum([0] + [len(block[8]) for block in blocks[:-1]])
+        data = np.concatenate([block[8] for block in blocks])
+        start, end, _, _, nov, compcd, qualcd, offset = (
+            np.concatenate(column) for column in zip(*(block[:8] for block in blocks))
+        )
+        offset += np.repeat(shift, [len(block[7]) for block in blocks])
+        keep = (nov > 0) & (end > sdat) & (start < edat) & (qualcd <= 30)
+        start, end, nov, compcd, offset = (
+            column[keep] for column in (start, end, nov, compcd, offset)
+        )
+
+        lo = _offsets(sdat, start, tcode, tsstep)
+        span = _offsets(sdat, end, tcode, tsstep) - lo
+        # A compressed block stores one value for the whole block.
+        nov = np.where(compcd != 0, 1, nov)
+        if np.any((compcd == 0) & (span % nov != 0)):
+            raise WDMError(
+                tsutils.error_wrapper(
+                    f"""
+                    The time step of a block of data in file={self.wdmpath}
+                    is smaller than the time step of the DSN.  Use
+                    WDM.read_dsn to aggregate the data.
+                    """
+                )
+            )
+
+        first = np.clip(lo, 0, nval)
+        count = np.clip(lo + span, 0, nval) - first
+        block = np.repeat(np.arange(len(count)), count)
+        index = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        index += first[block]
+        values[index] = data[
+            offset[block] + 1 + (index - lo[block]) * nov[block] // span[block]
+        ]
+        return values
+
+    def describe_dsn(self, dsn, attrs="default"):
+        """Collect attributes and the time span of data of the DSN.
+
+        The returned dictionary is the same as `WDM.describe_dsn`.
+        """
+        labrec, label = self._label(dsn)
+        positions = self._attribute_positions(label)
+
+        if attrs == "default":
+            attrib_list = _DEFAULT_ATTRIBUTES
+        elif attrs == "all":
+            attrib_list = sorted(ATTRIBUTES)
+        else:
+            attrib_list = [_attribute_index(name) for name in tsutils.make_list(attrs)]
+
+        attrib_dict = {"DSN": dsn}
+        for index in attrib_list:
+            attrib_name = ATTRIBUTES[index][0]
+            if index in positions:
+                attrib_dict[attrib_name] = self._attribute(
+                    labrec, positions[index], index
+                )
+            elif attrs != "all":
+                attrib_dict[attrib_name] = _NOTPRESENT
+
+        sdat, edat = self._period(*self._groups(label, positions, labrec))
+        if sdat is None:
+            llsdat = np.zeros(6, dtype=np.int32)
+            lledat = np.zeros(6, dtype=np.int32)
+            sdate = edate = None
+        else:
+            llsdat = _llsdat(sdat)
+            lledat = _llsdat(edat)
+            sdate = sdat.astype(datetime.datetime).date()
+            edate = edat.astype(datetime.datetime).date()
+
+        tcode = attrib_dict.get("TCODE")
+        if tcode in _MAPTCODE:
+            attrib_dict["tcode_name"] = _MAPTCODE[tcode]
+            attrib_dict["start_date"] = pd.Period(sdate, freq=_MAPECODE[tcode])
+            attrib_dict["end_date"] = pd.Period(edate, freq=_MAPECODE[tcode])
+            attrib_dict["llsdat"] = llsdat
+            attrib_dict["lledat"] = lledat
+        return attrib_dict
+
+    def read_dsn(self, dsn, start_date=None, end_date=None):
+        """Read from a DSN.
+
+        The returned DataFrame is the same as `WDM.read_dsn`.
+        """
+        labrec, label = self._label(dsn)
+        positions = self._attribute_positions(label)
+        base, tgroup, gptrs = self._groups(label, positions, labrec)
+
+        def _ival(index):
+            return self._attribute(labrec, positions[index], index)
+
+        tcode = _ival(17) if 17 in positions else _NOTPRESENT
+        tsstep = _ival(33) if 33 in positions else _NOTPRESENT
+        tsfill = _ival(32) if 32 in positions else -999
+        if tcode not in _MAPTCODE or tsstep == _NOTPRESENT or tsstep < 1:
+            raise WDMError(
+                tsutils.error_wrapper(
+                    f"""
+                    The TCODE and TSSTEP attributes of DSN={dsn} in
+                    file={self.wdmpath} are needed to read the data.  The
+                    label has TCODE={tcode} and TSSTEP={tsstep}.
+                    """
+                )
+            )
+
+        sdat, edat = self._period(base, tgroup, gptrs)
+        if sdat is None:
+            return pd.DataFrame()
+        llsdat = _llsdat(sdat)
+        lledat = _llsdat(edat)
+
+        start_date, end_date = _check_window(start_date, end_date, llsdat, lledat)
+
+        llsdat, nval = _window(llsdat, lledat, tcode, tsstep, start_date, end_date)
+        if nval <= 0:
+            return pd.DataFrame()
+        sdat = np.datetime64(datetime.datetime(*llsdat), "s")
+        dataout = self._values(
+            base,
+            tgroup,
+            gptrs,
+            sdat,
+            nval,
+            tcode,
+            tsstep,
+            _ival(32) if 32 in positions else 0.0,
+        )
+
+        return _dsn_frame(
+            dataout,
+            llsdat,
+            tcode,
+            tsstep,
+            tsfill,
+            f"{Path(self.wdmpath).stem}_DSN_{dsn}",
+            start_date=start_date,
+            end_date=end_date,
+        )
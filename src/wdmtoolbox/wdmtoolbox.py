@@ -3,12 +3,14 @@
 Used to manipulate Watershed Data Management files for time-series.
 """
 
-import datetime
 import os
 import sys
 import tempfile
-from collections import OrderedDict
-from contextlib import suppress
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import islice, repeat
+from multiprocessing import get_context
 
 import numpy as np
 import pandas as pd
@@ -38,11 +40,11 @@ _common_docs = {
         equal to 32000.  HSPF can only use for input or output
         DSNs of 1 to 9999, inclusive.""",
     "indsn": r"""indsn: int
-        Source
-        DSN.""",
+        Source DSN, or a range of DSNs such as "101:199" or
+        "101:110+201:210".""",
     "outdsn": r"""outdsn: int
-        Target
-        DSN.""",
+        Target DSN, or a range of DSNs with the same number of DSNs as
+        "indsn".""",
     "overwrite": r"""overwrite: bool
         Whether to overwrite the target DSN if it
         exists.""",
@@ -174,12 +176,47 @@ def describedsn(wdmpath, dsn, attrs="default"):
     return WDM.describe_dsn(wdmpath, int(dsn), attrs)
 
 
-def _copy_dsn(inwdmpath, indsn, outwdmpath, outdsn):
-    """Copy a DSN label and data."""
-    _copy_dsn_label(inwdmpath, indsn, outwdmpath, outdsn)
-    nts = WDM.read_dsn(inwdmpath, indsn)
-    if len(nts) > 0:
-        WDM.write_dsn(outwdmpath, int(outdsn), nts)
+def _describe_dicts(wdmpath, dsns=None, attrs="default"):
+    """Describe the DSNs with one `WDM.describe_dsns` call.
+
+    Each dictionary has the keys and values of `describedsn`, except that the
+    start and end dates are the strings of the periods.
+    """
+    table = WDM.describe_dsns(wdmpath, dsns=dsns, attrs=attrs)
+    collect = OrderedDict()
+    for dsn, row in table.to_dict("index").items():
+        desc = {"DSN": dsn}
+        for key, value in row.items():
+            if key in ("tcode_name", "start_date", "end_date"):
+                continue
+            if pd.isna(value):
+                if attrs == "all":
+                    continue
+                value = wdmutil._NOTPRESENT
+            elif isinstance(value, float):
+                value = np.float32(value)
+            desc[key] = value
+        if not pd.isna(row.get("tcode_name", pd.NA)):
+            desc["tcode_name"] = row["tcode_name"]
+            dates = {}
+            for key, datekey in (("start_date", "llsdat"), ("end_date", "lledat")):
+                date = row[key]
+                if pd.isna(date):
+                    desc[key] = str(pd.NaT)
+                    dates[datekey] = np.zeros(6, dtype=np.int32)
+                    continue
+                desc[key] = str(
+                    pd.Period(date.date(), freq=wdmutil._MAPECODE[row["TCODE"]])
+                )
+                dates[datekey] = wdmutil._llsdat(np.datetime64(date, "s"))
+            desc.update(dates)
+        collect[dsn] = desc
+    return collect
+
+
+def _copy_dsn(inwdmpath, indsn, outwdmpath, outdsn, start_date=None, end_date=None):
+    """Copy a DSN label and the float32 data."""
+    WDM.copy_dsn(inwdmpath, indsn, outwdmpath, outdsn, start_date, end_date)
 
 
 def _copy_dsn_label(inwdmpath, indsn, outwdmpath, outdsn):
@@ -187,19 +224,44 @@ def _copy_dsn_label(inwdmpath, indsn, outwdmpath, outdsn):
     WDM.copydsnlabel(inwdmpath, indsn, outwdmpath, outdsn)
 
 
-def _copydsn_core(inwdmpath, indsn, outwdmpath, outdsn, func, overwrite=False):
-    if overwrite is True:
-        deletedsn(outwdmpath, outdsn)
-    if inwdmpath == outwdmpath:
-        tempdir = tempfile.mkdtemp()
-        tmpwdmpath = os.path.join(tempdir, "temp.wdm")
-        createnewwdm(tmpwdmpath)
-        func(inwdmpath, indsn, tmpwdmpath, outdsn)
-        func(tmpwdmpath, outdsn, outwdmpath, outdsn)
-        os.remove(tmpwdmpath)
-        os.removedirs(tempdir)
-    else:
-        func(inwdmpath, indsn, outwdmpath, outdsn)
+def _dsn_pairs(indsn, outdsn):
+    """Pair up the DSNs or ranges of DSNs given as indsn and outdsn."""
+    indsns = tsutils.range_to_numlist(indsn)
+    outdsns = tsutils.range_to_numlist(outdsn)
+    if len(indsns) != len(outdsns):
+        raise ValueError(
+            tsutils.error_wrapper(
+                f"""
+                The "indsn" gives {len(indsns)} DSNs and the "outdsn" gives
+                {len(outdsns)} DSNs.  They must give the same number of DSNs.
+                """
+            )
+        )
+    return list(zip(indsns, outdsns))
+
+
+def _copydsn_core(inwdmpath, indsn, outwdmpath, outdsn, func, overwrite=False, **kwds):
+    pairs = _dsn_pairs(indsn, outdsn)
+    with ExitStack() as stack:
+        if inwdmpath == outwdmpath:
+            sources = {idsn for idsn, _ in pairs}
+            if any(odsn in sources for _, odsn in pairs):
+                raise ValueError(
+                    tsutils.error_wrapper(
+                        f"""
+                        When copying within one WDM file a DSN cannot be both
+                        copied from and copied to.  The "indsn" {indsn} and
+                        the "outdsn" {outdsn} have DSNs in common.
+                        """
+                    )
+                )
+        else:
+            stack.enter_context(wdmutil.WDMFile(inwdmpath, readonly=True, wdm=WDM))
+        stack.enter_context(wdmutil.WDMFile(outwdmpath, wdm=WDM))
+        for idsn, odsn in pairs:
+            if overwrite is True:
+                deletedsn(outwdmpath, odsn)
+            func(inwdmpath, idsn, outwdmpath, odsn, **kwds)
 
 
 @program.command(formatter_class=RSTHelpFormatter)
@@ -223,9 +285,23 @@ def copydsnlabel(inwdmpath, indsn, outwdmpath, outdsn, overwrite=False):
 
 @program.command(formatter_class=RSTHelpFormatter)
 @tsutils.doc(_common_docs)
-def copydsn(inwdmpath, indsn, outwdmpath, outdsn, overwrite=False):
+def copydsn(
+    inwdmpath,
+    indsn,
+    outwdmpath,
+    outdsn,
+    overwrite=False,
+    start_date=None,
+    end_date=None,
+):
     """Make a copy of a DSN.
 
+    The label is copied and the data is copied as the float32 values stored
+    in the WDM file.  All of the DSNs are copied in one session, for
+    example::
+
+        wdmtoolbox copydsn in.wdm 101:199 out.wdm 1101:1199
+
     Parameters
     ----------
     ${inwdmpath}
@@ -233,22 +309,50 @@ def copydsn(inwdmpath, indsn, outwdmpath, outdsn, overwrite=False):
     ${outwdmpath}
     ${outdsn}
     ${overwrite}
+    ${start_date}
+    ${end_date}
 
     """
-    _copydsn_core(inwdmpath, indsn, outwdmpath, outdsn, _copy_dsn, overwrite=overwrite)
+    _copydsn_core(
+        inwdmpath,
+        indsn,
+        outwdmpath,
+        outdsn,
+        _copy_dsn,
+        overwrite=overwrite,
+        start_date=start_date,
+        end_date=end_date,
+    )
 
 
-@program.command(formatter_class=RSTHelpFormatter)
 @tsutils.doc(_common_docs)
-def cleancopywdm(inwdmpath, outwdmpath, overwrite=False):
+def cleancopywdm(inwdmpath, outwdmpath, overwrite=False, workers=1, progress=False):
     """Make a clean copy of a WDM file.
 
+    The DSNs are copied in DSN order into a new WDM file, which drops the
+    records left unused by deleted DSNs and rewritten data.  The values are
+    copied as the float32 values stored in the WDM file.
+
     Parameters
     ----------
     ${inwdmpath}
     ${outwdmpath}
     ${overwrite}
+    workers : int
+        [optional, default is 1]
+
+        Number of processes used to read the DSNs from "inwdmpath".  The
+        main process writes to "outwdmpath" while the workers read ahead.
+    progress : bool
+        [optional, default is False]
+
+        Print the number of DSNs copied to stderr as the copy proceeds.
 
+    Returns
+    -------
+    dict
+        The number of DSNs copied and the number of records in the WDM file
+        before and after the copy.
     """
     if inwdmpath == outwdmpath:
         raise ValueError(
@@ -258,17 +362,107 @@ def cleancopywdm(inwdmpath, outwdmpath, overwrite=False):
                 """
             )
         )
+    workers = int(workers)
+    dsns = [dsn for dsn, _ in WDM.enumerate_dsns(inwdmpath)]
+    chunks = [
+        dsns[i : i + _CLEANCOPY_CHUNK] for i in range(0, len(dsns), _CLEANCOPY_CHUNK)
+    ]
     createnewwdm(outwdmpath, overwrite=overwrite)
-    activedsn = []
-    for i in range(1, 32000):
+    copied = 0
+    with ExitStack() as stack:
+        if workers > 1 and len(chunks) > 1:
+            # Spawned, not forked, so that the workers do not inherit the
+            # files the WDM library of this process has open.
+            pool = stack.enter_context(
+                ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=get_context("spawn"),
+                    initializer=_worker_init,
+                )
+            )
+            reads = _read_ahead(pool, inwdmpath, chunks, 2 * workers)
+        else:
+            reads = (_read_arrays(inwdmpath, chunk) for chunk in chunks)
+        stack.enter_context(wdmutil.WDMFile(inwdmpath, readonly=True, wdm=WDM))
+        stack.enter_context(wdmutil.WDMFile(outwdmpath, wdm=WDM))
+        for arrays in reads:
+            for dsn, array in arrays:
+                try:
+                    _copy_dsn_label(inwdmpath, dsn, outwdmpath, dsn)
+                except wdmutil.WDMError:
+                    # For example a DSN that is not a time-series.
+                    continue
+                if array is not None and len(array.values):
+                    WDM._write_values(
+                        outwdmpath, dsn, pd.Timestamp(array.start), array.values
+                    )
+                copied += 1
+            if progress:
+                print(
+                    f"cleancopywdm: copied {copied} of {len(dsns)} DSNs",
+                    file=sys.stderr,
+                )
+    return {
+        "dsns": copied,
+        "records_before": _records(inwdmpath),
+        "records_after": _records(outwdmpath),
+    }
+
+
+# Number of DSNs read by a worker of `cleancopywdm` at a time.
+_CLEANCOPY_CHUNK = 16
+
+
+def _read_arrays(inwdmpath, dsns):
+    """Read the float32 values of the DSNs in one read only session.
+
+    Module level so that it can run in a worker process.  A DSN that cannot
+    be read, for example one that is not a time-series, gets None.
+    """
+    arrays = []
+    with wdmutil.WDMFile(inwdmpath, readonly=True, wdm=WDM) as wdm:
+        for dsn in dsns:
+            try:
+                arrays.append((dsn, wdm.read_array(dsn)))
+            except (wdmutil.WDMError, ValueError):
+                arrays.append((dsn, None))
+    return arrays
+
+
+def _worker_init():
+    """Make the first WDM library open of a worker process in a private directory.
+
+    The first open in a process probes the record length with a scratch file
+    "temporary.wdm01" in the working directory, which workers started at the
+    same time would otherwise create and delete from under each other.
+    """
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
         try:
-            activedsn.append(describedsn(inwdmpath, i)["DSN"])
-        except wdmutil.WDMError:
-            continue
-    # Copy labels (which copies DSN metadata and data)
-    for i in activedsn:
-        with suppress(wdmutil.WDMError):
-            _copy_dsn(inwdmpath, i, outwdmpath, i)
+            WDM.wmsgop()
+            WDM._close(str(wdmutil._MESSAGE_WDM))
+        finally:
+            os.chdir(cwd)
+
+
+def _read_ahead(pool, inwdmpath, chunks, depth):
+    """Yield `_read_arrays` of the chunks in order, keeping `depth` queued."""
+    chunks = iter(chunks)
+    pending = deque(
+        pool.submit(_read_arrays, inwdmpath, chunk) for chunk in islice(chunks, depth)
+    )
+    while pending:
+        arrays = pending.popleft().result()
+        chunk = next(chunks, None)
+        if chunk is not None:
+            pending.append(pool.submit(_read_arrays, inwdmpath, chunk))
+        yield arrays
+
+
+def _records(wdmpath):
+    """Return the number of records in a WDM file."""
+    return os.path.getsize(wdmpath) // (wdmutil._RECORD_WORDS * 4)
 
 
 @program.command(formatter_class=RSTHelpFormatter)
@@ -301,7 +495,6 @@ def deletedsn(wdmpath, dsn):
     WDM.delete_dsn(wdmpath, dsn)
 
 
-@program.command(formatter_class=RSTHelpFormatter)
 @tsutils.doc(_common_docs)
 def wdmtoswmm5rdii(wdmpath, *dsns, **kwds):
     """Print out DSN data to the screen in SWMM5 RDII format.
@@ -312,61 +505,166 @@ def wdmtoswmm5rdii(wdmpath, *dsns, **kwds):
     *dsns
         The Data Set Numbers in the WDM
         file.
-    **kwds
-        Current supported keywords are "start_date" and
-        "end_date".
+    ${start_date}
+    ${end_date}
+    output : str
+        [optional, default is None]
+
+        Filename to write the RDII file to instead of the screen.
 
     """
-    start_date = kwds.setdefault("start_date", None)
-    end_date = kwds.setdefault("end_date", None)
+    start_date = kwds.pop("start_date", None)
+    end_date = kwds.pop("end_date", None)
+    output = kwds.pop("output", None)
+    if kwds:
+        raise ValueError(
+            tsutils.error_wrapper(
+                f"""
+                The only allowed keywords are start_date, end_date, and
+                output.  You have given {kwds}.
+                """
+            )
+        )
 
     # Need to make sure that all DSNs are the same interval and all are
     # within start and end dates.
     collect_tcodes = {}
     collect_tssteps = {}
     collect_keys = []
-    for dsn in dsns:
-        desc_dsn = describedsn(wdmpath, dsn, attrs=["TCODE", "TSSTEP", "IDLOCN"])
-        collect_tcodes[desc_dsn["TCODE"]] = 1
-        collect_tssteps[desc_dsn["TSSTEP"]] = 1
-        if start_date:
-            assert dateparser(start_date) >= dateparser(desc_dsn["start_date"])
-        if end_date:
-            assert dateparser(end_date) <= dateparser(desc_dsn["end_date"])
-        collect_keys.append((desc_dsn["DSN"], desc_dsn["IDLOCN"]))
-    assert len(collect_tcodes) == 1
-    assert len(collect_tssteps) == 1
-
-    collect_tcodes = list(collect_tcodes.keys())[0]
-    collect_tssteps = list(collect_tssteps.keys())[0]
-
-    collected_start_dates = []
-    collected_end_dates = []
-    collected_ts = {}
-    for dsn, location in collect_keys:
-        tmp = WDM.read_dsn(wdmpath, int(dsn), start_date=start_date, end_date=end_date)
-        collected_start_dates.append(tmp.index[0])
-        collected_end_dates.append(tmp.index[-1])
-        collected_ts[(dsn, location)] = tmp.values
-
-    maptcode = {1: 1, 2: 60, 3: 3600, 4: 86400}
+    collected_ts = []
+    with wdmutil.WDMFile(wdmpath, readonly=True, wdm=WDM) as wdm:
+        table = WDM.describe_dsns(
+            wdmpath, [int(dsn) for dsn in dsns], attrs=["TCODE", "TSSTEP", "IDLOCN"]
+        )
+        for dsn, desc_dsn in table.iterrows():
+            collect_tcodes[desc_dsn["TCODE"]] = 1
+            collect_tssteps[desc_dsn["TSSTEP"]] = 1
+            if start_date:
+                assert dateparser(start_date) >= desc_dsn["start_date"]
+            if end_date:
+                assert dateparser(end_date) <= desc_dsn["end_date"]
+            collect_keys.append((dsn, desc_dsn["IDLOCN"]))
+        assert len(collect_tcodes) == 1
+        assert len(collect_tssteps) == 1
+
+        collect_tcodes = list(collect_tcodes.keys())[0]
+        collect_tssteps = list(collect_tssteps.keys())[0]
+
+        for dsn, _ in collect_keys:
+            tmp = wdm.read_dsn(int(dsn), start_date=start_date, end_date=end_date)
+            collected_ts.append(tmp)
 
-    print("SWMM5")
-    print(f"RDII dump of DSNS {dsns} from {wdmpath}")
-    print(maptcode[collect_tcodes] * collect_tssteps)
-    print(1)
-    print("FLOW CFS")
-    print(len(dsns))
-    for dsn, location in collect_keys:
-        print(f"{dsn}_{location}")
-    print("Node Year Mon Day Hr Min Sec Flow")
     # Can pick any time series because they should all have the same interval
     # and start and end dates.
-    for dex, date in enumerate(tmp.index):
-        for dsn, location in collect_keys:
-            print(
-                f"{dsn}_{location} {date.year} {date.month:02} {date.day:02} {date.hour:02} {date.minute:02} {date.second:02} {collected_ts[(dsn, location)][dex]}"
+    index = collected_ts[-1].index
+    if any(not ts.index.equals(index) for ts in collected_ts):
+        raise ValueError(
+            tsutils.error_wrapper(
+                f"""
+                The DSNs {dsns} must all have the same start and end dates.
+                """
             )
+        )
+
+    maptcode = {1: 1, 2: 60, 3: 3600, 4: 86400}
+
+    with ExitStack() as stack:
+        fpo = sys.stdout
+        if output is not None:
+            fpo = stack.enter_context(open(output, "w", buffering=2**20))
+        fpo.write("SWMM5\n")
+        fpo.write(f"RDII dump of DSNS {dsns} from {wdmpath}\n")
+        fpo.write(f"{maptcode[collect_tcodes] * collect_tssteps}\n")
+        fpo.write("1\n")
+        fpo.write("FLOW CFS\n")
+        fpo.write(f"{len(dsns)}\n")
+        for dsn, location in collect_keys:
+            fpo.write(f"{dsn}_{location}\n")
+        fpo.write("Node Year Mon Day Hr Min Sec Flow\n")
+        _write_rdii(
+            fpo,
+            index,
+            np.column_stack(
+                [ts.iloc[:, 0].to_numpy(float, na_value=np.nan) for ts in collected_ts]
+            ),
+            [f"{dsn}_{location}" for dsn, location in collect_keys],
+        )
+
+
+def _write_rdii(fpo, index, values, nodes, blocksize=50000):
+    """Write the data lines of a SWMM5 RDII file.
+
+    The date columns are built for every time step at once from integer
+    arrays and a table of two digit strings and joined with the node names
+    as whole arrays.  Each block of `blocksize` time steps is then written
+    with one "%" format of the line template repeated for every line, so
+    the values are formatted by the string formatting of the interpreter
+    instead of one f-string at a time.
+    """
+    twodigits = np.array([f"{i:02}" for i in range(100)], dtype=object)
+    nodes = np.array([f"{node} " for node in nodes], dtype=object)
+    for start in range(0, len(index), blocksize):
+        block = index[start : start + blocksize]
+        years = np.unique(block.year)
+        dates = np.array([f"{year} " for year in years], dtype=object)[
+            np.searchsorted(years, block.year)
+        ]
+        for column in (block.month, block.day, block.hour, block.minute):
+            dates = dates + twodigits[column] + " "
+        dates = dates + twodigits[block.second] + " "
+        lines = (nodes[None, :] + dates[:, None]).ravel()
+        fields = np.empty((len(lines), 2), dtype=object)
+        fields[:, 0] = lines
+        fields[:, 1] = values[start : start + blocksize].ravel().tolist()
+        fpo.write("%s%.7g\n" * len(lines) % tuple(fields.ravel().tolist()))
+
+
+@tsutils.doc(_common_docs)
+def wdmtoparquet(
+    wdmpath, parquetpath, *dsns, layout="long", start_date=None, end_date=None
+):
+    """Write DSNs to a Parquet file.
+
+    The values are written as float32, as stored in the WDM file, with
+    missing values as null.  Each calendar year is read and written as its
+    own row group, so the memory used does not depend on the length of the
+    period of record.  The label attributes of every DSN are stored as a
+    JSON object in the "wdmtoolbox.attributes" key of the schema metadata.
+
+    Requires the pyarrow library.
+
+    Parameters
+    ----------
+    ${wdmpath}
+    parquetpath
+        Path and filename of the Parquet file to write.
+    *dsns
+        The Data Set Numbers in the WDM file.  Defaults to all of the
+        time-series DSNs.
+    layout : str
+        [optional, default is "long"]
+
+        "long" writes the columns "datetime", "dsn" and "value".  "wide"
+        writes a "datetime" column and one column for each DSN named by the
+        DSN number.
+    ${start_date}
+    ${end_date}
+    """
+    wdmutil._pyarrow()
+    import pyarrow.parquet as pq
+
+    dsns = [int(dsn) for dsn in dsns] or None
+    writer = None
+    try:
+        for table in WDM.arrow_years(
+            wdmpath, dsns=dsns, layout=layout, start_date=start_date, end_date=end_date
+        ):
+            if writer is None:
+                writer = pq.ParquetWriter(parquetpath, table.schema)
+            writer.write_table(table, row_group_size=max(table.num_rows, 1))
+    finally:
+        if writer is not None:
+            writer.close()
 
 
 @tsutils.doc(_common_docs)
@@ -388,21 +686,32 @@ def extract(*wdmpath, **kwds):
             'file.wdm,101 file2.wdm,104 file.wdm,227'
     ${start_date}
     ${end_date}
+    workers : int
+        [optional, default is 1]
+
+        Number of processes used to read the WDM files.  The DSNs are
+        grouped by WDM file and each group is read by one process, so this
+        only helps when extracting from more than one WDM file.
+    aggregate : str
+        [optional, default is None]
+
+        Aggregate the values in the WDM library to a longer time step as
+        "INTERVAL:TRANSFORM", for example "D:sum" for daily totals or
+        "6h:max".  The INTERVAL is a pandas offset alias, "s", "min", "h",
+        "D", "MS" or "YS", optionally with a number of units in front.  The
+        TRANSFORM is "mean" (the default), "sum", "max" or "min".  Only
+        whole intervals are returned.
     """
-    try:
-        start_date = kwds.pop("start_date")
-    except KeyError:
-        start_date = None
-    try:
-        end_date = kwds.pop("end_date")
-    except KeyError:
-        end_date = None
+    start_date = kwds.pop("start_date", None)
+    end_date = kwds.pop("end_date", None)
+    workers = int(kwds.pop("workers", None) or 1)
+    aggregate = _aggregate(kwds.pop("aggregate", None))
     if kwds:
         raise ValueError(
             tsutils.error_wrapper(
                 f"""
-                The only allowed keywords are start_date and end_date.  You
-                have given {kwds}.
+                The only allowed keywords are start_date, end_date, workers,
+                and aggregate.  You have given {kwds}.
                 """
             )
         )
@@ -436,15 +745,172 @@ def extract(*wdmpath, **kwds):
         else:
             labels.append([wdmpath, rng])
 
-    result = pd.DataFrame()
-    cnt = 0
+    # Group the DSNs by WDM file, each group is read in one session.
+    groups = OrderedDict()
     for wdmpath, dsn in labels:
-        nts = WDM.read_dsn(wdmpath, int(dsn), start_date=start_date, end_date=end_date)
-        if nts.columns[0] in result.columns:
+        groups.setdefault(wdmpath, []).append(int(dsn))
+
+    if workers > 1 and len(groups) > 1:
+        # Spawned, not forked, so that the workers do not inherit the
+        # files the WDM library of this process has open.
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(groups)),
+            mp_context=get_context("spawn"),
+            initializer=_worker_init,
+        ) as pool:
+            frames = list(
+                pool.map(
+                    _extract_file,
+                    groups.keys(),
+                    groups.values(),
+                    repeat(start_date),
+                    repeat(end_date),
+                    repeat(aggregate),
+                )
+            )
+    else:
+        frames = [
+            _extract_file(wdmpath, dsns, start_date, end_date, aggregate)
+            for wdmpath, dsns in groups.items()
+        ]
+
+    # Put the series back in the order requested.
+    frames = {
+        wdmpath: iter(nts_list) for wdmpath, nts_list in zip(groups.keys(), frames)
+    }
+    return tsutils.asbestfreq(
+        _combine([next(frames[wdmpath]) for wdmpath, _ in labels])
+    )
+
+
+def _extract_file(wdmpath, dsns, start_date=None, end_date=None, aggregate=None):
+    """Read the DSNs from one WDM file in one read only session.
+
+    Module level so that it can run in a worker process, where WDM is the
+    worker's own instance of the WDM library.
+    """
+    with wdmutil.WDMFile(wdmpath, readonly=True, wdm=WDM) as wdm:
+        return [
+            wdm.read_dsn(
+                dsn, start_date=start_date, end_date=end_date, **(aggregate or {})
+            )
+            for dsn in dsns
+        ]
+
+
+def _aggregate(aggregate):
+    """Convert "INTERVAL:TRANSFORM" to the read_dsn aggregation keywords."""
+    if aggregate is None:
+        return None
+    interval, _, transform = str(aggregate).partition(":")
+    interval = interval.strip()
+    code = interval.lstrip("0123456789")
+    tcodes = {
+        "s": 1,
+        "S": 1,
+        "min": 2,
+        "T": 2,
+        "h": 3,
+        "H": 3,
+        "D": 4,
+        "MS": 5,
+        "M": 5,
+        "ME": 5,
+        "YS": 6,
+        "AS": 6,
+        "Y": 6,
+        "A": 6,
+        "YE": 6,
+    }
+    if code not in tcodes:
+        raise ValueError(
+            tsutils.error_wrapper(
+                f"""
+                The aggregate interval must be one of "s", "min", "h", "D",
+                "MS" or "YS", optionally with a number in front.  You gave
+                "{interval}".
+                """
+            )
+        )
+    return {
+        "tcode": tcodes[code],
+        "tsstep": int(interval[: len(interval) - len(code)] or 1),
+        "transform": transform.strip() or None,
+    }
+
+
+def _combine(frames):
+    """Combine single column DataFrames into one DataFrame.
+
+    The union of the indexes is computed once and the values are copied
+    into one preallocated array.  Repeated column names get a count
+    appended.
+    """
+    frames = [i for i in frames if len(i.columns) > 0]
+    if not frames:
+        return pd.DataFrame()
+
+    names = []
+    cnt = 0
+    for nts in frames:
+        name = nts.columns[0]
+        if name in names:
             cnt = cnt + 1
-            nts.columns = [f"{nts.columns[0]}_{cnt}"]
-        result = result.join(nts, how="outer")
-    return tsutils.asbestfreq(result)
+            name = f"{name}_{cnt}"
+        names.append(name)
+
+    index = frames[0].index
+    if not all(nts.index.equals(index) for nts in frames[1:]):
+        index = pd.DatetimeIndex(
+            np.unique(np.concatenate([nts.index.values for nts in frames])),
+            name=index.name,
+        )
+
+    # Column major so that each column is a contiguous view of one array.
+    values = np.full((len(index), len(frames)), np.nan, order="F")
+    columns = {}
+    for col, (name, nts) in enumerate(zip(names, frames)):
+        data = nts.iloc[:, 0].to_numpy(dtype=np.float64, na_value=np.nan)
+        if nts.index.equals(index):
+            values[:, col] = data
+        else:
+            values[index.searchsorted(nts.index), col] = data
+        columns[name] = values[:, col]
+        if nts.dtypes.iloc[0] != np.float64:
+            # Keep the nullable dtypes from read_dsn.
+            columns[name] = pd.array(values[:, col], dtype=nts.dtypes.iloc[0])
+    return pd.DataFrame(columns, index=index)
+
+
+@tsutils.doc(_common_docs)
+def read_array(wdmpath, dsn, start_date=None, end_date=None, out=None):
+    """Read the float32 values of a DSN as NumPy arrays.
+
+    A faster alternative to "extract" for programs that read the same DSNs
+    many times.  No pandas objects are made and the values are not copied
+    to float64.
+
+    Parameters
+    ----------
+    ${wdmpath}
+    ${dsn}
+    ${start_date}
+    ${end_date}
+    out
+        [optional, default is a new array]
+
+        A contiguous float32 array to read the values into.
+
+    Returns
+    -------
+    DSNArray
+        A named tuple of the float32 "values", the datetime64 "start" date
+        of the first value, the timedelta64 time "step", and the "missing"
+        mask of values equal to TSFILL.
+    """
+    return WDM.read_array(
+        wdmpath, int(dsn), start_date=start_date, end_date=end_date, out=out
+    )
 
 
 @program.command(formatter_class=RSTHelpFormatter)
@@ -471,14 +937,7 @@ def listdsns(wdmpath):
             )
         )
 
-    collect = OrderedDict()
-    for i in range(1, 32001):
-        try:
-            testv = describedsn(wdmpath, i)
-        except wdmutil.WDMError:
-            continue
-        collect[i] = testv
-    return collect
+    return _describe_dicts(wdmpath)
 
 
 @program.command(formatter_class=RSTHelpFormatter)
@@ -547,6 +1006,42 @@ def createnewdsn(
     )
 
 
+@tsutils.doc(_common_docs)
+def createnewdsns(wdmpath, table):
+    """Create many new DSNs from a table.
+
+    Every DSN in the table is created under one lock and one open of the
+    WDM file.  The whole table is checked first, and if any row is not
+    valid nothing is created.  A DSN that already exists, or that cannot be
+    created, is reported as an error and removed, and the remaining DSNs
+    are still created.
+
+    Parameters
+    ----------
+    ${wdmpath}
+    table
+        CSV file with a header line, a "dsn" column, and any of the columns
+        "tstype", "base_year", "tcode", "tsstep", "statid", "scenario",
+        "location", "description", "constituent" and "tsfill".  Missing
+        columns and empty cells take the defaults of "createnewdsn".  For
+        example::
+
+            dsn,tcode,tsstep,base_year,scenario,location,constituent
+            101,4,1,1970,BASE,RCH1,FLOW
+            102,4,1,1970,BASE,RCH2,FLOW
+            201,3,1,1970,BASE,RCH1,SED
+    """
+    records = pd.read_csv(
+        table, dtype=str, keep_default_na=False, skipinitialspace=True
+    )
+    records.columns = [i.strip().lower() for i in records.columns]
+    records = records.to_dict("records")
+    for record in records:
+        if not record.get("tstype", "") and record.get("constituent", ""):
+            record["tstype"] = record["constituent"].strip()[:4]
+    return WDM.create_new_dsns(wdmpath, records)
+
+
 @program.command(formatter_class=RSTHelpFormatter)
 @tsutils.doc(_common_docs)
 def hydhrseqtowdm(wdmpath, dsn, input_ts=sys.stdin, start_century=1900):
@@ -562,37 +1057,103 @@ def hydhrseqtowdm(wdmpath, dsn, input_ts=sys.stdin, start_century=1900):
         to 1900.
     """
     dsn = int(dsn)
-    dates = np.array([])
-    data = np.array([])
     with open(input_ts, encoding="ascii") as hydhrfp:
-        for line in hydhrfp:
-            words = line[8:]
-            words = words.split()
-            year = int(words[0]) + start_century
-            month = int(words[1])
-            day = int(words[2])
-            ampmflag = int(words[3])
-            if int(words[0]) == 99 and month == 12 and day == 31 and ampmflag == 2:
-                start_century = start_century + 100
-            data = np.append(data, [float(i) for i in words[4:16]])
-            try:
-                if ampmflag == 1:
-                    dates = np.append(
-                        dates,
-                        [datetime.datetime(year, month, day, i) for i in range(12)],
-                    )
+        lines = [line[8:] for line in hydhrfp if line[8:].strip()]
+    words = np.fromstring(" ".join(lines), sep=" ")
+    if len(words) != 16 * len(lines):
+        raise ValueError(
+            tsutils.error_wrapper(
+                f"""
+                Each line of the HYDHR file "{input_ts}" must have a year,
+                month, day, AM/PM flag and 12 hourly values after the first
+                8 characters.
+                """
+            )
+        )
+    words = words.reshape(-1, 16)
+    year, month, day, ampmflag = words[:, :4].astype(int).T
+    if not np.isin(ampmflag, (1, 2)).all():
+        raise ValueError(
+            tsutils.error_wrapper(
+                f"""
+                The AM/PM flag in the HYDHR file "{input_ts}" must be 1 or 2.
+                """
+            )
+        )
 
-                elif ampmflag == 2:
-                    dates = np.append(
-                        dates,
-                        [datetime.datetime(year, month, day, i) for i in range(12, 24)],
-                    )
-            except ValueError:
-                print(start_century, line)
-    data = pd.DataFrame(data, index=dates)
+    # Two digit years, the century goes up by one after each line for
+    # the afternoon of December 31st, '99.
+    rollover = (year == 99) & (month == 12) & (day == 31) & (ampmflag == 2)
+    year = year + start_century + 100 * (np.cumsum(rollover) - rollover)
+
+    months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    days = months.astype("datetime64[D]") + (day - 1)
+    invalid = (month < 1) | (month > 12) | (day < 1)
+    if (invalid | (days.astype("datetime64[M]") != months)).any():
+        raise ValueError(
+            tsutils.error_wrapper(
+                f"""
+                The HYDHR file "{input_ts}" has a month that is not from 1 to
+                12 or a day that is not in the month.
+                """
+            )
+        )
+    hours = (
+        days.astype("datetime64[h]")[:, None]
+        + (12 * (ampmflag - 1))[:, None]
+        + np.arange(12)
+    )
+    data = pd.DataFrame(
+        words[:, 4:].ravel(), index=pd.DatetimeIndex(hours.ravel(), name="Datetime")
+    )
     _writetodsn(wdmpath, dsn, data)
 
 
+@program.command(formatter_class=RSTHelpFormatter)
+@tsutils.doc(_common_docs)
+def parquettowdm(wdmpath, parquetpath, dsn=None):
+    """Write a Parquet file or dataset to DSNs.
+
+    The Parquet data is read one record batch at a time and the float32
+    values are written straight to the DSNs without a round trip through
+    text.  In the long layout, as written by "wdmtoparquet --layout=long",
+    the columns are "datetime", "dsn" and "value".  In the wide layout
+    there is a "datetime" column and one column for each DSN.  Missing time
+    steps and nulls are written as the TSFILL of the DSN.
+
+    DSNs that do not exist are created from the label attributes in the
+    "wdmtoolbox.attributes" schema metadata written by "wdmtoparquet".
+
+    Requires the pyarrow library.
+
+    Parameters
+    ----------
+    ${wdmpath}
+    parquetpath
+        Path to a Parquet file, or to a directory of Parquet files read as
+        one dataset.
+    dsn : str
+        [optional, default is the column names, or the values of the "dsn"
+        column]
+
+        Comma separated mapping of the wide column names, or of the long
+        "dsn" values, to the DSNs to write to, for example
+        "flow=101,stage=102".  Columns not in the mapping are skipped.
+    """
+    wdmutil._pyarrow()
+    import pyarrow.dataset as ds
+
+    dsns = None
+    if dsn is not None:
+        dsns = {
+            key.strip(): int(value)
+            for key, value in (i.split("=", 1) for i in str(dsn).split(","))
+        }
+    WDM.write_arrow(
+        wdmpath, ds.dataset(parquetpath, format="parquet").to_batches(), dsns=dsns
+    )
+
+
 @program.command(formatter_class=RSTHelpFormatter)
 def stdtowdm(wdmpath, dsn, infile="-"):
     """DEPRECATED: Use 'csvtowdm'."""
@@ -614,6 +1175,7 @@ def csvtowdm(
     target_units=None,
     source_units=None,
     input_ts="-",
+    chunksize=None,
 ):
     """Write data from a CSV file to a DSN.
 
@@ -622,10 +1184,22 @@ def csvtowdm(
     OR
     'date/time string', 'value'
 
+    A file with more than one data column writes each column to its own
+    DSN, see `dsn`.  The file is read once and all DSNs are written while
+    the WDM file is held open and locked.
+
+    With `chunksize` the file must have the 'date/time string', 'value'
+    form and is read and written `chunksize` rows at a time.
+
     Parameters
     ----------
     ${wdmpath}
-    ${dsn}
+    dsn
+        The Data Set Number (DSN) to write a single column to, or for more
+        than one column either a list of DSNs in the same order as the
+        columns, for example "101:110" or "101,105,107", or a mapping of
+        column name to DSN, for example "flow=101,stage=102".  Columns not
+        in a mapping are not written.
     ${input_ts}
     ${start_date}
     ${end_date}
@@ -636,20 +1210,91 @@ def csvtowdm(
     ${clean}
     ${target_units}
     ${source_units}
+    chunksize : int
+        [optional, default is None]
+
+        Read the CSV file `chunksize` rows at a time and append each chunk
+        to the DSN so that the whole series is never in memory.  The
+        dates must fall on the time step of the DSN, missing dates are
+        written as missing values, and `force_freq`, `groupby`,
+        `round_index` and `clean` cannot be used.  The default reads the
+        entire file before writing.
     """
-    tsd = tsutils.common_kwds(
-        input_ts,
-        start_date=start_date,
-        end_date=end_date,
-        pick=columns,
-        force_freq=force_freq,
-        groupby=groupby,
-        round_index=round_index,
-        clean=clean,
-        target_units=target_units,
-        source_units=source_units,
-    )
+    kwds = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "pick": columns,
+        "force_freq": force_freq,
+        "groupby": groupby,
+        "round_index": round_index,
+        "clean": clean,
+        "target_units": target_units,
+        "source_units": source_units,
+    }
+    if chunksize is not None:
+        _csvtowdm_chunks(wdmpath, dsn, input_ts, int(chunksize), **kwds)
+        return
+
+    tsd = tsutils.common_kwds(input_ts, **kwds)
+    pairs = _column_dsns(dsn, tsd)
+    if len(pairs) == 1 and len(tsd.columns) == 1:
+        _writetodsn(wdmpath, pairs[0][1], tsd)
+        return
+
+    # The time step is inferred once for all of the columns.
+    tsd, tcode, tsstep = _data_step(tsd)
+    with wdmutil.WDMFile(wdmpath, wdm=WDM):
+        for column, cdsn in pairs:
+            data = _trim(tsd[[column]])
+            if len(data) > 0:
+                _check_dsn_step(wdmpath, cdsn, tcode, tsstep)
+                WDM.write_dsn(wdmpath, cdsn, data)
+
+
+def _trim(data):
+    """Remove the missing values before the first and after the last value."""
+    return data.loc[data.first_valid_index() : data.last_valid_index()]
+
+
+def _column_dsns(dsn, tsd):
+    """Pair each column of tsd with the DSN it is written to."""
+    if isinstance(dsn, str) and "=" in dsn:
+        dsn = dict(i.split("=", 1) for i in dsn.split(","))
+    if isinstance(dsn, dict):
+        columns = [str(i) for i in tsd.columns]
+        pairs = []
+        for column, cdsn in dsn.items():
+            if str(column).strip() not in columns:
+                raise ValueError(
+                    tsutils.error_wrapper(
+                        f"""
+                        The column {column} is not in the input data set,
+                        which has the columns {columns}.
+                        """
+                    )
+                )
+            pairs.append((tsd.columns[columns.index(str(column).strip())], int(cdsn)))
+        return pairs
+
+    if isinstance(dsn, str):
+        dsn = dsn.replace(",", "+")
+    dsns = [int(i) for i in tsutils.range_to_numlist(dsn)]
+    if len(dsns) == 1:
+        _check_one_column(tsd)
+    elif len(dsns) != len(tsd.columns):
+        raise ValueError(
+            tsutils.error_wrapper(
+                f"""
+                The input data set has {len(tsd.columns)} columns, but
+                {len(dsns)} DSNs were given.
+                """
+            )
+        )
+    return list(zip(tsd.columns, dsns))
+
 
+def _check_one_column(tsd):
+    """Raise ValueError if tsd has more than one column."""
     if len(tsd.columns) > 1:
         raise ValueError(
             tsutils.error_wrapper(
@@ -660,11 +1305,63 @@ def csvtowdm(
             )
         )
 
-    _writetodsn(wdmpath, dsn, tsd)
+
+def _csvtowdm_chunks(wdmpath, dsn, input_ts, chunksize, **kwds):
+    """Append the CSV file input_ts to the DSNs chunksize rows at a time.
+
+    The dates of each chunk are checked against the time step of the DSN by
+    `wdmutil.WDMWriter`, the time step is not inferred from the data.
+    """
+    # These change or drop rows by looking at neighboring rows, which
+    # cannot be done across the chunk boundaries.
+    for keyword in ("force_freq", "groupby", "round_index", "clean"):
+        if kwds[keyword]:
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    The "{keyword}" option cannot be used with "chunksize".
+                    """
+                )
+            )
+    pairs = None
+    with ExitStack() as stack:
+        for chunk in pd.read_csv(
+            sys.stdin if input_ts == "-" else input_ts,
+            index_col=0,
+            parse_dates=True,
+            skipinitialspace=True,
+            chunksize=chunksize,
+        ):
+            tsd = tsutils.common_kwds(chunk, bestfreq=False, **kwds)
+            if len(tsd) == 0:
+                continue
+            if pairs is None:
+                pairs = _column_dsns(dsn, tsd)
+                writers = {
+                    cdsn: stack.enter_context(wdmutil.WDMWriter(wdmpath, cdsn, wdm=WDM))
+                    for _, cdsn in pairs
+                }
+            for column, cdsn in pairs:
+                data = tsd[[column]]
+                if data.iloc[:, 0].notna().any():
+                    # Missing values between chunks are filled by the writer.
+                    writers[cdsn].append(_trim(data))
 
 
 def _writetodsn(wdmpath, dsn, data):
     """Local function to write Pandas data frame to DSN."""
+    WDM.write_dsn(wdmpath, int(dsn), _conform_to_dsn(wdmpath, dsn, data))
+
+
+def _conform_to_dsn(wdmpath, dsn, data):
+    """Set the frequency of data and check it against the DSN."""
+    data, tcode, tsstep = _data_step(data)
+    _check_dsn_step(wdmpath, dsn, tcode, tsstep)
+    return data
+
+
+def _data_step(data):
+    """Set the frequency of data and return it with its TCODE and TSSTEP."""
     data = tsutils.asbestfreq(data)
     infer = data.index.freqstr
     pandacode = infer.lstrip("0123456789")
@@ -704,12 +1401,16 @@ def _writetodsn(wdmpath, dsn, data):
                 """
             )
         ) from exc
+    return data, finterval, tsstep
+
 
+def _check_dsn_step(wdmpath, dsn, finterval, tsstep):
+    """Raise ValueError if the DSN does not have the TCODE and TSSTEP."""
     # Convert string to int
     dsn = int(dsn)
 
     # Make sure that input data metadata matches target DSN
-    desc_dsn = describedsn(wdmpath, dsn)
+    desc_dsn = WDM.dsn_metadata(wdmpath, dsn)
 
     dsntcode = desc_dsn["TCODE"]
     if finterval != dsntcode:
@@ -743,7 +1444,44 @@ def _writetodsn(wdmpath, dsn, data):
             )
         )
 
-    WDM.write_dsn(wdmpath, dsn, data)
+
+@tsutils.doc(_common_docs)
+def batch(wdmpath, manifest, stop_on_error=False):
+    """
+    Run a manifest of DSN operations on a WDM file.
+
+    All operations run in order under one lock and one open of the WDM
+    file, instead of one command for each operation.
+
+    Parameters
+    ----------
+    ${wdmpath}
+    manifest
+        CSV file with a header line and the columns "operation", "dsn",
+        "argument" and "value".  For example::
+
+            operation,dsn,argument,value
+            renumber,101,1101,
+            delete,104,,
+            setattrib,1101,IDSCEN,BASE
+            copylabel,1101,other.wdm,201
+
+        The operations are "renumber" (argument is the new DSN), "delete",
+        "setattrib" (argument is the attribute name and value the attribute
+        value), and "copylabel" (argument is the output WDM file and value
+        the output DSN).
+    stop_on_error : bool
+        [optional, default is False]
+
+        Skip the remaining operations after the first one that fails.
+    """
+    operations = pd.read_csv(
+        manifest, dtype=str, keep_default_na=False, skipinitialspace=True
+    )
+    operations.columns = [i.strip().lower() for i in operations.columns]
+    return WDM.apply_batch(
+        wdmpath, operations.to_dict("records"), stop_on_error=stop_on_error
+    )
 
 
 @program.command(formatter_class=RSTHelpFormatter)
@@ -803,7 +1541,7 @@ def main():
         if tablefmt == "dict":
             print(describedsn(wdmpath, dsn, attrs))
         else:
-            attrib_dict = describedsn(wdmpath, dsn, attrs)
+            attrib_dict = _describe_dicts(wdmpath, [int(dsn)], attrs)[int(dsn)]
             attrib_df = pd.DataFrame.transpose(pd.DataFrame([attrib_dict]))
             attrib_table = tb(
                 attrib_df,
@@ -835,11 +1573,77 @@ def main():
                 collect.setdefault(nkey, []).append(testv[key])
         return tsutils.printiso(collect, tablefmt="plain", showindex=False)
 
+    @program.command("batch", formatter_class=RSTHelpFormatter)
+    @tsutils.copy_doc(batch)
+    def batch_cli(wdmpath, manifest, stop_on_error=False):
+        return tsutils.printiso(
+            batch(wdmpath, manifest, stop_on_error=stop_on_error),
+            tablefmt="plain",
+            showindex=False,
+        )
+
+    @program.command("createnewdsns", formatter_class=RSTHelpFormatter)
+    @tsutils.copy_doc(createnewdsns)
+    def createnewdsns_cli(wdmpath, table):
+        return tsutils.printiso(
+            createnewdsns(wdmpath, table), tablefmt="plain", showindex=False
+        )
+
+    @program.command("wdmtoswmm5rdii", formatter_class=RSTHelpFormatter)
+    @tsutils.copy_doc(wdmtoswmm5rdii)
+    def wdmtoswmm5rdii_cli(wdmpath, start_date=None, end_date=None, output=None, *dsns):
+        wdmtoswmm5rdii(
+            wdmpath, *dsns, start_date=start_date, end_date=end_date, output=output
+        )
+
+    @program.command("wdmtoparquet", formatter_class=RSTHelpFormatter)
+    @tsutils.copy_doc(wdmtoparquet)
+    def wdmtoparquet_cli(
+        wdmpath, parquetpath, layout="long", start_date=None, end_date=None, *dsns
+    ):
+        wdmtoparquet(
+            wdmpath,
+            parquetpath,
+            *dsns,
+            layout=layout,
+            start_date=start_date,
+            end_date=end_date,
+        )
+
+    @program.command("cleancopywdm", formatter_class=RSTHelpFormatter)
+    @tsutils.copy_doc(cleancopywdm)
+    def cleancopywdm_cli(
+        inwdmpath, outwdmpath, overwrite=False, workers=1, progress=False
+    ):
+        return tsutils.printiso(
+            pd.DataFrame(
+                [
+                    cleancopywdm(
+                        inwdmpath,
+                        outwdmpath,
+                        overwrite=overwrite,
+                        workers=workers,
+                        progress=progress,
+                    )
+                ]
+            ),
+            tablefmt="plain",
+            showindex=False,
+        )
+
     @program.command("extract", formatter_class=RSTHelpFormatter)
     @tsutils.copy_doc(extract)
-    def extract_cli(start_date=None, end_date=None, *wdmpath):
+    def extract_cli(
+        start_date=None, end_date=None, workers=1, aggregate=None, *wdmpath
+    ):
         return tsutils.printiso(
-            extract(*wdmpath, start_date=start_date, end_date=end_date)
+            extract(
+                *wdmpath,
+                start_date=start_date,
+                end_date=end_date,
+                workers=workers,
+                aggregate=aggregate,
+            )
         )
 
     program()
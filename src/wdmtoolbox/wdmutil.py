@@ -6,15 +6,18 @@ routines.
 """
 
 import datetime
+import json
 import os
 import re
-from io import StringIO
+from collections import OrderedDict, namedtuple
 from pathlib import Path
+from typing import ClassVar
 
 import numpy as np
 import pandas as pd
 from filelock import SoftFileLock
 
+from .attributes import ATTRIBUTES, INDEX_BY_NAME
 from .toolbox_utils.src.toolbox_utils import tsutils
 
 if os.name == "nt":
@@ -39,6 +42,27 @@ else:
 
 _NOTPRESENT = "<Not present on dataset>"
 
+_MESSAGE_WDM = Path(__file__).parent / "message.wdm"
+
+# A WDM file is a direct access file of 512 word (4 byte) records.  Record 1
+# is the file definition record, and words PDIRPT to PDIRPT + 63 (one based
+# like the WDM library) point to the directory records, each directory record
+# holding the label record number of 500 consecutive DSNs in words 5 to 504.
+_RECORD_WORDS = 512
+_PDIRPT = 113
+_DSNS_PER_DIRECTORY = 500
+
+# Transformation codes (DTRAN) of wdtget when aggregating to a longer time
+# step.
+_TRANSFORMS = {"mean": 0, "ave": 0, "sum": 1, "max": 2, "min": 3}
+
+_BATCH_OPERATIONS = ("renumber", "delete", "setattrib", "copylabel")
+_BATCH_ALIASES = {
+    "renumberdsn": "renumber",
+    "deletedsn": "delete",
+    "copydsnlabel": "copylabel",
+}
+
 _attrib_alias = {
     "LOCATION": "IDLOCN",
     "SCENARIO": "IDSCEN",
@@ -49,6 +73,400 @@ _attrib_alias = {
 }
 
 
+# Length of the time units in seconds (TCODE 1 to 4) or months (5 to 7).
+_TCODE_SECONDS = {1: 1, 2: 60, 3: 3600, 4: 86400}
+_TCODE_MONTHS = {5: 1, 6: 12, 7: 1200}
+
+
+def _timadd(date, tcode, tstep, nval):
+    """Add nval intervals of tstep TCODE units to a datetime64[s] date."""
+    nval = int(nval) * int(tstep)
+    if tcode in _TCODE_SECONDS:
+        return date + np.timedelta64(nval * _TCODE_SECONDS[tcode], "s")
+    month = date.astype("datetime64[M]")
+    offset = date - month.astype("datetime64[s]")
+    return (month + nval * _TCODE_MONTHS[tcode]).astype("datetime64[s]") + offset
+
+
+def _timdif(sdate, edate, tcode, tstep):
+    """Number of tstep TCODE intervals from sdate to edate."""
+    if tcode in _TCODE_SECONDS:
+        return int(
+            (edate - sdate) // np.timedelta64(int(tstep) * _TCODE_SECONDS[tcode], "s")
+        )
+    months = edate.astype("datetime64[M]") - sdate.astype("datetime64[M]")
+    nval = int(months.astype(np.int64) // (int(tstep) * _TCODE_MONTHS[tcode]))
+    if _timadd(sdate, tcode, tstep, nval) > edate:
+        nval -= 1
+    return nval
+
+
+def _dates(date, tcode, tstep, nval):
+    """Return the nval datetime64[s] dates every tstep TCODE units from date."""
+    steps = np.arange(nval, dtype=np.int64) * int(tstep)
+    if tcode in _TCODE_SECONDS:
+        return date + (steps * _TCODE_SECONDS[tcode]).astype("timedelta64[s]")
+    month = date.astype("datetime64[M]")
+    offset = date - month.astype("datetime64[s]")
+    return (month + steps * _TCODE_MONTHS[tcode]).astype("datetime64[s]") + offset
+
+
+def _align(date, tcode, tstep):
+    """Return the first date on or after date at a whole tstep interval.
+
+    Intervals of a day or less start at midnight, longer intervals at the
+    start of the TCODE unit, and months and years at the start of the
+    month or year.
+    """
+    if tcode in _TCODE_SECONDS:
+        step = int(tstep) * _TCODE_SECONDS[tcode]
+        if 86400 % step:
+            step = _TCODE_SECONDS[tcode]
+        day = date.astype("datetime64[D]").astype("datetime64[s]")
+        aligned = day + ((date - day) // np.timedelta64(step, "s")) * np.timedelta64(
+            step, "s"
+        )
+    else:
+        unit = "M" if tcode == 5 else "Y"
+        aligned = date.astype(f"datetime64[{unit}]").astype("datetime64[s]")
+    if aligned < date:
+        aligned = _timadd(aligned, tcode, tstep, 1)
+    return aligned
+
+
+def _transform(transform):
+    """Return the wdtget DTRAN code of a transform name."""
+    if transform is None:
+        return 0
+    try:
+        return _TRANSFORMS[str(transform).strip().lower()]
+    except KeyError as exc:
+        raise ValueError(
+            tsutils.error_wrapper(
+                f"""
+                The transform must be one of {", ".join(_TRANSFORMS)}.  You
+                gave "{transform}".
+                """
+            )
+        ) from exc
+
+
+def _llsdat(date):
+    """Convert a datetime64[s] to the date array used by the WDM library."""
+    return np.array(date.astype(datetime.datetime).timetuple()[:6], dtype=np.int32)
+
+
+def _window(llsdat, lledat, tcode, tsstep, start_date=None, end_date=None):
+    """Return the first date and number of values to read within a window.
+
+    Only the values from start_date to end_date inclusive are read instead
+    of the whole period of record from llsdat to lledat.
+    """
+    if not np.any(llsdat):
+        # No data in the DSN.
+        return llsdat, 0
+    sdat = np.datetime64(datetime.datetime(*llsdat), "s")
+    nval = _timdif(sdat, np.datetime64(datetime.datetime(*lledat), "s"), tcode, tsstep)
+    if nval <= 0:
+        return llsdat, 0
+    first = 0
+    last = nval
+    if start_date is not None:
+        start_date = np.datetime64(start_date, "s")
+        first = max(_timdif(sdat, start_date, tcode, tsstep), 0)
+        if _timadd(sdat, tcode, tsstep, first) < start_date:
+            first += 1
+    if end_date is not None:
+        last = min(_timdif(sdat, np.datetime64(end_date, "s"), tcode, tsstep) + 1, nval)
+    # Keep one value for a window between two values so that the result is
+    # an empty DataFrame with the column name.
+    first = max(min(first, nval - 1), 0)
+    last = max(last, first + 1)
+    return _llsdat(_timadd(sdat, tcode, tsstep, first)), last - first
+
+
+def _float32_values(data, tsfill):
+    """Return the data as a contiguous float32 array with NaN set to tsfill.
+
+    Object dtype columns, for example numbers read as strings, are converted
+    with pd.to_numeric and anything that is not a number is an error.
+    """
+    if isinstance(data, pd.DataFrame):
+        if len(data.columns) != 1:
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    The input data set must contain only 1 time series.  You
+                    gave {len(data.columns)}.
+                    """
+                )
+            )
+        data = data.iloc[:, 0]
+    if data.dtype == object:
+        try:
+            data = pd.to_numeric(data)
+        except (TypeError, ValueError) as exc:
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    The data for column {data.name} must be numbers.  {exc}
+                    """
+                )
+            ) from exc
+    return np.ascontiguousarray(
+        data.to_numpy(dtype=np.float32, na_value=np.float32(tsfill))
+    )
+
+
+def _pyarrow():
+    """Import pyarrow, which is only needed for Arrow and Parquet files."""
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise ImportError(
+            tsutils.error_wrapper(
+                """
+                The pyarrow library is required to read and write Arrow and
+                Parquet files.  Install it with "pip install pyarrow".
+                """
+            )
+        ) from exc
+    return pyarrow
+
+
+def _attribute_index(name):
+    """Return the attribute index of the attribute name or alias."""
+    name = _attrib_alias.get(name.upper(), name)
+    if len(name) > 6:
+        raise ValueError(
+            tsutils.error_wrapper(
+                f"""{name} is too long - attribute names are
+                6 characters or less.
+                """
+            )
+        )
+    name = name[:6].ljust(6).upper()
+    if name.strip() not in INDEX_BY_NAME:
+        raise ValueError(tsutils.error_wrapper(f"{name} is not a valid attribute name"))
+    return INDEX_BY_NAME[name.strip()]
+
+
+def _directory_dsns(fdr, record):
+    """Return (DSN, label record number) of the DSNs in the directory records.
+
+    The fdr is the file definition record as int32 words and record(rec)
+    returns the int32 words of the one based record number rec.
+    """
+    dsns = []
+    dirpts = fdr[_PDIRPT - 1 : _PDIRPT - 1 + 32000 // _DSNS_PER_DIRECTORY]
+    for block, dirrec in enumerate(dirpts):
+        if dirrec <= 0:
+            continue
+        labels = record(int(dirrec))[4 : 4 + _DSNS_PER_DIRECTORY]
+        for offset in np.nonzero(labels)[0]:
+            dsns.append(
+                (int(block * _DSNS_PER_DIRECTORY + offset + 1), int(labels[offset]))
+            )
+    return dsns
+
+
+def _dateconverter(datestr):
+    """Extract all of the grouped numbers out of a string as a date array."""
+    words = re.findall(r"\d+", str(datestr))
+    words = [int(i) for i in words]
+    dtime = [1900, 1, 1, 0, 0, 0]
+    dtime[: len(words)] = words
+    return np.array(dtime)
+
+
+def _check_window(start_date, end_date, llsdat, lledat):
+    """Convert start_date and end_date and check against the period of record."""
+    if start_date is not None:
+        start_date = _dateconverter(start_date)
+        start_date = datetime.datetime(*start_date)
+        if start_date > datetime.datetime(*lledat):
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    The requested start date ({start_date}) is after the
+                    end date ({datetime.datetime(*lledat)}) of the time
+                    series in the WDM file.
+                    """
+                )
+            )
+
+    if end_date is not None:
+        end_date = _dateconverter(end_date)
+        end_date = datetime.datetime(*end_date)
+        if end_date < datetime.datetime(*llsdat):
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    The requested end date ({end_date}) is before the start
+                    date ({datetime.datetime(*llsdat)}) of the time series
+                    in the WDM file.
+                    """
+                )
+            )
+
+    return start_date, end_date
+
+
+def _dsn_frame(
+    dataout, llsdat, tcode, tsstep, tsfill, name, start_date=None, end_date=None
+):
+    """Make the DataFrame returned by read_dsn from the values of a DSN."""
+    try:
+        index = pd.date_range(
+            datetime.datetime(*llsdat),
+            periods=len(dataout),
+            freq=f"{tsstep:d}{_MAPTCODE[tcode]}",
+        )
+    except FutureWarning:
+        index = pd.date_range(
+            datetime.datetime(*llsdat),
+            periods=len(dataout),
+            freq=f"{tsstep:d}{_MAPTCODE[tcode]}",
+        )
+
+    # Convert time series to pandas DataFrame
+    tmpval = pd.DataFrame(
+        pd.Series(dataout, index=index, name=name),
+        dtype=np.float64,
+    )
+
+    tmpval = tsutils.common_kwds(
+        input_tsd=tmpval, start_date=start_date, end_date=end_date
+    )
+    tmpval.replace(tsfill, np.nan, inplace=True)
+    tmpval.index.name = "Datetime"
+    return tmpval
+
+
+# Label attributes written by `WDM.to_arrow` and the keyword arguments of
+# `WDM.create_new_dsn` used to create a DSN from them.
+_ARROW_LABEL = {
+    "TSTYPE": "tstype",
+    "TSBYR": "base_year",
+    "TCODE": "tcode",
+    "TSSTEP": "tsstep",
+    "STAID": "statid",
+    "IDSCEN": "scenario",
+    "IDLOCN": "location",
+    "STANAM": "description",
+    "IDCONS": "constituent",
+    "TSFILL": "tsfill",
+}
+
+# Keyword arguments of `WDM.create_new_dsn` and their defaults.
+_NEW_DSN_DEFAULTS = {
+    "tstype": "",
+    "base_year": 1900,
+    "tcode": 4,
+    "tsstep": 1,
+    "statid": " ",
+    "scenario": "",
+    "location": "",
+    "description": "",
+    "constituent": "",
+    "tsfill": -999.0,
+}
+
+
+def _missing(value):
+    """Return True if a table cell is empty."""
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return False
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
+
+
+def _label_attributes(**kwds):
+    """Return the attributes set on the label of a new DSN.
+
+    The attributes are a list of (WDM library function, attribute index,
+    attribute length, value) tuples.  Raises ValueError if a value cannot be
+    converted or a string is too long for its attribute, so a DSN can be
+    checked before the label is created.
+    """
+    kwds = {**_NEW_DSN_DEFAULTS, **kwds}
+    for key in ("base_year", "tcode", "tsstep"):
+        if isinstance(kwds[key], str) and not kwds[key].strip():
+            kwds[key] = _NEW_DSN_DEFAULTS[key]
+    tcode = int(kwds["tcode"])
+    if tcode not in _MAPTCODE:
+        raise ValueError(
+            tsutils.error_wrapper(f"The tcode {tcode} must be from 1 to 6.")
+        )
+
+    # Integer attributes set with FORTRAN function wdbsai.
+    attributes = [
+        ("wdbsai", saind, 1, saval)
+        for saind, saval in (
+            (34, 6),  # tgroup
+            (83, 1),  # compfg
+            (84, 1),  # tsform
+            (85, 1),  # vbtime
+            (17, tcode),  # tcode
+            (33, int(kwds["tsstep"])),  # tsstep
+            (27, int(kwds["base_year"])),  # tsbyr
+        )
+    ]
+
+    # Real attributes set with FORTRAN function wdbsar.
+    tsfill = kwds["tsfill"]
+    if isinstance(tsfill, str) and not tsfill.strip():
+        tsfill = _NEW_DSN_DEFAULTS["tsfill"]
+    attributes.append(("wdbsar", 32, 1, float(tsfill)))  # tsfill
+
+    # String attributes set with FORTRAN function wdbsac.
+    for saind, salen, key, error_name in (
+        (2, 16, "statid", "Station ID"),
+        (1, 4, "tstype", "Time series type - tstype"),
+        (45, 48, "description", "Description"),
+        (288, 8, "scenario", "Scenario"),
+        (289, 8, "constituent", "Constituent"),
+        (290, 8, "location", "Location"),
+    ):
+        saval = str(kwds[key]).strip()
+        if len(saval) > salen:
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    String "{saval}" is too long for {error_name}.
+                    Must have a length equal or less than {salen}.
+                    """
+                )
+            )
+        attributes.append(("wdbsac", saind, salen, f"{saval: <{salen}}"))
+    return attributes
+
+
+DSNArray = namedtuple("DSNArray", ["values", "start", "step", "missing"])
+DSNArray.__doc__ = """The values of a DSN returned by `WDM.read_array`.
+
+values : float32 array
+    The values as stored in the WDM file, TSFILL included.
+start : numpy.datetime64
+    The date of the first value, NaT if there are no values.
+step : numpy.timedelta64
+    The time step, in seconds, or in months for TCODE 5 and 6.
+missing : bool array
+    True where the value is TSFILL.
+"""
+
+
+def _step(tcode, tsstep):
+    """Return the time step as a numpy.timedelta64."""
+    if tcode in _TCODE_SECONDS:
+        return np.timedelta64(int(tsstep) * _TCODE_SECONDS[tcode], "s")
+    return np.timedelta64(int(tsstep) * _TCODE_MONTHS[tcode], "M")
+
+
 class WDMError(Exception):
     """The default Error class."""
 
@@ -110,10 +528,25 @@ DSN {self.dsn} exists.
 
 
 class WDM:
-    """Class to open and read from WDM files."""
+    """Class to open and read from WDM files.
+
+    The WDM library keeps a single table of open files and a single record
+    buffer per process, so the bookkeeping of open files, and of files held
+    open by a `WDMFile` session, is shared by every instance.
+    """
 
-    def __init__(self):
-        """Set functions from WDM library to class function objects."""
+    openfiles: ClassVar[dict] = {}
+    heldfiles: ClassVar[dict] = {}
+
+    # Number of DSNs kept in the metadata cache of `dsn_metadata`.
+    metadata_cache_size = 1024
+
+    def __init__(self, buffer_records=None):
+        """Set functions from WDM library to class function objects.
+
+        With buffer_records, set the size of the record buffer of the WDM
+        library, see `set_buffer_records`.
+        """
         # timcvt: Convert times to account for 24 hour
         # timdif: Time difference
         # wdmopn: Open WDM file
@@ -133,6 +566,8 @@ class WDM:
         # wddsrn: Renumber a DSN
         # wddsdl: Delete a DSN
         # wddscl: Copy a label
+        # wdbsiz: Set the number of records in the record buffer
+        # wdbsta: Size and counters of the record buffer
 
         self.timcvt = _wdm_lib.timcvt
         self.timdif = _wdm_lib.timdif
@@ -154,13 +589,68 @@ class WDM:
         self.wddsrn = _wdm_lib.wddsrn
         self.wddsdl = _wdm_lib.wddsdl
         self.wddscl = _wdm_lib.wddscl
+        self.wdbsiz = _wdm_lib.wdbsiz
+        self.wdbsta = _wdm_lib.wdbsta
+
+        self._metadata = OrderedDict()
+        if buffer_records is not None:
+            self.set_buffer_records(buffer_records)
+
+    def set_buffer_records(self, buffer_records):
+        """Set the number of 512 word records in the WDM library buffer.
+
+        The WDM library keeps the most recently used records of the open
+        WDM files in memory, by default 10 records.  A larger buffer keeps
+        more of the directory, label and data records of a large WDM file
+        between calls, see `buffer_stats` for the effect.  The buffer is
+        shared by every instance in the process and is emptied when the
+        size is set.
+        """
+        buffer_records = int(buffer_records)
+        if self.wdbsiz(buffer_records) != 0:
+            max_records = self.buffer_stats()["max_records"]
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    The number of buffer records must be from 10 to
+                    {max_records}.  You gave {buffer_records}.
+                    """
+                )
+            )
+
+    def buffer_stats(self, reset=False):
+        """Return the size and the counters of the WDM library record buffer.
+
+        Parameters
+        ----------
+        reset : bool
+            [optional, default is False]
+
+            Set the counters to zero after returning them.
 
-        self.openfiles = {}
+        Returns
+        -------
+        dict
+            "records" and "max_records" are the current and the largest
+            size of the buffer.  "hits" and "misses" count the records
+            found and not found in the buffer, and "reads" and "writes" the
+            records read from and written to the WDM files.
+        """
+        records, max_records, hits, misses, reads, writes = self.wdbsta(
+            int(bool(reset))
+        )
+        return {
+            "records": records,
+            "max_records": max_records,
+            "hits": hits,
+            "misses": misses,
+            "reads": reads,
+            "writes": writes,
+        }
 
     def wmsgop(self):
         """WMSGOP is a simple open of the message file."""
-        afilename = Path(__file__).parent / "message.wdm"
-        return self._open(afilename, 50, ronwfg=1)
+        return self._open(_MESSAGE_WDM, 50, ronwfg=1)
 
     def dateconverter(self, datestr):
         """Extract and convert dates.
@@ -168,16 +658,26 @@ class WDM:
         Extract all of the grouped numbers out of a string
         to create an array suitable for dates and times.
         """
-        words = re.findall(r"\d+", str(datestr))
-        words = [int(i) for i in words]
-        dtime = [1900, 1, 1, 0, 0, 0]
-        dtime[: len(words)] = words
-        return np.array(dtime)
+        return _dateconverter(datestr)
 
     def _open(self, wdname, wdmsfl, ronwfg=0):
         """Private method to open WDM file."""
         wdname = str(wdname).strip()
+        if ronwfg == 0 and self.heldfiles.get(wdname, {}).get("readonly"):
+            raise WDMError(
+                tsutils.error_wrapper(
+                    f"""
+                    The file "{wdname}" is held open read-only by a WDMFile
+                    session and cannot be written to.
+                    """
+                )
+            )
         if wdname not in self.openfiles:
+            # A file left open on this unit would keep its records in the
+            # record buffer of the WDM library under the same unit.
+            for other, unit in list(self.openfiles.items()):
+                if unit == wdmsfl and other not in self.heldfiles:
+                    self._close(other)
             if ronwfg in (0, 1) and not Path(wdname).exists():
                 raise ValueError(
                     tsutils.error_wrapper(
@@ -189,7 +689,104 @@ class WDM:
             retcode = self.wdbopn(wdmsfl, wdname, ronwfg)
             self._retcode_check(retcode, additional_info=f"wdbopn file={wdname} DSN=NA")
             self.openfiles[wdname] = wdmsfl
-        return wdmsfl
+        return self.openfiles[wdname]
+
+    def _lock(self, wdmpath):
+        """Return the lock for writing to `wdmpath`.
+
+        A file held open for writing by a `WDMFile` session already owns a
+        lock, which is reentrant, so it is reused instead of creating a new
+        lock file for every write.  Every write takes the lock, so this is
+        also where the cached metadata of the file is dropped.
+        """
+        wdmpath = str(wdmpath).strip()
+        self._invalidate(wdmpath)
+        if wdmpath in self.heldfiles and self.heldfiles[wdmpath]["lock"]:
+            return self.heldfiles[wdmpath]["lock"]
+        return SoftFileLock(wdmpath + ".lock", timeout=30)
+
+    def _invalidate(self, wdmpath):
+        """Drop the cached metadata of all DSNs in wdmpath."""
+        path = str(Path(wdmpath).resolve())
+        for key in [key for key in self._metadata if key[0] == path]:
+            del self._metadata[key]
+
+    def dsn_metadata(self, wdmpath, dsn):
+        """Return TCODE, TSSTEP, TSFILL, TSBYR and the period of record.
+
+        The dictionary has the same keys as `describe_dsn` and is kept in a
+        least recently used cache keyed by the resolved path, the DSN, and
+        the modification time and size of the WDM file.  Any write through
+        this class drops the cached entries of that WDM file.
+        """
+        path = Path(wdmpath).resolve()
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return self.describe_dsn(
+                wdmpath, dsn, attrs=["TCODE", "TSSTEP", "TSFILL", "TSBYR"]
+            )
+        key = (str(path), int(dsn), stat.st_mtime_ns, stat.st_size)
+        if key in self._metadata:
+            self._metadata.move_to_end(key)
+        else:
+            self._metadata[key] = self.describe_dsn(
+                wdmpath, dsn, attrs=["TCODE", "TSSTEP", "TSFILL", "TSBYR"]
+            )
+            while len(self._metadata) > self.metadata_cache_size:
+                self._metadata.popitem(last=False)
+        return {
+            key: value.copy() if isinstance(value, np.ndarray) else value
+            for key, value in self._metadata[key].items()
+        }
+
+    def _hold(self, wdmpath, readonly=False):
+        """Open `wdmpath` and keep it open until `_release` is called."""
+        wdmpath = str(wdmpath).strip()
+        if wdmpath in self.heldfiles:
+            held = self.heldfiles[wdmpath]
+            if held["readonly"] and not readonly:
+                raise WDMError(
+                    tsutils.error_wrapper(
+                        f"""
+                        The file "{wdmpath}" is already held open read-only
+                        and cannot also be held open for writing.
+                        """
+                    )
+                )
+            held["count"] += 1
+            return self.openfiles[wdmpath]
+
+        lock = None
+        if not readonly:
+            lock = SoftFileLock(wdmpath + ".lock", timeout=30)
+            lock.acquire()
+        try:
+            self._close(wdmpath)
+            wdmsfl = next(i for i in range(61, 100) if i not in self.openfiles.values())
+            wdmfp = self._open(wdmpath, wdmsfl, ronwfg=int(readonly))
+        except Exception:
+            if lock is not None:
+                lock.release()
+            raise
+        self.heldfiles[wdmpath] = {"count": 1, "lock": lock, "readonly": readonly}
+        return wdmfp
+
+    def _release(self, wdmpath):
+        """Release a file held open by `_hold`, closing it on last release."""
+        wdmpath = str(wdmpath).strip()
+        held = self.heldfiles.get(wdmpath)
+        if held is None:
+            return
+        held["count"] -= 1
+        if held["count"] > 0:
+            return
+        self.heldfiles.pop(wdmpath)
+        try:
+            self._close(wdmpath)
+        finally:
+            if held["lock"] is not None:
+                held["lock"].release()
 
     def _retcode_check(self, retcode, additional_info=" "):
         """Central place to run through the return code."""
@@ -296,7 +893,7 @@ class WDM:
         odsn = int(odsn)
         ndsn = int(ndsn)
 
-        lock = SoftFileLock(wdmpath + ".lock", timeout=30)
+        lock = self._lock(wdmpath)
         with lock:
             wdmfp = self._open(wdmpath, 51)
             retcode = self.wddsrn(wdmfp, odsn, ndsn)
@@ -309,7 +906,7 @@ class WDM:
         """Delete a DSN."""
         dsn = int(dsn)
 
-        lock = SoftFileLock(wdmpath + ".lock", timeout=30)
+        lock = self._lock(wdmpath)
         with lock:
             wdmfp = self._open(wdmpath, 52)
             testreturn = self.wdckdt(wdmfp, dsn)
@@ -325,30 +922,239 @@ class WDM:
             self._close(wdmpath)
 
     def copydsnlabel(self, inwdmpath, indsn, outwdmpath, outdsn):
-        """Will copy a complete DSN label from one DSN to another."""
-        assert inwdmpath != outwdmpath
+        """Will copy a complete DSN label from one DSN to another.
+
+        The DSNs can be in the same WDM file.
+        """
         indsn = int(indsn)
         outdsn = int(outdsn)
         dsntype = 0
-        inwdmfp = self._open(inwdmpath, 53, ronwfg=1)
-        lock = SoftFileLock(outwdmpath + ".lock", timeout=30)
+        lock = self._lock(outwdmpath)
         with lock:
+            # Open the output first so that, when both DSNs are in the same
+            # file, the input uses the same writable open.
             outwdmfp = self._open(outwdmpath, 54)
+            inwdmfp = self._open(inwdmpath, 53, ronwfg=1)
             retcode = self.wddscl(inwdmfp, indsn, outwdmfp, outdsn, dsntype)
+            self._close(inwdmpath)
             self._close(outwdmpath)
-        self._close(inwdmpath)
         self._retcode_check(
             retcode, additional_info=f"wddscl file={inwdmpath} DSN={indsn}"
         )
 
+    def copy_dsn(
+        self, inwdmpath, indsn, outwdmpath, outdsn, start_date=None, end_date=None
+    ):
+        """Copy the label and the float32 values of a DSN to another DSN.
+
+        The values are copied as stored, with missing values as TSFILL,
+        instead of through a DataFrame.  Only the values from start_date to
+        end_date are copied, and if the DSN has no values in that window
+        only the label is copied.  The DSNs can be in the same WDM file.
+        """
+        indsn = int(indsn)
+        outdsn = int(outdsn)
+        # Hold the output, and the input if it is a different file, so that
+        # the label and the data are copied with one open of each file.
+        self._hold(outwdmpath)
+        try:
+            self._hold(inwdmpath, readonly=True)
+            try:
+                self._copy_dsn(
+                    inwdmpath, indsn, outwdmpath, outdsn, start_date, end_date
+                )
+            finally:
+                self._release(inwdmpath)
+        finally:
+            self._release(outwdmpath)
+
+    def _copy_dsn(self, inwdmpath, indsn, outwdmpath, outdsn, start_date, end_date):
+        """Copy the label and values of a DSN, see `copy_dsn`."""
+        self.copydsnlabel(inwdmpath, indsn, outwdmpath, outdsn)
+
+        desc_dsn = self.dsn_metadata(inwdmpath, indsn)
+        llsdat = desc_dsn["llsdat"]
+        lledat = desc_dsn["lledat"]
+        if not np.any(llsdat):
+            return
+        self.timcvt(llsdat)
+        self.timcvt(lledat)
+        if (
+            start_date is not None
+            and datetime.datetime(*_dateconverter(start_date))
+            > datetime.datetime(*lledat)
+        ) or (
+            end_date is not None
+            and datetime.datetime(*_dateconverter(end_date))
+            < datetime.datetime(*llsdat)
+        ):
+            return
+
+        array = self.read_array(inwdmpath, indsn, start_date, end_date)
+        if len(array.values):
+            self._write_values(
+                outwdmpath, outdsn, pd.Timestamp(array.start), array.values
+            )
+
+    def apply_batch(self, wdmpath, operations, stop_on_error=False):
+        """Run DSN operations on one WDM file under one lock and one open.
+
+        Parameters
+        ----------
+        wdmpath : str
+            Path and WDM filename.
+        operations : list
+            Each operation is a dictionary with the keys "operation",
+            "dsn", "argument" and "value", or a tuple in that order.
+
+            +--------------+-------------------+-----------------+
+            | operation    | argument          | value           |
+            +==============+===================+=================+
+            | renumber     | new DSN           |                 |
+            +--------------+-------------------+-----------------+
+            | delete       |                   |                 |
+            +--------------+-------------------+-----------------+
+            | setattrib    | attribute name    | attribute value |
+            +--------------+-------------------+-----------------+
+            | copylabel    | output WDM file   | output DSN      |
+            +--------------+-------------------+-----------------+
+
+            The CLI names "renumberdsn", "deletedsn" and "copydsnlabel" are
+            also accepted.
+        stop_on_error : bool
+            [optional, default is False]
+
+            Skip the remaining operations after the first one that fails.
+
+        Returns
+        -------
+        DataFrame
+            The operations with a "status" column of "ok", "error" or
+            "skipped" and a "message" column with the error.
+
+        The whole list is checked before the WDM file is opened, so a
+        malformed operation raises ValueError without changing the file.
+        """
+        ops = []
+        for number, operation in enumerate(operations, start=1):
+            if isinstance(operation, dict):
+                operation = [
+                    operation.get(key)
+                    for key in ("operation", "dsn", "argument", "value")
+                ]
+            operation = list(operation) + [None] * (4 - len(operation))
+            name, dsn, argument, value = operation[:4]
+            name = str(name).strip().lower()
+            name = _BATCH_ALIASES.get(name, name)
+            try:
+                dsn = int(dsn)
+                if name not in _BATCH_OPERATIONS:
+                    raise ValueError(f"unknown operation {name}")
+                if not 1 <= dsn <= 32000:
+                    raise ValueError(f"DSN {dsn} is not from 1 to 32000")
+                if name == "renumber":
+                    argument = int(argument)
+                elif name == "setattrib":
+                    if str(argument).strip().upper() not in INDEX_BY_NAME:
+                        _attribute_index(str(argument))
+                elif name == "copylabel":
+                    if pd.isna(argument) or not str(argument).strip():
+                        raise ValueError("the output WDM file is required")
+                    argument = str(argument).strip()
+                    value = int(value)
+            except (TypeError, ValueError) as exc:
+                raise ValueError(
+                    tsutils.error_wrapper(
+                        f"""
+                        Operation {number} ({operation}) is not valid: {exc}
+                        """
+                    )
+                ) from exc
+            ops.append((name, dsn, argument, value))
+
+        results = []
+        failed = False
+        with WDMFile(wdmpath, wdm=self):
+            for name, dsn, argument, value in ops:
+                status = "ok"
+                message = ""
+                if failed and stop_on_error:
+                    status = "skipped"
+                else:
+                    try:
+                        if name == "renumber":
+                            self.renumber_dsn(wdmpath, dsn, argument)
+                        elif name == "delete":
+                            self.delete_dsn(wdmpath, dsn)
+                        elif name == "setattrib":
+                            self.set_attribute(wdmpath, dsn, str(argument), value)
+                        elif name == "copylabel":
+                            self.copydsnlabel(wdmpath, dsn, argument, value)
+                    except (
+                        WDMError,
+                        DSNExistsError,
+                        DSNDoesNotExist,
+                        ValueError,
+                    ) as exc:
+                        failed = True
+                        status = "error"
+                        message = " ".join(str(exc).replace("*", " ").split())
+                results.append((name, dsn, argument, value, status, message))
+        return pd.DataFrame(
+            results,
+            columns=["operation", "dsn", "argument", "value", "status", "message"],
+        )
+
+    def enumerate_dsns(self, wdmpath):
+        """Return (DSN, label record number) for every DSN in the WDM file.
+
+        Reads the file definition record and the directory records it points
+        to, instead of asking the WDM library about each of the 32000
+        possible DSNs.  The records are read as stored on disk, so a file
+        being written to in a `WDMFile` session should be enumerated after
+        the session is closed.
+        """
+        wdmpath = str(wdmpath).strip()
+        if not Path(wdmpath).exists():
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    File {wdmpath} does not exist.
+                    """
+                )
+            )
+        recbytes = _RECORD_WORDS * 4
+        with open(wdmpath, "rb") as fpi:
+            fdr = np.frombuffer(fpi.read(recbytes), dtype=np.int32)
+            if len(fdr) != _RECORD_WORDS or fdr[0] != -998:
+                raise WDMError(
+                    tsutils.error_wrapper(
+                        f"""
+                        The file {wdmpath} is not a WDM file.
+                        """
+                    )
+                )
+
+            def _record(rec):
+                fpi.seek((rec - 1) * recbytes)
+                return np.frombuffer(fpi.read(recbytes), dtype=np.int32)
+
+            return _directory_dsns(fdr, _record)
+
     def describe_dsn(self, wdmpath, dsn, attrs="default"):
         """Will collect some metadata about the DSN, including attributes and
         time span of data."""
+        if attrs == "default":
+            attrib_list = [33, 17, 32, 290, 288, 289, 27, 45, 1]
+        elif attrs == "all":
+            attrib_list = sorted(ATTRIBUTES)
+        else:
+            attrib_list = [_attribute_index(name) for name in tsutils.make_list(attrs)]
+
         wdmfp = self._open(wdmpath, 55, ronwfg=1)
         _, llsdat, lledat, retcode = self.wtfndt(
             wdmfp, dsn, 1
         )  # GPFLG  - get(1)/put(2) flag
-        self._close(wdmpath)
         # Ignore retcode == -6 which means that the DSN doesn't have any data.
         # If it is a new DSN, of course it doesn't have any data.
         if retcode == -6:
@@ -367,47 +1173,9 @@ class WDM:
         except ValueError:
             edate = None
 
-        messfp = self.wmsgop()
-        if attrs == "default":
-            attrib_list = [33, 17, 32, 290, 288, 289, 27, 45, 1]
-        elif attrs == "all":
-            attrib_list = list(range(1, 450))
-        else:
-            attrib_name_list = tsutils.make_list(attrs)
-            attrib_list = []
-            for name in attrib_name_list:
-                name = _attrib_alias.get(name.upper(), name)
-                if len(name) > 6:
-                    raise ValueError(
-                        tsutils.error_wrapper(
-                            f"""{name} is too long - attribute names are
-                            6 characters or less.
-                            """
-                        )
-                    )
-                name = name[:6].ljust(6).upper()
-                attrib_index, attrib_type, attrib_len = self.wdbsgx(
-                    messfp, np.array(list(name))
-                )
-                if attrib_index <= 0:
-                    raise ValueError(
-                        tsutils.error_wrapper(f"{name} is not a valid attribute name")
-                    )
-                attrib_list.append(attrib_index)
-        wdmfp = self._open(wdmpath, 55, ronwfg=1)
         attrib_dict = {"DSN": dsn}
         for index in attrib_list:
-            (
-                name,
-                _,  # data pointer
-                attrib_type,
-                attrib_len,
-                _,  # attribute usage
-                _,  # attribute update
-            ) = self.wdsagy(messfp, index)
-            attrib_name = b"".join(name).strip().decode("ascii")
-            if not attrib_name:
-                continue
+            attrib_name, attrib_type, attrib_len = ATTRIBUTES[index]
             if attrib_type == 1:
                 attrib_ival, retcode = self.wdbsgi(
                     wdmfp,
@@ -452,9 +1220,76 @@ class WDM:
             tcode = -999
         return attrib_dict
 
+    def describe_dsns(self, wdmpath, dsns=None, attrs="default"):
+        """Describe many DSNs in one session and return a DataFrame.
+
+        Parameters
+        ----------
+        wdmpath : str
+            Path and WDM filename.
+        dsns : list
+            [optional, default is all time-series DSNs in the WDM file]
+
+            The DSNs to describe.
+        attrs : str or list
+            [optional, default is "default"]
+
+            The attributes to collect, the same as `describe_dsn`.
+
+        Returns
+        -------
+        DataFrame
+            One row per DSN, indexed by DSN.  Attribute columns have the
+            nullable dtype of the attribute type, with missing attributes
+            as NA.  The "start_date" and "end_date" columns are the period
+            of record as datetime64, "end_date" being the end of the last
+            interval, and NaT for a DSN without data.
+        """
+        if not Path(wdmpath).exists():
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    File {wdmpath} does not exist.
+                    """
+                )
+            )
+
+        rows = []
+        with WDMFile(wdmpath, readonly=True, wdm=self):
+            if dsns is None:
+                dsns = []
+                for dsn, _ in self.enumerate_dsns(wdmpath):
+                    # Skip DSNs that are not time-series.
+                    if self.wdckdt(self.openfiles[str(wdmpath).strip()], dsn) == 1:
+                        dsns.append(dsn)
+            for dsn in dsns:
+                desc = self.describe_dsn(wdmpath, int(dsn), attrs=attrs)
+                for key in ("start_date", "end_date"):
+                    if key in desc:
+                        date = desc["llsdat" if key == "start_date" else "lledat"]
+                        desc[key] = datetime.datetime(*date) if np.any(date) else pd.NaT
+                desc.pop("llsdat", None)
+                desc.pop("lledat", None)
+                rows.append(desc)
+
+        table = pd.DataFrame(rows, columns=None if rows else ["DSN"])
+        table = table.set_index("DSN")
+        for column in table.columns:
+            if column in ("start_date", "end_date"):
+                table[column] = pd.to_datetime(table[column])
+            elif column in INDEX_BY_NAME:
+                values = table[column].where(table[column] != _NOTPRESENT)
+                table[column] = values.astype(
+                    {1: "Int64", 2: "Float32", 3: "string"}[
+                        ATTRIBUTES[INDEX_BY_NAME[column]][1]
+                    ]
+                )
+        return table
+
     def create_new_wdm(self, wdmpath, overwrite=False):
         """Create a new WDM fileronwfg."""
         wdmpath = Path(wdmpath)
+        self._invalidate(wdmpath)
         if overwrite and wdmpath.exists():
             self._close(wdmpath)
             wdmpath.unlink()
@@ -466,31 +1301,34 @@ class WDM:
 
     def set_attribute(self, wdmpath, dsn, attrib_name, attrib_val):
         """Set attribute of the DSN."""
-        wdmfp = self._open(wdmpath, 60)
-        messfp = self.wmsgop()
-
         name = attrib_name.ljust(6).upper()
         name = _attrib_alias.get(name, name)
-        name = name[:6].ljust(6).upper()
-        attrib_index, attrib_type, attrib_len = self.wdbsgx(
-            messfp, np.array(list(name))
-        )
-
-        if attrib_type == 0:
+        name = name[:6].strip()
+        if name not in INDEX_BY_NAME:
             raise ValueError(
                 tsutils.error_wrapper(f"No attribute called {attrib_name}.")
             )
+        attrib_index = INDEX_BY_NAME[name]
+        _, attrib_type, attrib_len = ATTRIBUTES[attrib_index]
 
-        if attrib_type == 1:
-            val = int(attrib_val)
-            retcode = self.wdbsai(wdmfp, dsn, messfp, attrib_index, attrib_len, val)
-        elif attrib_type == 2:
-            val = float(attrib_val)
-            retcode = self.wdbsar(wdmfp, dsn, messfp, attrib_index, attrib_len, val)
-        elif attrib_type == 3:
-            val = attrib_val.strip()
-            val = f"{val: <{attrib_len}}"
-            retcode = self.wdbsac(wdmfp, dsn, messfp, attrib_index, attrib_len, val)
+        # The WDM library checks the value against the message file.
+        messfp = self.wmsgop()
+        lock = self._lock(wdmpath)
+        with lock:
+            wdmfp = self._open(wdmpath, 60)
+            if attrib_type == 1:
+                val = int(attrib_val)
+                retcode = self.wdbsai(wdmfp, dsn, messfp, attrib_index, attrib_len, val)
+            elif attrib_type == 2:
+                val = float(attrib_val)
+                retcode = self.wdbsar(wdmfp, dsn, messfp, attrib_index, attrib_len, val)
+            elif attrib_type == 3:
+                val = attrib_val.strip()
+                val = f"{val: <{attrib_len}}"
+                retcode = self.wdbsac(
+                    wdmfp, dsn, messfp, attrib_index, attrib_len, np.array(list(val))
+                )
+            self._close(wdmpath)
         self._retcode_check(
             retcode,
             additional_info=f"set_attributes file={wdmpath} DSN={dsn}, attribu_name={attrib_name}",
@@ -512,101 +1350,161 @@ class WDM:
         tsfill=-999.0,
     ):
         """Create self.wdmfp/dsn."""
-        function_name = ""
-        error_str = ""
-        lock = SoftFileLock(wdmpath + ".lock", timeout=30)
-        for _ in (True,):
-            with lock:
-                wdmfp = self._open(wdmpath, 57)
-                messfp = self.wmsgop()
-
-                if self.wdckdt(wdmfp, dsn) == 1:
-                    self._close(wdmpath)
-                    raise DSNExistsError(dsn)
-
-                # Create a new DSN.
-                # Parameters for wdlbax taken from ATCTSfile/clsTSerWDM.cls
-                self.wdlbax(
-                    wdmfp,
-                    dsn,
-                    1,  # DSTYPE - always 1 for time series
-                    10,  # NDN    - number of down pointers
-                    10,  # NUP    - number of up pointers
-                    30,  # NSA    - number of search attributes
-                    100,  # NSASP  - amount of search attribute space
-                    300,  # NDP    - number of data pointers
-                )  # PSA    - pointer to search attribute space
-
-                # Set integer attributes with FORTRAN function wdbsai.
-                for saind, salen, saval in (
-                    (34, 1, 6),  # tgroup
-                    (83, 1, 1),  # compfg
-                    (84, 1, 1),  # tsform
-                    (85, 1, 1),  # vbtime
-                    (17, 1, int(tcode)),  # tcode
-                    (33, 1, int(tsstep)),  # tsstep
-                    (27, 1, int(base_year)),  # tsbyr
-                ):
-                    retcode = self.wdbsai(wdmfp, dsn, messfp, saind, salen, saval)
-                    if retcode != 0:
-                        function_name = "wdbsai"
-                        break  # break out of for loop
-                if retcode != 0:
-                    break  # break out of with block
-
-                # Set real attributes with FORTRAN function wdbsar.
-                for saind, salen, saval in ((32, 1, tsfill),):  # tsfill
-                    retcode = self.wdbsar(wdmfp, dsn, messfp, saind, salen, saval)
-                    if retcode != 0:
-                        function_name = "wdbsar"
-                        break  # break out of for loop
-                if retcode != 0:
-                    break  # break out of with block
-
-                # Set string attributes with FORTRAN function wdbsac.
-                for saind, salen, saval, error_name in (
-                    (2, 16, statid, "Station ID"),
-                    (1, 4, tstype, "Time series type - tstype"),
-                    (45, 48, description, "Description"),
-                    (288, 8, scenario, "Scenario"),
-                    (289, 8, constituent, "Constituent"),
-                    (290, 8, location, "Location"),
-                ):
-                    saval = saval.strip()
-                    if len(saval) > salen:
-                        error_str = f"""
-                            String "{saval}" is too long for {error_name}.
-                            Must have a length equal or less than {salen}.
-                            """
-                        break
-
-                    saval = f"{saval: <{salen}}"
-                    retcode = self.wdbsac(
-                        wdmsfl=wdmfp,
-                        dsn=dsn,
-                        messfl=messfp,
-                        saind=saind,
-                        salen=salen,
-                        saval=np.array(list(saval)),
-                    )
-                    if retcode != 0:
-                        function_name = "wdbsac"
-                        break  # break out of for loop
-                if retcode != 0 or error_str:
-                    break  # break out of with block
-
-        self._close(wdmpath)
+        attributes = _label_attributes(
+            tstype=tstype,
+            base_year=base_year,
+            tcode=tcode,
+            tsstep=tsstep,
+            statid=statid,
+            scenario=scenario,
+            location=location,
+            description=description,
+            constituent=constituent,
+            tsfill=tsfill,
+        )
+        lock = self._lock(wdmpath)
+        with lock:
+            wdmfp = self._open(wdmpath, 57)
+            if self.wdckdt(wdmfp, dsn) == 1:
+                self._close(wdmpath)
+                raise DSNExistsError(dsn)
+            retcode, function_name = self._create_label(wdmfp, dsn, attributes)
+            self._close(wdmpath)
 
-        if retcode != 0 or error_str:
+        if retcode != 0:
             # Clean up the DSN if there was an error.
             # Need to be outside of the with block to delete the DSN.
             self.delete_dsn(wdmpath, dsn)
-            if error_str:
-                raise ValueError(tsutils.error_wrapper(error_str))
-            if retcode != 0:
-                self._retcode_check(
-                    retcode, additional_info=f"{function_name} file={wdmpath} DSN={dsn}"
+            self._retcode_check(
+                retcode, additional_info=f"{function_name} file={wdmpath} DSN={dsn}"
+            )
+
+    def create_new_dsns(self, wdmpath, records):
+        """Create many DSNs under one lock and one open of the WDM file.
+
+        Parameters
+        ----------
+        wdmpath : str
+            Path and WDM filename.
+        records : list
+            Each record is a dictionary with the key "dsn" and any of the
+            keyword arguments of `create_new_dsn`.  Missing keys, None, NaN
+            and empty strings for the numeric keys take the defaults of
+            `create_new_dsn`.
+
+        Returns
+        -------
+        DataFrame
+            The DSNs with a "status" column of "ok" or "error" and a
+            "message" column with the error.
+
+        The whole table is checked before the WDM file is opened, so an
+        unknown column, a DSN outside of 1 to 32000, a duplicate DSN or a
+        string too long for its attribute raises ValueError without
+        changing the file.  A DSN that already exists, or that the WDM
+        library fails to create, is reported as an error and the labels
+        created for the other records are kept.
+        """
+        labels = []
+        errors = []
+        seen = {}
+        for number, record in enumerate(records, start=1):
+            record = {
+                str(key).strip().lower(): value
+                for key, value in dict(record).items()
+                if not _missing(value)
+            }
+            try:
+                unknown = sorted(set(record) - set(_NEW_DSN_DEFAULTS) - {"dsn"})
+                if unknown:
+                    raise ValueError(f"unknown column(s) {', '.join(unknown)}")
+                if "dsn" not in record:
+                    raise ValueError("the DSN is required")
+                dsn = int(record.pop("dsn"))
+                if not 1 <= dsn <= 32000:
+                    raise ValueError(f"DSN {dsn} is not from 1 to 32000")
+                if dsn in seen:
+                    raise ValueError(f"DSN {dsn} is a duplicate of row {seen[dsn]}")
+                seen[dsn] = number
+                labels.append((dsn, _label_attributes(**record)))
+            except (TypeError, ValueError) as exc:
+                message = " ".join(str(exc).replace("*", " ").split())
+                errors.append(f"Row {number}: {message}")
+        if errors:
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    The DSN table is not valid, no DSNs were created.
+                    {" ".join(errors)}
+                    """
                 )
+            )
+
+        results = []
+        with WDMFile(wdmpath, wdm=self):
+            wdmfp = self._open(wdmpath, 57)
+            for dsn, attributes in labels:
+                status = "ok"
+                message = ""
+                try:
+                    if self.wdckdt(wdmfp, dsn) == 1:
+                        raise DSNExistsError(dsn)
+                    retcode, function_name = self._create_label(wdmfp, dsn, attributes)
+                    if retcode != 0:
+                        self.wddsdl(wdmfp, dsn)
+                        self._retcode_check(
+                            retcode,
+                            additional_info=f"{function_name} file={wdmpath} DSN={dsn}",
+                        )
+                except (WDMError, DSNExistsError, ValueError) as exc:
+                    status = "error"
+                    message = " ".join(str(exc).replace("*", " ").split())
+                results.append((dsn, status, message))
+        self._invalidate(wdmpath)
+        return pd.DataFrame(results, columns=["dsn", "status", "message"])
+
+    def _create_label(self, wdmfp, dsn, attributes):
+        """Create the label of a new DSN and set the attributes.
+
+        Returns the return code and the name of the WDM library function
+        that failed, the DSN is left half created on an error.
+        """
+        messfp = self.wmsgop()
+
+        # Create a new DSN.
+        # Parameters for wdlbax taken from ATCTSfile/clsTSerWDM.cls
+        psa = self.wdlbax(
+            wdmfp,
+            dsn,
+            1,  # DSTYPE - always 1 for time series
+            10,  # NDN    - number of down pointers
+            10,  # NUP    - number of up pointers
+            30,  # NSA    - number of search attributes
+            100,  # NSASP  - amount of search attribute space
+            300,  # NDP    - number of data pointers
+        )  # PSA    - pointer to search attribute space
+
+        # wdlbax has no return code, so check that the label was created.
+        if psa <= 0 or self.wdckdt(wdmfp, dsn) != 1:
+            return -81, "wdlbax"
+
+        for function_name, saind, salen, saval in attributes:
+            if function_name == "wdbsac":
+                retcode = self.wdbsac(
+                    wdmsfl=wdmfp,
+                    dsn=dsn,
+                    messfl=messfp,
+                    saind=saind,
+                    salen=salen,
+                    saval=np.array(list(saval)),
+                )
+            else:
+                retcode = getattr(self, function_name)(
+                    wdmfp, dsn, messfp, saind, salen, saval
+                )
+            if retcode != 0:
+                return retcode, function_name
+        return 0, ""
 
     def _tcode_date(self, tcode, date):
         """Use tcode to set the significant parts of the date tuple."""
@@ -627,24 +1525,18 @@ class WDM:
 
     def write_dsn(self, wdmpath, dsn, data):
         """Write to self.wdmfp/dsn the time-series data."""
-        desc_dsn = self.describe_dsn(
-            wdmpath, dsn, attrs=["TCODE", "TSSTEP", "TSFILL", "TSBYR"]
+        tsfill = self.dsn_metadata(wdmpath, dsn)["TSFILL"]
+        self._write_values(
+            wdmpath, dsn, pd.Timestamp(data.index[0]), _float32_values(data, tsfill)
         )
+
+    def _write_values(self, wdmpath, dsn, start_date, values):
+        """Write float32 values to a DSN starting at start_date."""
+        desc_dsn = self.dsn_metadata(wdmpath, dsn)
         tcode = desc_dsn["TCODE"]
         tsstep = desc_dsn["TSSTEP"]
-        tsfill = desc_dsn["TSFILL"]
         tsbyr = desc_dsn["TSBYR"]
 
-        # This next line correctly converts dtype where in some situations
-        # convert_dtypes does not.  It is ugly and I want it to go away.
-        # Addresses a rare situation where data is kept (for an unknown reason)
-        # as object dtype instead of float or int.  This solution was found on
-        # https://stackoverflow.com/questions/65915048/pandas-convert-dtypes-not-working-on-numbers-marked-as-objects
-        data = pd.read_csv(StringIO(data.to_csv()), index_col=0, parse_dates=True)
-
-        data.fillna(tsfill, inplace=True)
-        start_date = data.index[0]
-
         dstart_date = start_date.timetuple()[:6]
         llsdat = self._tcode_date(tcode, dstart_date)
         if tsbyr > llsdat[0]:
@@ -658,16 +1550,257 @@ class WDM:
                 )
             )
 
-        nval = len(data)
-        lock = SoftFileLock(wdmpath + ".lock", timeout=30)
+        nval = len(values)
+        lock = self._lock(wdmpath)
         with lock:
             wdmfp = self._open(wdmpath, 58)
-            retcode = self.wdtput(wdmfp, dsn, tsstep, llsdat, nval, 1, 0, tcode, data)
+            retcode = self.wdtput(wdmfp, dsn, tsstep, llsdat, nval, 1, 0, tcode, values)
             self._close(wdmpath)
         self._retcode_check(retcode, additional_info=f"wdtput file={wdmpath} DSN={dsn}")
 
-    def read_dsn(self, wdmpath, dsn, start_date=None, end_date=None):
-        """Read from a DSN."""
+    def write_arrow(self, wdmpath, data, dsns=None):
+        """Write an Arrow table or a stream of record batches to DSNs.
+
+        Parameters
+        ----------
+        wdmpath : str
+            Path and WDM filename.
+        data
+            A pyarrow Table or RecordBatch, or an iterable of RecordBatches
+            such as `pyarrow.dataset.Dataset.to_batches()`.  In the long
+            layout the columns are "datetime", "dsn" and "value".  In the
+            wide layout there is a "datetime" column and every other column
+            is a DSN.  The batches must be in time order for each DSN.
+        dsns : dict
+            [optional, default is to use the DSN numbers in the data]
+
+            Mapping of the wide column names, or of the values of the long
+            "dsn" column, to the DSNs to write to.  Anything not in the
+            mapping is skipped.
+
+        A DSN that does not exist is created from its entry in the
+        "wdmtoolbox.attributes" schema metadata written by `to_arrow`.  The
+        values are converted to float32 with nulls set to TSFILL and written
+        with wdtput, with TSFILL written for missing time steps.
+        """
+        pa = _pyarrow()
+        if isinstance(data, (pa.Table, pa.RecordBatch)):
+            data = data.to_batches() if isinstance(data, pa.Table) else [data]
+
+        def target(key):
+            """Return the DSN to write key to, or None to skip it."""
+            if dsns is None:
+                return int(key)
+            for name in (key, str(key)):
+                if name in dsns:
+                    return int(dsns[name])
+            return None
+
+        ends = {}
+        created = set()
+        with WDMFile(wdmpath, wdm=self):
+            for batch in data:
+                metadata = batch.schema.metadata or {}
+                attributes = json.loads(
+                    metadata.get(b"wdmtoolbox.attributes", b"{}").decode("utf-8")
+                )
+                # Create every DSN in the metadata, even those without data.
+                for key, label in attributes.items():
+                    dsn = target(key)
+                    if dsn is not None and dsn not in created:
+                        created.add(dsn)
+                        self._create_from_attributes(wdmpath, dsn, label)
+
+                dates = (
+                    batch.column("datetime")
+                    .cast(pa.timestamp("s"))
+                    .to_numpy(zero_copy_only=False)
+                )
+                if "dsn" in batch.schema.names and "value" in batch.schema.names:
+                    keys = batch.column("dsn").to_numpy(zero_copy_only=False)
+                    order = np.argsort(keys, kind="stable")
+                    keys, first = np.unique(keys[order], return_index=True)
+                    values = batch.column("value")
+                    columns = [
+                        (key, order[start:stop])
+                        for key, start, stop in zip(
+                            keys, first, list(first[1:]) + [len(order)]
+                        )
+                    ]
+                else:
+                    values = None
+                    columns = [
+                        (name, None)
+                        for name in batch.schema.names
+                        if name != "datetime"
+                    ]
+
+                for key, rows in columns:
+                    dsn = target(key)
+                    if dsn is None:
+                        continue
+                    if dsn not in created:
+                        created.add(dsn)
+                        self._create_from_attributes(wdmpath, dsn, None)
+                    column = batch.column(key) if values is None else values.take(rows)
+                    ends[dsn] = self._write_column(
+                        wdmpath,
+                        dsn,
+                        dates if rows is None else dates[rows],
+                        column,
+                        ends.get(dsn),
+                    )
+
+    def _create_from_attributes(self, wdmpath, dsn, attributes):
+        """Create the DSN from the attributes written by `to_arrow`."""
+        if self.wdckdt(self._open(wdmpath, 57, ronwfg=1), dsn) == 1:
+            return
+        if not attributes:
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    DSN {dsn} does not exist in {wdmpath} and there are no
+                    attributes for it in the "wdmtoolbox.attributes" schema
+                    metadata to create it.
+                    """
+                )
+            )
+        self.create_new_dsn(
+            wdmpath,
+            dsn,
+            **{
+                keyword: attributes[name]
+                for name, keyword in _ARROW_LABEL.items()
+                if name in attributes
+            },
+        )
+
+    def _write_column(self, wdmpath, dsn, dates, column, end=None):
+        """Write one Arrow column of values at dates to the DSN.
+
+        Nulls are dropped, so in the wide layout a DSN can have a longer
+        time step than the dates, and the remaining dates must be on the
+        time step of the DSN.  Missing time steps, and the time steps from
+        `end`, the date after the last value written by the previous call,
+        are filled with TSFILL.  Returns the date after the last value.
+        """
+        pa = _pyarrow()
+
+        valid = column.is_valid().to_numpy(zero_copy_only=False)
+        if not valid.all():
+            column = column.filter(pa.array(valid))
+            dates = dates[valid]
+        if len(dates) == 0:
+            return end
+
+        desc_dsn = self.dsn_metadata(wdmpath, dsn)
+        tcode = desc_dsn["TCODE"]
+        tsstep = desc_dsn["TSSTEP"]
+        tsfill = desc_dsn["TSFILL"]
+
+        start = dates[0] if end is None else end
+        if list(_llsdat(start)) != self._tcode_date(tcode, _llsdat(start)):
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    The first date {start} for DSN {dsn} is not on the time
+                    step of the DSN, TCODE={tcode}.
+                    """
+                )
+            )
+        if end is not None and dates[0] < end:
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    The data for DSN {dsn} must be in time order.  The date
+                    {dates[0]} is before the end of the data already written,
+                    {end}.
+                    """
+                )
+            )
+        values = np.ascontiguousarray(
+            column.cast(pa.float32()).to_numpy(zero_copy_only=False), dtype=np.float32
+        )
+        nval = _timdif(start, dates[-1], tcode, tsstep) + 1
+        expected = _dates(start, tcode, tsstep, nval)
+        position = np.searchsorted(expected, dates).clip(max=nval - 1)
+        if not np.array_equal(expected[position], dates):
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    The dates for DSN {dsn} are not on the time step of the
+                    DSN, TCODE={tcode} and TSSTEP={tsstep}.
+                    """
+                )
+            )
+        if nval != len(values):
+            filled = np.full(nval, np.float32(tsfill), dtype=np.float32)
+            filled[position] = values
+            values = filled
+        self._write_values(wdmpath, dsn, pd.Timestamp(start), values)
+        return _timadd(start, tcode, tsstep, nval)
+
+    def read_dsn(
+        self,
+        wdmpath,
+        dsn,
+        start_date=None,
+        end_date=None,
+        tcode=None,
+        tsstep=None,
+        transform=None,
+    ):
+        """Read from a DSN.
+
+        With tcode or tsstep the values are aggregated by the WDM library
+        (wdtget) to tsstep intervals of tcode units instead of being read
+        at the time step of the DSN.  The transform is "mean" (the
+        default), "sum", "max" or "min".  Only whole intervals within the
+        period of record are returned.
+        """
+        dataout, llsdat, tcode, tsstep, tsfill, start_date, end_date = (
+            self._read_values(
+                wdmpath,
+                dsn,
+                start_date=start_date,
+                end_date=end_date,
+                tcode=tcode,
+                tsstep=tsstep,
+                transform=transform,
+            )
+        )
+        if len(dataout) == 0:
+            return pd.DataFrame()
+
+        return _dsn_frame(
+            dataout,
+            llsdat,
+            tcode,
+            tsstep,
+            tsfill,
+            f"{Path(wdmpath).stem}_DSN_{dsn}",
+            start_date=start_date,
+            end_date=end_date,
+        )
+
+    def _read_values(
+        self,
+        wdmpath,
+        dsn,
+        start_date=None,
+        end_date=None,
+        tcode=None,
+        tsstep=None,
+        transform=None,
+    ):
+        """Read the float32 values of a DSN within a window.
+
+        Returns the values, the date of the first value as the date array
+        used by the WDM library, TCODE, TSSTEP, TSFILL, and the start and
+        end dates of the window as checked by `_check_window`.  With tcode
+        or tsstep, wdtget aggregates the values to that time step with the
+        transform, see `read_dsn`.
+        """
         if not Path(wdmpath).exists():
             raise ValueError(
                 tsutils.error_wrapper(
@@ -677,14 +1810,25 @@ class WDM:
                 )
             )
 
-        # Call wdatim_ to get TSSTEP, TCODE, TSFILL
-        desc_dsn = self.describe_dsn(wdmpath, dsn, attrs=["TCODE", "TSSTEP", "TSFILL"])
+        # TSSTEP, TCODE, TSFILL and the period of record
+        desc_dsn = self.dsn_metadata(wdmpath, dsn)
 
         llsdat = desc_dsn["llsdat"]
         lledat = desc_dsn["lledat"]
-        tcode = desc_dsn["TCODE"]
-        tsstep = desc_dsn["TSSTEP"]
         tsfill = desc_dsn["TSFILL"]
+        dtran = _transform(transform)
+        aggregate = tcode is not None or tsstep is not None
+        tcode = desc_dsn["TCODE"] if tcode is None else int(tcode)
+        tsstep = desc_dsn["TSSTEP"] if tsstep is None else int(tsstep)
+        if tcode not in _MAPTCODE or tsstep < 1:
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    The tcode must be from 1 to 6 and the tsstep must be 1 or
+                    more.  You gave tcode={tcode} and tsstep={tsstep}.
+                    """
+                )
+            )
 
         if tsfill == _NOTPRESENT:
             tsfill = -999
@@ -693,37 +1837,15 @@ class WDM:
         self.timcvt(llsdat)
         self.timcvt(lledat)
 
-        if start_date is not None:
-            start_date = self.dateconverter(start_date)
-            start_date = datetime.datetime(*start_date)
-            if start_date > datetime.datetime(*lledat):
-                raise ValueError(
-                    tsutils.error_wrapper(
-                        f"""
-                        The requested start date ({start_date}) is after the
-                        end date ({datetime.datetime(*lledat)}) of the time
-                        series in the WDM file.
-                        """
-                    )
-                )
-
-        if end_date is not None:
-            end_date = self.dateconverter(end_date)
-            end_date = datetime.datetime(*end_date)
-            if end_date < datetime.datetime(*llsdat):
-                raise ValueError(
-                    tsutils.error_wrapper(
-                        f"""
-                        The requested end date ({end_date}) is before the start
-                        date ({datetime.datetime(*llsdat)}) of the time series
-                        in the WDM file.
-                        """
-                    )
-                )
+        start_date, end_date = _check_window(start_date, end_date, llsdat, lledat)
 
-        iterm = self.timdif(llsdat, lledat, tcode, tsstep)
+        if aggregate and np.any(llsdat):
+            # Start at the first whole interval of the aggregated time step.
+            llsdat = _llsdat(
+                _align(np.datetime64(datetime.datetime(*llsdat), "s"), tcode, tsstep)
+            )
+        llsdat, iterm = _window(llsdat, lledat, tcode, tsstep, start_date, end_date)
 
-        dtran = 0
         qualfg = 30
         # Get the data and put it into dictionary
         wdmfp = self._open(wdmpath, 59, ronwfg=1)
@@ -732,44 +1854,267 @@ class WDM:
         )
         self._close(wdmpath)
 
-        if len(dataout) == 0:
-            return pd.DataFrame()
-
-        self._retcode_check(retcode, additional_info=f"wdtget file={wdmpath} DSN={dsn}")
-
-        try:
-            index = pd.date_range(
-                datetime.datetime(*llsdat),
-                periods=iterm,
-                freq=f"{tsstep:d}{_MAPTCODE[tcode]}",
-            )
-        except FutureWarning:
-            index = pd.date_range(
-                datetime.datetime(*llsdat),
-                periods=iterm,
-                freq=f"{tsstep:d}{_MAPTCODE[tcode]}",
+        if len(dataout) != 0:
+            self._retcode_check(
+                retcode, additional_info=f"wdtget file={wdmpath} DSN={dsn}"
             )
-
-        # Convert time series to pandas DataFrame
-        tmpval = pd.DataFrame(
-            pd.Series(dataout, index=index, name=f"{Path(wdmpath).stem}_DSN_{dsn}"),
-            dtype=np.float64,
+        return dataout, llsdat, tcode, tsstep, tsfill, start_date, end_date
+
+    def read_array(self, wdmpath, dsn, start_date=None, end_date=None, out=None):
+        """Read the float32 values of a DSN without pandas.
+
+        Parameters
+        ----------
+        wdmpath : str
+            Path and WDM filename.
+        dsn : int
+            The DSN to read.
+        start_date : str
+            [optional, default is the start of the data]
+        end_date : str
+            [optional, default is the end of the data]
+        out : numpy.ndarray
+            [optional, default is a new array]
+
+            A contiguous float32 array to read the values into.  It must be
+            at least as long as the window, and the returned values are a
+            view of its first elements.
+
+        Returns
+        -------
+        DSNArray
+            A named tuple of the float32 values, the datetime64 date of the
+            first value, the timedelta64 time step and the mask of missing
+            (TSFILL) values.
+
+        The label of the DSN comes from the `dsn_metadata` cache, so reading
+        the same DSNs many times, best inside a `WDMFile` session, only
+        costs the wdtget call.
+        """
+        dataout, llsdat, tcode, tsstep, tsfill, start_date, end_date = (
+            self._read_values(wdmpath, dsn, start_date=start_date, end_date=end_date)
         )
+        step = _step(tcode, tsstep)
+        start = np.datetime64("NaT", "s")
+        if len(dataout):
+            start = np.datetime64(datetime.datetime(*llsdat), "s")
+            # A window between two values still reads one value.
+            if len(dataout) == 1 and (
+                (start_date is not None and start < np.datetime64(start_date, "s"))
+                or (end_date is not None and start > np.datetime64(end_date, "s"))
+            ):
+                dataout = dataout[:0]
+
+        if out is not None:
+            if out.dtype != np.float32 or out.ndim != 1 or len(out) < len(dataout):
+                raise ValueError(
+                    tsutils.error_wrapper(
+                        f"""
+                        The out array must be a one dimensional float32 array
+                        with at least {len(dataout)} elements.  You gave a
+                        {out.dtype} array with shape {out.shape}.
+                        """
+                    )
+                )
+            values = out[: len(dataout)]
+            values[:] = dataout
+        else:
+            values = dataout
+        return DSNArray(values, start, step, values == np.float32(tsfill))
 
-        tmpval = tsutils.common_kwds(
-            input_tsd=tmpval, start_date=start_date, end_date=end_date
+    def to_arrow(
+        self, wdmpath, dsns=None, layout="long", start_date=None, end_date=None
+    ):
+        """Read DSNs into an Arrow table.
+
+        Parameters
+        ----------
+        wdmpath : str
+            Path and WDM filename.
+        dsns : list
+            [optional, default is all time-series DSNs in the WDM file]
+
+            The DSNs to read.
+        layout : str
+            [optional, default is "long"]
+
+            "long" for the columns "datetime", "dsn" and "value", or "wide"
+            for a "datetime" column and one column for each DSN named by
+            the DSN number.
+        start_date : str
+            [optional, default is the start of the data]
+        end_date : str
+            [optional, default is the end of the data]
+
+        Returns
+        -------
+        pyarrow.Table
+            The values are float32 as stored in the WDM file, with missing
+            values (TSFILL) as null.  The schema metadata key
+            "wdmtoolbox.attributes" is a JSON object of the label
+            attributes of each DSN, keyed by DSN.
+        """
+        pa = _pyarrow()
+        tables = list(
+            self.arrow_years(
+                wdmpath,
+                dsns=dsns,
+                layout=layout,
+                start_date=start_date,
+                end_date=end_date,
+            )
         )
-        tmpval.replace(tsfill, np.nan, inplace=True)
-        tmpval.index.name = "Datetime"
-        return tmpval
+        if len(tables) == 1:
+            return tables[0]
+        return pa.concat_tables(tables)
+
+    def arrow_years(
+        self, wdmpath, dsns=None, layout="long", start_date=None, end_date=None
+    ):
+        """Read DSNs into one Arrow table for each calendar year.
+
+        Takes the same arguments and yields tables with the same schema as
+        `to_arrow`, reading one year of every DSN at a time so that the
+        memory used does not grow with the length of the period of record.
+        Always yields at least one, possibly empty, table.
+        """
+        pa = _pyarrow()
+        if layout not in ("long", "wide"):
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    The layout must be "long" or "wide", you gave "{layout}".
+                    """
+                )
+            )
+        with WDMFile(wdmpath, readonly=True, wdm=self):
+            table = self.describe_dsns(wdmpath, dsns=dsns, attrs="all")
+            attributes = {}
+            for dsn, row in table.iterrows():
+                attributes[str(dsn)] = {
+                    name: (
+                        float(str(np.float32(value)))
+                        if ATTRIBUTES[INDEX_BY_NAME[name]][1] == 2
+                        else value.item()
+                        if hasattr(value, "item")
+                        else value
+                    )
+                    for name, value in row.items()
+                    if name in INDEX_BY_NAME and not pd.isna(value)
+                }
+            metadata = {
+                "wdmtoolbox.layout": layout,
+                "wdmtoolbox.attributes": json.dumps(attributes),
+            }
+            if layout == "long":
+                schema = pa.schema(
+                    [
+                        ("datetime", pa.timestamp("s")),
+                        ("dsn", pa.int32()),
+                        ("value", pa.float32()),
+                    ],
+                    metadata=metadata,
+                )
+            else:
+                schema = pa.schema(
+                    [("datetime", pa.timestamp("s"))]
+                    + [(str(dsn), pa.float32()) for dsn in table.index],
+                    metadata=metadata,
+                )
+
+            starts = table["start_date"].dropna()
+            ends = table["end_date"].dropna()
+            if start_date is not None:
+                starts = starts.clip(lower=pd.Timestamp(start_date))
+            if end_date is not None:
+                ends = ends.clip(upper=pd.Timestamp(end_date))
+            years = []
+            if len(starts) and starts.min() <= ends.max():
+                years = range(starts.min().year, ends.max().year + 1)
+            empty = True
+            for year in years:
+                first = pd.Timestamp(year, 1, 1)
+                last = pd.Timestamp(year + 1, 1, 1) - pd.Timedelta(1, "s")
+                if start_date is not None:
+                    first = max(first, pd.Timestamp(start_date))
+                if end_date is not None:
+                    last = min(last, pd.Timestamp(end_date))
+                columns = []
+                for dsn in table.index:
+                    if not (
+                        table.loc[dsn, "start_date"] <= last
+                        and table.loc[dsn, "end_date"] > first
+                    ):
+                        continue
+                    dataout, llsdat, tcode, tsstep, tsfill, _, _ = self._read_values(
+                        wdmpath, dsn, start_date=first, end_date=last
+                    )
+                    dates = _dates(
+                        np.datetime64(datetime.datetime(*llsdat), "s"),
+                        tcode,
+                        tsstep,
+                        len(dataout),
+                    )
+                    keep = (dates >= np.datetime64(first, "s")) & (
+                        dates <= np.datetime64(last, "s")
+                    )
+                    if keep.any():
+                        columns.append((dsn, dates[keep], dataout[keep], tsfill))
+                if not columns:
+                    continue
+
+                empty = False
+                if layout == "long":
+                    arrays = [
+                        np.concatenate([dates for _, dates, _, _ in columns]),
+                        np.concatenate(
+                            [np.full(len(dates), dsn) for dsn, dates, _, _ in columns]
+                        ).astype(np.int32),
+                        np.concatenate([values for _, _, values, _ in columns]),
+                    ]
+                    missing = np.concatenate(
+                        [values == tsfill for _, _, values, tsfill in columns]
+                    )
+                    yield pa.table(
+                        [
+                            pa.array(arrays[0], type=pa.timestamp("s")),
+                            pa.array(arrays[1]),
+                            pa.array(arrays[2], mask=missing, type=pa.float32()),
+                        ],
+                        schema=schema,
+                    )
+                else:
+                    index = np.unique(
+                        np.concatenate([dates for _, dates, _, _ in columns])
+                    )
+                    found = {dsn: rest for dsn, *rest in columns}
+                    arrays = [pa.array(index, type=pa.timestamp("s"))]
+                    for dsn in table.index:
+                        values = np.zeros(len(index), dtype=np.float32)
+                        missing = np.ones(len(index), dtype=bool)
+                        if dsn in found:
+                            dates, dataout, tsfill = found[dsn]
+                            position = np.searchsorted(index, dates)
+                            values[position] = dataout
+                            missing[position] = dataout == tsfill
+                        arrays.append(pa.array(values, mask=missing, type=pa.float32()))
+                    yield pa.table(arrays, schema=schema)
+            if empty:
+                yield schema.empty_table()
 
     def read_dsn_por(self, wdmpath, dsn):
         """Read the period of record for a DSN."""
         return self.read_dsn(wdmpath, dsn)
 
     def _close(self, wdmpath):
-        """Close the WDM file."""
+        """Close the WDM file.
+
+        Files held open by a `WDMFile` session stay open until the session
+        is closed.
+        """
         wdmpath = str(wdmpath).strip()
+        if wdmpath in self.heldfiles:
+            return
         if wdmpath in self.openfiles:
             retcode = self.wdflcl(self.openfiles[wdmpath])
             self._retcode_check(
@@ -778,6 +2123,473 @@ class WDM:
             self.openfiles.pop(wdmpath)
 
 
+class WDMFile:
+    """Hold a WDM file open across many operations.
+
+    Every method on `WDM` opens and closes the WDM file around a single call
+    into the WDM library, and every write acquires the file lock.  A
+    `WDMFile` opens the WDM file and the message file once, holds the lock
+    for the life of a writeable session, and exposes the same operations
+    without the WDM path argument::
+
+        with WDMFile("model.wdm") as wdm:
+            for dsn in range(101, 200):
+                wdm.set_attribute(dsn, "IDSCEN", "BASE")
+
+    Parameters
+    ----------
+    wdmpath : str
+        Path and WDM filename.
+    readonly : bool
+        [optional, default is False]
+
+        Open the WDM file read only.  A read only session does not acquire
+        the file lock and raises `WDMError` on any write.
+    wdm : WDM
+        [optional, default is a new WDM instance]
+
+        The WDM instance to run the operations through.
+    """
+
+    def __init__(self, wdmpath, readonly=False, wdm=None):
+        """Initialize the session, the WDM file is opened on enter."""
+        self.wdmpath = str(wdmpath).strip()
+        self.readonly = readonly
+        self.wdm = WDM() if wdm is None else wdm
+        self.isopen = False
+
+    def __enter__(self):
+        """Open the session."""
+        return self.open()
+
+    def __exit__(self, *args):
+        """Close the session."""
+        self.close()
+
+    def open(self):
+        """Open the WDM file and the message file."""
+        if not self.isopen:
+            self.wdm._hold(_MESSAGE_WDM, readonly=True)
+            try:
+                self.wdm._hold(self.wdmpath, readonly=self.readonly)
+            except Exception:
+                self.wdm._release(_MESSAGE_WDM)
+                raise
+            self.isopen = True
+        return self
+
+    def close(self):
+        """Close the WDM file and the message file."""
+        if self.isopen:
+            self.isopen = False
+            try:
+                self.wdm._release(self.wdmpath)
+            finally:
+                self.wdm._release(_MESSAGE_WDM)
+
+    def __getitem__(self, dsn):
+        """Return a lazy `DSN` view of the DSN."""
+        return DSN(self, dsn)
+
+    def describe_dsn(self, dsn, attrs="default"):
+        """Collect metadata about the DSN, see `WDM.describe_dsn`."""
+        return self.wdm.describe_dsn(self.wdmpath, dsn, attrs=attrs)
+
+    def read_dsn(
+        self,
+        dsn,
+        start_date=None,
+        end_date=None,
+        tcode=None,
+        tsstep=None,
+        transform=None,
+    ):
+        """Read from a DSN, see `WDM.read_dsn`."""
+        return self.wdm.read_dsn(
+            self.wdmpath,
+            dsn,
+            start_date=start_date,
+            end_date=end_date,
+            tcode=tcode,
+            tsstep=tsstep,
+            transform=transform,
+        )
+
+    def write_dsn(self, dsn, data):
+        """Write time-series data to a DSN, see `WDM.write_dsn`."""
+        self.wdm.write_dsn(self.wdmpath, dsn, data)
+
+    def write_arrow(self, data, dsns=None):
+        """Write Arrow data to DSNs, see `WDM.write_arrow`."""
+        self.wdm.write_arrow(self.wdmpath, data, dsns=dsns)
+
+    def set_attribute(self, dsn, attrib_name, attrib_val):
+        """Set attribute of the DSN, see `WDM.set_attribute`."""
+        self.wdm.set_attribute(self.wdmpath, dsn, attrib_name, attrib_val)
+
+    def read_array(self, dsn, start_date=None, end_date=None, out=None):
+        """Read the float32 values of a DSN, see `WDM.read_array`."""
+        return self.wdm.read_array(
+            self.wdmpath, dsn, start_date=start_date, end_date=end_date, out=out
+        )
+
+    def to_arrow(self, dsns=None, layout="long", start_date=None, end_date=None):
+        """Read DSNs into an Arrow table, see `WDM.to_arrow`."""
+        return self.wdm.to_arrow(
+            self.wdmpath,
+            dsns=dsns,
+            layout=layout,
+            start_date=start_date,
+            end_date=end_date,
+        )
+
+    def create_new_dsn(self, dsn, **kwds):
+        """Create a new DSN, see `WDM.create_new_dsn`."""
+        self.wdm.create_new_dsn(self.wdmpath, dsn, **kwds)
+
+    def create_new_dsns(self, records):
+        """Create many new DSNs, see `WDM.create_new_dsns`."""
+        return self.wdm.create_new_dsns(self.wdmpath, records)
+
+    def copy_dsn(self, indsn, outwdmpath, outdsn, start_date=None, end_date=None):
+        """Copy a DSN to outwdmpath, which can be this file, see `WDM.copy_dsn`."""
+        self.wdm.copy_dsn(self.wdmpath, indsn, outwdmpath, outdsn, start_date, end_date)
+
+    def delete_dsn(self, dsn):
+        """Delete a DSN, see `WDM.delete_dsn`."""
+        self.wdm.delete_dsn(self.wdmpath, dsn)
+
+    def renumber_dsn(self, odsn, ndsn):
+        """Renumber the odsn to the ndsn, see `WDM.renumber_dsn`."""
+        self.wdm.renumber_dsn(self.wdmpath, odsn, ndsn)
+
+
+class WDMWriter(WDMFile):
+    """Append time-series data to a DSN one chunk at a time.
+
+    Each chunk is written with its own wdtput call while the WDM file stays
+    open and locked, so a long series can be written without holding all
+    of it in memory::
+
+        with WDMWriter("model.wdm", 101) as writer:
+            for chunk in pd.read_csv("flow.csv", index_col=0,
+                                     parse_dates=True, chunksize=100000):
+                writer.append(chunk)
+
+    The writer has to be opened, with `with` or `open`, before the first
+    `append`, and `close` releases the WDM file and the lock.  The dates of
+    every chunk must fall on the TCODE and TSSTEP of the DSN, chunks must be
+    in time order, and each chunk must start after the end of the data
+    already in the DSN.  Dates missing from a chunk or between chunks are
+    written as the TSFILL of the DSN.  A time zone aware index is written
+    as local time.
+
+    Parameters
+    ----------
+    wdmpath : str
+        Path and WDM filename.
+    dsn : int
+        The DSN to append to.
+    wdm : WDM
+        [optional, default is a new WDM instance]
+
+        The WDM instance to run the operations through.
+    """
+
+    def __init__(self, wdmpath, dsn, wdm=None):
+        """Initialize the writer, the WDM file is opened on enter."""
+        super().__init__(wdmpath, wdm=wdm)
+        self.dsn = int(dsn)
+        self.nval = 0
+        self.tcode = None
+        self.tsstep = None
+        self.next_date = None
+
+    def open(self):
+        """Open the WDM file and read the time step and end of the DSN."""
+        if not self.isopen:
+            super().open()
+            try:
+                label = self.wdm.dsn_metadata(self.wdmpath, self.dsn)
+            except Exception:
+                self.close()
+                raise
+            self.tcode = label["TCODE"]
+            self.tsstep = label["TSSTEP"]
+            self.next_date = None
+            if "lledat" in label:
+                self.wdm.timcvt(label["lledat"])
+                try:
+                    self.next_date = np.datetime64(
+                        datetime.datetime(*label["lledat"]), "s"
+                    )
+                except ValueError:
+                    pass
+        return self
+
+    def append(self, chunk):
+        """Write the chunk of data after the data already in the DSN."""
+        if not self.isopen:
+            raise WDMError(
+                tsutils.error_wrapper(
+                    f"""
+                    The WDMWriter for DSN {self.dsn} in "{self.wdmpath}" is
+                    not open.  Use it in a `with` statement or call `open`
+                    before `append`.
+                    """
+                )
+            )
+        if len(chunk) == 0:
+            return
+        index = pd.DatetimeIndex(chunk.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        dates = index.values.astype("datetime64[s]")
+        if not (index.is_monotonic_increasing and index.is_unique):
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    The dates of a chunk written to DSN {self.dsn} must be
+                    unique and in time order.
+                    """
+                )
+            )
+        if self.next_date is not None and dates[0] < self.next_date:
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    The chunk starting at {dates[0]} overlaps the data in
+                    DSN {self.dsn}, which ends before {self.next_date}.
+                    """
+                )
+            )
+        start = dates[0] if self.next_date is None else self.next_date
+        nval = _timdif(start, dates[-1], self.tcode, self.tsstep) + 1
+        grid = _dates(start, self.tcode, self.tsstep, nval)
+        misaligned = ~np.isin(dates, grid)
+        if misaligned.any():
+            raise ValueError(
+                tsutils.error_wrapper(
+                    f"""
+                    The dates {", ".join(str(i) for i in dates[misaligned][:3])}
+                    are not on the time step of DSN {self.dsn}, TCODE
+                    {self.tcode} and TSSTEP {self.tsstep}, starting at
+                    {start}.
+                    """
+                )
+            )
+        data = pd.DataFrame(chunk.values, index=dates, columns=chunk.columns)
+        self.wdm.write_dsn(self.wdmpath, self.dsn, data.reindex(grid))
+        self.nval += nval
+        self.next_date = _timadd(grid[-1], self.tcode, self.tsstep, 1)
+
+
+class DSN:
+    """A lazy view of one DSN of a `WDMFile`.
+
+    Returned by ``WDMFile(wdmpath)[dsn]``.  The label (TCODE, TSSTEP,
+    TSFILL and the period of record) is read once on first use.  Slicing
+    with `loc` only narrows the window, and `len`, `index`, `start` and
+    `end` are computed from the label, so the data records are only read
+    by `values` and `to_frame`::
+
+        with WDMFile("model.wdm", readonly=True) as wdm:
+            flow = wdm[101].loc["2001-06":"2001-07"]
+            flow.values
+
+    Partial dates in a `loc` slice cover the whole period, so
+    "2001-07" as the end of a slice is the end of July.
+
+    Parameters
+    ----------
+    wdmfile : WDMFile
+        The WDM file session.
+    dsn : int
+        The DSN.
+    start_date
+        [optional, default is the start of the data]
+    end_date
+        [optional, default is the end of the data]
+    """
+
+    def __init__(self, wdmfile, dsn, start_date=None, end_date=None, label=None):
+        """Initialize the view, nothing is read from the WDM file."""
+        self.wdmfile = wdmfile
+        self.dsn = int(dsn)
+        self.start_date = (
+            None if start_date is None else _loc_date(start_date, "start_time")
+        )
+        self.end_date = None if end_date is None else _loc_date(end_date, "end_time")
+        self._label = label
+        self._span = None
+
+    @property
+    def label(self):
+        """TCODE, TSSTEP, TSFILL, TSBYR and the period of record."""
+        if self._label is None:
+            self._label = self.wdmfile.wdm.dsn_metadata(self.wdmfile.wdmpath, self.dsn)
+            self.wdmfile.wdm.timcvt(self._label["llsdat"])
+            self.wdmfile.wdm.timcvt(self._label["lledat"])
+        return self._label
+
+    @property
+    def step(self):
+        """The time step as a numpy.timedelta64."""
+        return _step(self.label["TCODE"], self.label["TSSTEP"])
+
+    def _window(self):
+        """Return the date of the first value and the number of values."""
+        if self._span is None:
+            label = self.label
+            llsdat, nval = _window(
+                label["llsdat"],
+                label["lledat"],
+                label["TCODE"],
+                label["TSSTEP"],
+                self.start_date,
+                self.end_date,
+            )
+            start = np.datetime64("NaT", "s")
+            if nval:
+                start = np.datetime64(datetime.datetime(*llsdat), "s")
+                if (self.start_date is not None and start < self.start_date) or (
+                    self.end_date is not None and start > self.end_date
+                ):
+                    nval = 0
+            self._span = (start, nval)
+        return self._span
+
+    @property
+    def start(self):
+        """The date of the first value, NaT if there are none."""
+        return self._window()[0] if len(self) else np.datetime64("NaT", "s")
+
+    @property
+    def end(self):
+        """The date of the last value, NaT if there are none."""
+        if not len(self):
+            return np.datetime64("NaT", "s")
+        start, nval = self._window()
+        return _timadd(start, self.label["TCODE"], self.label["TSSTEP"], nval - 1)
+
+    def __len__(self):
+        """Return the number of values in the window."""
+        return self._window()[1]
+
+    def __repr__(self):
+        """Describe the view without reading the data."""
+        return (
+            f"DSN({self.wdmfile.wdmpath!r}, {self.dsn}, start={self.start}, "
+            f"end={self.end}, step={self.step}, len={len(self)})"
+        )
+
+    @property
+    def index(self):
+        """The DatetimeIndex of the values in the window."""
+        if not len(self):
+            return pd.DatetimeIndex([], name="Datetime")
+        return pd.date_range(
+            self.start.astype(datetime.datetime),
+            periods=len(self),
+            freq=f"{self.label['TSSTEP']:d}{_MAPTCODE[self.label['TCODE']]}",
+            name="Datetime",
+        )
+
+    def read_array(self, out=None):
+        """Read the window, see `WDM.read_array`."""
+        if not len(self):
+            values = np.zeros(0, dtype=np.float32) if out is None else out[:0]
+            return DSNArray(values, self.start, self.step, np.zeros(0, dtype=bool))
+        return self.wdmfile.read_array(
+            self.dsn, start_date=self.start, end_date=self.end, out=out
+        )
+
+    @property
+    def values(self):
+        """The float32 values in the window with missing values as NaN."""
+        data = self.read_array()
+        values = data.values
+        values[data.missing] = np.nan
+        return values
+
+    def __array__(self, dtype=None, copy=None):
+        """Return `values` for numpy.
+
+        The values are always copied out of the WDM file, so copy=False
+        raises ValueError.
+        """
+        if copy is False:
+            raise ValueError(
+                tsutils.error_wrapper(
+                    """
+                    The values of a DSN are read from the WDM file and cannot
+                    be returned without a copy.
+                    """
+                )
+            )
+        if dtype is None:
+            return self.values
+        return self.values.astype(dtype, copy=False)
+
+    def to_frame(self):
+        """Read the window as the DataFrame returned by `WDM.read_dsn`."""
+        if not len(self):
+            return pd.DataFrame()
+        return self.wdmfile.read_dsn(self.dsn, start_date=self.start, end_date=self.end)
+
+    @property
+    def loc(self):
+        """Narrow the window by date, `dsn.loc[start:end]`."""
+        return _DSNLocator(self)
+
+
+class _DSNLocator:
+    """The `DSN.loc` indexer."""
+
+    def __init__(self, dsn):
+        self.dsn = dsn
+
+    def __getitem__(self, key):
+        """Return a DSN narrowed to a slice of dates, or the value at a date."""
+        if not isinstance(key, slice):
+            date = _loc_date(key, "start_time")
+            view = self[date:date]
+            if not len(view) or view.start != date:
+                raise KeyError(key)
+            return view.values[0]
+        if key.step is not None:
+            raise ValueError(
+                tsutils.error_wrapper(
+                    """
+                    A step is not allowed in a DSN slice, the step is the
+                    time step of the DSN.
+                    """
+                )
+            )
+        start_date = self.dsn.start_date
+        end_date = self.dsn.end_date
+        if key.start is not None:
+            start = _loc_date(key.start, "start_time")
+            start_date = start if start_date is None else max(start, start_date)
+        if key.stop is not None:
+            end = _loc_date(key.stop, "end_time")
+            end_date = end if end_date is None else min(end, end_date)
+        return DSN(
+            self.dsn.wdmfile,
+            self.dsn.dsn,
+            start_date=start_date,
+            end_date=end_date,
+            label=self.dsn._label,
+        )
+
+
+def _loc_date(date, edge):
+    """Convert a loc key to datetime64[s], partial date strings to an edge."""
+    if isinstance(date, str):
+        return np.datetime64(getattr(pd.Period(date), edge), "s")
+    return np.datetime64(pd.Timestamp(date), "s")
+
+
 if __name__ == "__main__":
     wdm_obj = WDM()
     fname = r"c:\test.wdm" if os.name == "nt" else "test.wdm"
@@ -0,0 +1,101 @@
+"""
+test_batch
+----------------------------------
+
+Tests for the `wdmtoolbox.batch` manifest of DSN operations.
+"""
+
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from wdmtoolbox import wdmtoolbox, wdmutil
+
+
+class TestBatch(TestCase):
+    def setUp(self):
+        self.fd, self.wdmname = tempfile.mkstemp(suffix=".wdm")
+        os.close(self.fd)
+        self.fd, self.wdmname2 = tempfile.mkstemp(suffix=".wdm")
+        os.close(self.fd)
+        self.fd, self.manifest = tempfile.mkstemp(suffix=".csv")
+        os.close(self.fd)
+        wdmtoolbox.createnewwdm(self.wdmname, overwrite=True)
+        wdmtoolbox.createnewwdm(self.wdmname2, overwrite=True)
+        for dsn in range(101, 105):
+            wdmtoolbox.createnewdsn(self.wdmname, dsn, tcode=4, base_year=1970)
+
+    def tearDown(self):
+        os.remove(self.wdmname)
+        os.remove(self.wdmname2)
+        os.remove(self.manifest)
+
+    def test_batch(self):
+        with open(self.manifest, "w") as fpo:
+            fpo.write(
+                f"""operation,dsn,argument,value
+renumber,101,1101,
+deletedsn,104,,
+setattrib,1101,IDSCEN,BASE
+setattrib,1101,location,SITE1
+copylabel,1101,{self.wdmname2},201
+renumber,999,1999,
+setattrib,102,TSFILL,-1.5
+"""
+            )
+        ret = wdmtoolbox.batch(self.wdmname, self.manifest)
+        self.assertEqual(
+            ret["status"].tolist(), ["ok", "ok", "ok", "ok", "ok", "error", "ok"]
+        )
+        self.assertIn("error code", ret["message"][5])
+        self.assertFalse(os.path.exists(self.wdmname + ".lock"))
+
+        self.assertEqual(
+            [i for i, _ in wdmtoolbox.WDM.enumerate_dsns(self.wdmname)],
+            [102, 103, 1101],
+        )
+        desc = wdmtoolbox.describedsn(self.wdmname, 1101)
+        self.assertEqual(desc["IDSCEN"], "BASE")
+        self.assertEqual(desc["IDLOCN"], "SITE1")
+        self.assertEqual(wdmtoolbox.describedsn(self.wdmname2, 201)["IDSCEN"], "BASE")
+        self.assertEqual(wdmtoolbox.describedsn(self.wdmname, 102)["TSFILL"], -1.5)
+
+    def test_stop_on_error(self):
+        ret = wdmtoolbox.WDM.apply_batch(
+            self.wdmname,
+            [
+                ("renumber", 999, 1999),
+                {"operation": "delete", "dsn": 101},
+            ],
+            stop_on_error=True,
+        )
+        self.assertEqual(ret["status"].tolist(), ["error", "skipped"])
+        self.assertIsNotNone(wdmtoolbox.describedsn(self.wdmname, 101))
+
+    def test_invalid(self):
+        for operation in (
+            ("move", 101),
+            ("renumber", 101, "x"),
+            ("setattrib", 101, "NOATTR", 1),
+            ("delete", 40000),
+            ("copylabel", 101, "", 201),
+        ):
+            with self.assertRaisesRegex(ValueError, "is not valid"):
+                wdmtoolbox.WDM.apply_batch(self.wdmname, [("delete", 102), operation])
+        # Nothing ran.
+        self.assertEqual(
+            [i for i, _ in wdmtoolbox.WDM.enumerate_dsns(self.wdmname)],
+            [101, 102, 103, 104],
+        )
+        self.assertNotIn(self.wdmname, wdmutil.WDM.heldfiles)
+
+    def test_programming_error(self):
+        with (
+            patch.object(
+                wdmutil.WDM, "delete_dsn", side_effect=TypeError("bad argument")
+            ),
+            self.assertRaisesRegex(TypeError, "bad argument"),
+        ):
+            wdmtoolbox.WDM.apply_batch(self.wdmname, [("delete", 101)])
+        self.assertNotIn(self.wdmname, wdmutil.WDM.heldfiles)
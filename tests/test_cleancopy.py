@@ -14,8 +14,13 @@ except Exception:
     from io import StringIO
 
 from unittest import TestCase
+from unittest.mock import patch
 
-from wdmtoolbox import wdmtoolbox
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from wdmtoolbox import wdmtoolbox, wdmutil
 
 
 def capture(func, *args, **kwds):
@@ -63,3 +68,52 @@ class TestDescribe(TestCase):
         os.close(tfd)
         wdmtoolbox.cleancopywdm(self.wdmname, twdmname, overwrite=True)
         os.remove(twdmname)
+
+    def test_cleancopy_compacts(self):
+        wdmtoolbox.createnewwdm(self.wdmname, overwrite=True)
+        index = pd.date_range("2000-01-01", periods=5000, freq="h")
+        data = pd.DataFrame(
+            np.arange(len(index), dtype="float32") / 7, index=index, columns=["v"]
+        )
+        data.iloc[100:200] = np.nan
+        for dsn in range(101, 141):
+            wdmtoolbox.createnewdsn(self.wdmname, dsn, tcode=3, base_year=1990)
+            wdmtoolbox.WDM.write_dsn(self.wdmname, dsn, data + dsn)
+        for dsn in range(101, 141, 2):
+            wdmtoolbox.deletedsn(self.wdmname, dsn)
+        tfd, twdmname = tempfile.mkstemp(suffix=".wdm")
+        os.close(tfd)
+        ret = wdmtoolbox.cleancopywdm(self.wdmname, twdmname, overwrite=True, workers=2)
+        self.assertEqual(ret["dsns"], 20)
+        self.assertLess(ret["records_after"], ret["records_before"])
+        self.assertEqual(
+            [dsn for dsn, _ in wdmtoolbox.WDM.enumerate_dsns(twdmname)],
+            list(range(102, 141, 2)),
+        )
+        for dsn in (102, 120, 140):
+            ret = wdmtoolbox.extract(twdmname, dsn)
+            expected = wdmtoolbox.extract(self.wdmname, dsn)
+            ret.columns = expected.columns
+            assert_frame_equal(ret, expected)
+        os.remove(twdmname)
+
+    def test_cleancopy_write_error(self):
+        wdmtoolbox.createnewwdm(self.wdmname, overwrite=True)
+        wdmtoolbox.createnewdsn(self.wdmname, 101, tcode=2, base_year=1970, tsstep=15)
+        wdmtoolbox.csvtowdm(
+            self.wdmname,
+            101,
+            input_ts=os.path.join(self.test_dir, "nwisiv_02246000.csv"),
+        )
+        tfd, twdmname = tempfile.mkstemp(suffix=".wdm")
+        os.close(tfd)
+        with (
+            patch.object(
+                wdmtoolbox.WDM,
+                "_write_values",
+                side_effect=wdmutil.WDMError("write failed"),
+            ),
+            self.assertRaisesRegex(wdmutil.WDMError, "write failed"),
+        ):
+            wdmtoolbox.cleancopywdm(self.wdmname, twdmname, overwrite=True)
+        os.remove(twdmname)
@@ -64,6 +64,45 @@ class TestDescribe(TestCase):
         assert_frame_equal(ret1, ret3, check_index_type=False)
 
         wdmtoolbox.copydsn(self.wdmname, 101, self.wdmname, 1101)
+        ret4 = wdmtoolbox.extract(self.wdmname, 1101)
+        ret4.columns = ["02246000_iv_00060"]
+        assert_frame_equal(ret4, ret3, check_index_type=False)
+        self.assertEqual(
+            [dsn for dsn, _ in wdmtoolbox.WDM.enumerate_dsns(self.wdmname)],
+            [101, 1101],
+        )
+
+    def test_copy_ranges_to_self(self):
+        wdmtoolbox.createnewwdm(self.wdmname, overwrite=True)
+        for dsn in (101, 102):
+            wdmtoolbox.createnewdsn(
+                self.wdmname, dsn, tcode=2, base_year=1970, tsstep=15
+            )
+            wdmtoolbox.csvtowdm(
+                self.wdmname,
+                dsn,
+                input_ts=os.path.join(self.test_dir, "nwisiv_02246000.csv"),
+            )
+        wdmtoolbox.setattrib(self.wdmname, 102, "IDSCEN", "BASE")
+        wdmtoolbox.copydsn(self.wdmname, "101:102", self.wdmname, "201:202")
+        wdmtoolbox.copydsnlabel(self.wdmname, 102, self.wdmname, 302)
+        self.assertEqual(wdmtoolbox.describedsn(self.wdmname, 202)["IDSCEN"], "BASE")
+        self.assertEqual(wdmtoolbox.describedsn(self.wdmname, 302)["IDSCEN"], "BASE")
+        ret = wdmtoolbox.extract(self.wdmname, "201:202")
+        expected = wdmtoolbox.extract(self.wdmname, "101:102")
+        ret.columns = expected.columns
+        assert_frame_equal(ret, expected)
+
+        wdmtoolbox.copydsn(
+            self.wdmname, 101, self.wdmname, 201, overwrite=True, end_date="2014-02-22"
+        )
+        self.assertEqual(len(wdmtoolbox.extract(self.wdmname, 201)), 24 * 4 + 1)
+
+        with self.assertRaisesRegex(ValueError, "cannot be both copied from"):
+            wdmtoolbox.copydsn(
+                self.wdmname, "101:102", self.wdmname, "102:103", overwrite=True
+            )
+        self.assertEqual(len(wdmtoolbox.extract(self.wdmname, 102)), len(expected))
 
     def test_listdsns(self):
         wdmtoolbox.createnewwdm(self.wdmname, overwrite=True)
@@ -75,3 +114,39 @@ class TestDescribe(TestCase):
         )
         wdmtoolbox.createnewwdm(self.awdmname, overwrite=True)
         wdmtoolbox.copydsn(self.wdmname, 101, self.awdmname, 1101)
+
+    def test_copy_ranges(self):
+        wdmtoolbox.createnewwdm(self.wdmname, overwrite=True)
+        for dsn in (101, 102, 103):
+            wdmtoolbox.createnewdsn(
+                self.wdmname, dsn, tcode=2, base_year=1970, tsstep=15
+            )
+            wdmtoolbox.csvtowdm(
+                self.wdmname,
+                dsn,
+                input_ts=os.path.join(self.test_dir, "nwisiv_02246000.csv"),
+            )
+        wdmtoolbox.setattrib(self.wdmname, 102, "IDSCEN", "BASE")
+        wdmtoolbox.createnewwdm(self.awdmname, overwrite=True)
+        wdmtoolbox.copydsn(
+            self.wdmname,
+            "101:103",
+            self.awdmname,
+            "1101:1103",
+            start_date="2014-02-21 06:00",
+            end_date="2014-02-22 12:00",
+        )
+        self.assertEqual(wdmtoolbox.describedsn(self.awdmname, 1102)["IDSCEN"], "BASE")
+        ret = wdmtoolbox.extract(self.awdmname, "1101:1103")
+        expected = wdmtoolbox.extract(
+            self.wdmname,
+            "101:103",
+            start_date="2014-02-21 06:00",
+            end_date="2014-02-22 12:00",
+        )
+        self.assertEqual(len(ret), 30 * 4 + 1)
+        ret.columns = expected.columns
+        assert_frame_equal(ret, expected)
+
+        with self.assertRaisesRegex(ValueError, "same number of DSNs"):
+            wdmtoolbox.copydsn(self.wdmname, "101:103", self.awdmname, "1104:1105")
@@ -87,3 +87,23 @@ class TestDescribe(TestCase):
             )
         with self.assertRaisesRegex(Exception, "WDM library"):
             wdmtoolbox.describedsn(self.wdmname, 101)
+
+    def test_attributes(self):
+        wdmtoolbox.createnewwdm(self.wdmname, overwrite=True)
+        wdmtoolbox.createnewdsn(
+            self.wdmname, 101, tcode=5, base_year=1870, scenario="OBSERVED"
+        )
+        wdmtoolbox.setattrib(self.wdmname, 101, "DESCRP", "Sunspot area")
+        wdmtoolbox.setattrib(self.wdmname, 101, "ELEV", 12.5)
+        ret = wdmtoolbox.describedsn(self.wdmname, 101, attrs="all")
+        self.assertEqual(ret["IDSCEN"], "OBSERVED")
+        self.assertEqual(ret["DESCRP"], "Sunspot area")
+        self.assertEqual(ret["ELEV"], 12.5)
+        self.assertEqual(ret["TSBYR"], 1870)
+        ret = wdmtoolbox.describedsn(self.wdmname, 101, attrs=["scenario", "TSTEP"])
+        self.assertEqual(ret["IDSCEN"], "OBSERVED")
+        self.assertEqual(ret["TSSTEP"], 1)
+        with self.assertRaisesRegex(ValueError, "not a valid attribute name"):
+            wdmtoolbox.describedsn(self.wdmname, 101, attrs=["NOATTR"])
+        with self.assertRaisesRegex(ValueError, "No attribute called"):
+            wdmtoolbox.setattrib(self.wdmname, 101, "NOATTR", 1)
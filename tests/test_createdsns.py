@@ -0,0 +1,83 @@
+"""
+test_createdsns
+----------------------------------
+
+Tests for the `wdmtoolbox.createnewdsns` table of new DSNs.
+"""
+
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from wdmtoolbox import wdmtoolbox
+
+
+class TestCreateDSNs(TestCase):
+    def setUp(self):
+        self.fd, self.wdmname = tempfile.mkstemp(suffix=".wdm")
+        os.close(self.fd)
+        self.fd, self.table = tempfile.mkstemp(suffix=".csv")
+        os.close(self.fd)
+        wdmtoolbox.createnewwdm(self.wdmname, overwrite=True)
+
+    def tearDown(self):
+        os.remove(self.wdmname)
+        os.remove(self.table)
+
+    def test_createnewdsns(self):
+        wdmtoolbox.createnewdsn(self.wdmname, 102, tcode=4, base_year=1970)
+        with open(self.table, "w") as fpo:
+            fpo.write(
+                """dsn,tcode,tsstep,base_year,scenario,location,constituent,tsfill
+101,4,1,1970,BASE,RCH1,FLOW,
+102,4,1,1970,BASE,RCH2,FLOW,
+201,3,2,1980,BASE,RCH1,SED,-1.5
+"""
+            )
+        ret = wdmtoolbox.createnewdsns(self.wdmname, self.table)
+        self.assertEqual(ret["dsn"].tolist(), [101, 102, 201])
+        self.assertEqual(ret["status"].tolist(), ["ok", "error", "ok"])
+        self.assertIn("102", ret["message"][1])
+        self.assertFalse(os.path.exists(self.wdmname + ".lock"))
+
+        desc = wdmtoolbox.describedsn(self.wdmname, 201)
+        self.assertEqual(desc["TCODE"], 3)
+        self.assertEqual(desc["TSSTEP"], 2)
+        self.assertEqual(desc["TSBYR"], 1980)
+        self.assertEqual(desc["TSFILL"], -1.5)
+        self.assertEqual(desc["IDSCEN"], "BASE")
+        self.assertEqual(desc["IDLOCN"], "RCH1")
+        self.assertEqual(desc["IDCONS"], "SED")
+        self.assertEqual(desc["TSTYPE"], "SED")
+        self.assertEqual(wdmtoolbox.describedsn(self.wdmname, 101)["TSFILL"], -999.0)
+        self.assertEqual(wdmtoolbox.describedsn(self.wdmname, 102)["IDSCEN"], "")
+
+    def test_invalid(self):
+        with open(self.table, "w") as fpo:
+            fpo.write(
+                """dsn,tcode,scenario
+101,4,BASE
+0,4,BASE
+101,4,BASE
+102,4,TOOLONGSCENARIO
+"""
+            )
+        with self.assertRaisesRegex(ValueError, "Row 2") as context:
+            wdmtoolbox.createnewdsns(self.wdmname, self.table)
+        message = " ".join(str(context.exception).split())
+        self.assertIn("Row 3: DSN 101 is a duplicate of row 1", message)
+        self.assertIn("too long for Scenario", message)
+        self.assertEqual(list(wdmtoolbox.WDM.enumerate_dsns(self.wdmname)), [])
+
+        with open(self.table, "w") as fpo:
+            fpo.write("dsn,color\n101,red\n")
+        with self.assertRaisesRegex(ValueError, "color"):
+            wdmtoolbox.createnewdsns(self.wdmname, self.table)
+
+    def test_label_not_created(self):
+        with patch.object(wdmtoolbox.WDM, "wdlbax", return_value=0):
+            ret = wdmtoolbox.WDM.create_new_dsns(self.wdmname, [{"dsn": 101}])
+        self.assertEqual(ret["status"].tolist(), ["error"])
+        self.assertIn("wdlbax", ret["message"][0])
+        self.assertEqual(wdmtoolbox.WDM.enumerate_dsns(self.wdmname), [])
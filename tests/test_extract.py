@@ -16,6 +16,9 @@ except Exception:
 
 from unittest import TestCase
 
+import numpy as np
+import pandas as pd
+
 from wdmtoolbox import wdmtoolbox
 
 
@@ -67,3 +70,95 @@ class TestDescribe(TestCase):
         assert len(df.columns) == 5
         df = wdmtoolbox.extract(self.wdmname, "101:105+106:110")
         assert len(df.columns) == 10
+
+    def test_extract_window(self):
+        wdmtoolbox.createnewwdm(self.wdmname, overwrite=True)
+        wdmtoolbox.createnewdsn(self.wdmname, 101, tcode=2, base_year=1970, tsstep=15)
+        wdmtoolbox.csvtowdm(
+            self.wdmname,
+            101,
+            input_ts=os.path.join(self.test_dir, "nwisiv_02246000.csv"),
+        )
+        full = wdmtoolbox.extract(self.wdmname, 101)
+        for start_date, end_date in [
+            ("2014-02-21 03:07", "2014-02-22 11:52"),
+            ("2014-01-01", None),
+            (None, "2014-02-21 00:10"),
+        ]:
+            df = wdmtoolbox.extract(
+                self.wdmname, 101, start_date=start_date, end_date=end_date
+            )
+            assert df.equals(full.loc[start_date:end_date])
+
+    def test_extract_union(self):
+        wdmpath = os.path.join(self.test_dir, "MA190049.wdm")
+        df = wdmtoolbox.extract(wdmpath, 1, 1001, 1, start_date="1970-01-01")
+        self.assertEqual(
+            list(df.columns),
+            ["MA190049_DSN_1", "MA190049_DSN_1001", "MA190049_DSN_1_1"],
+        )
+        hourly = wdmtoolbox.extract(wdmpath, 1, start_date="1970-01-01")
+        daily = wdmtoolbox.extract(wdmpath, 1001, start_date="1970-01-01")
+        assert df.index.equals(hourly.index)
+        assert df.iloc[:, [0]].equals(hourly)
+        assert df.iloc[:, 1].dropna().equals(daily.iloc[:, 0].dropna())
+
+    def test_extract_workers(self):
+        fd, wdmname2 = tempfile.mkstemp(suffix=".wdm")
+        os.close(fd)
+        for wdmname in (self.wdmname, wdmname2):
+            wdmtoolbox.createnewwdm(wdmname, overwrite=True)
+            for dsn in (101, 102):
+                wdmtoolbox.createnewdsn(
+                    wdmname, dsn, tcode=2, base_year=1970, tsstep=15
+                )
+                wdmtoolbox.csvtowdm(
+                    wdmname,
+                    dsn,
+                    input_ts=os.path.join(self.test_dir, "nwisiv_02246000.csv"),
+                )
+        labels = [
+            f"{self.wdmname},101",
+            f"{wdmname2},102",
+            f"{self.wdmname},102",
+            f"{self.wdmname},101",
+        ]
+        ret1 = wdmtoolbox.extract(*labels, start_date="2014-02-22")
+        ret2 = wdmtoolbox.extract(*labels, start_date="2014-02-22", workers=2)
+        os.remove(wdmname2)
+        assert ret1.equals(ret2)
+        self.assertEqual(len(ret2.columns), 4)
+        self.assertTrue(ret2.columns[-1].endswith("_DSN_101_1"))
+
+    def test_extract_aggregate(self):
+        wdmname = os.path.join(self.test_dir, "MA190049.wdm")
+        hourly = wdmtoolbox.extract(
+            wdmname, 3, 6, start_date="1970-01-01", end_date="1970-03-31 23:00"
+        )
+        for transform in ("sum", "mean", "max", "min"):
+            ret = wdmtoolbox.extract(
+                wdmname,
+                3,
+                6,
+                start_date="1970-01-01",
+                end_date="1970-03-31",
+                aggregate=f"D:{transform}",
+            )
+            expected = getattr(hourly.resample("D"), transform)()
+            self.assertEqual(list(ret.index), list(expected.index))
+            np.testing.assert_allclose(
+                ret.to_numpy(float), expected.to_numpy(float), rtol=1e-5
+            )
+
+        # Monthly means from the first whole month of daily data.
+        ret = wdmtoolbox.WDM.read_dsn(wdmname, 1001, tcode=5, tsstep=1)
+        self.assertEqual(ret.index[0], pd.Timestamp("1938-02-01"))
+        daily = wdmtoolbox.extract(
+            wdmname, 1001, start_date="1938-02-01", end_date="1938-02-28"
+        )
+        self.assertAlmostEqual(ret.iloc[0, 0], daily.iloc[:, 0].mean(), places=5)
+
+        with self.assertRaisesRegex(ValueError, "transform"):
+            wdmtoolbox.extract(wdmname, 3, aggregate="D:median")
+        with self.assertRaisesRegex(ValueError, "interval"):
+            wdmtoolbox.extract(wdmname, 3, aggregate="W:sum")
@@ -15,12 +15,14 @@ except Exception:
     from io import StringIO
 
 from unittest import TestCase
+from unittest.mock import patch
 
-from pandas.testing import assert_frame_equal
+import pandas as pd
+from pandas.testing import assert_frame_equal, assert_series_equal
 
 from wdmtoolbox import wdmtoolbox
 from wdmtoolbox.toolbox_utils.src.toolbox_utils import tsutils
-from wdmtoolbox.wdmutil import WDMError
+from wdmtoolbox.wdmutil import WDMError, WDMWriter
 
 
 def capture(func, *args, **kwds):
@@ -170,3 +172,197 @@ class TestImport(TestCase):
         ret3 = tsutils.asbestfreq(ret3)
         ret1.columns = ["02246000_iv_00060"]
         assert_frame_equal(ret1, ret3, check_index_type=False)
+
+    def test_object_dtype(self):
+        wdmtoolbox.createnewwdm(self.wdmname, overwrite=True)
+        wdmtoolbox.createnewdsn(self.wdmname, 101, tcode=4, base_year=1970)
+        index = pd.date_range("2000-01-01", periods=4, freq="D")
+        data = pd.DataFrame({"flow": ["1.5", 2, None, "4"]}, index=index, dtype=object)
+        wdmtoolbox.WDM.write_dsn(self.wdmname, 101, data)
+        ret = wdmtoolbox.extract(self.wdmname, 101)
+        self.assertEqual(ret.iloc[:, 0].tolist()[:2], [1.5, 2.0])
+        self.assertTrue(pd.isna(ret.iloc[2, 0]))
+        self.assertEqual(ret.iloc[3, 0], 4.0)
+
+        data = pd.DataFrame({"flow": ["1.5", "a"]}, index=index[:2], dtype=object)
+        with self.assertRaisesRegex(ValueError, "must be numbers"):
+            wdmtoolbox.WDM.write_dsn(self.wdmname, 101, data)
+
+    def test_chunksize(self):
+        wdmtoolbox.createnewwdm(self.wdmname, overwrite=True)
+        for dsn in range(101, 107):
+            wdmtoolbox.createnewdsn(
+                self.wdmname, dsn, tcode=2, base_year=1970, tsstep=15
+            )
+        input_ts = os.path.join(self.test_dir, "nwisiv_02246000.csv")
+        wdmtoolbox.csvtowdm(self.wdmname, 101, input_ts=input_ts)
+        ret1 = wdmtoolbox.extract(self.wdmname, 101)
+        # The file has 193 rows, so 191 and 192 leave short final chunks.
+        for dsn, chunksize in zip(range(102, 107), (1, 2, 50, 191, 192)):
+            wdmtoolbox.csvtowdm(
+                self.wdmname, dsn, input_ts=input_ts, chunksize=chunksize
+            )
+            ret2 = wdmtoolbox.extract(self.wdmname, dsn)
+            ret2.columns = ret1.columns
+            assert_frame_equal(ret1, ret2)
+
+    def test_chunksize_dates(self):
+        wdmtoolbox.createnewwdm(self.wdmname, overwrite=True)
+        for dsn in (101, 102, 103):
+            wdmtoolbox.createnewdsn(
+                self.wdmname, dsn, tcode=2, base_year=1970, tsstep=15
+            )
+        index = pd.date_range("2000-01-01", periods=8, freq="15min")
+        data = pd.DataFrame({"flow": range(8)}, index=index, dtype="float64")
+        fd, csvname = tempfile.mkstemp(suffix=".csv")
+        os.close(fd)
+
+        # The first two rows are 30 minutes apart, the 15 minute time step
+        # comes from the DSN and the missing row is filled.
+        data.drop(index[1]).to_csv(csvname)
+        wdmtoolbox.csvtowdm(self.wdmname, 101, input_ts=csvname)
+        wdmtoolbox.csvtowdm(self.wdmname, 102, input_ts=csvname, chunksize=2)
+        # The WDM library fills the end of the last record, which depends on
+        # the number of writes, so only the values up to the end are compared.
+        ret = wdmtoolbox.extract(self.wdmname, 101, 102).loc[: index[-1]]
+        self.assertEqual(ret.iloc[:, 0].fillna(-1).tolist(), [0, -1, 2, 3, 4, 5, 6, 7])
+        assert_series_equal(ret.iloc[:, 0], ret.iloc[:, 1], check_names=False)
+
+        misaligned = data.rename(index={index[5]: index[5] + pd.Timedelta("7min")})
+        misaligned.to_csv(csvname)
+        with self.assertRaisesRegex(ValueError, "not on the time step"):
+            wdmtoolbox.csvtowdm(self.wdmname, 103, input_ts=csvname, chunksize=3)
+
+        # A duplicate across the chunk boundary overlaps the data written.
+        pd.concat([data.iloc[:4], data.iloc[3:]]).to_csv(csvname)
+        with self.assertRaisesRegex(ValueError, "cannot be used with"):
+            wdmtoolbox.csvtowdm(
+                self.wdmname, 103, input_ts=csvname, chunksize=4, clean=True
+            )
+        with self.assertRaisesRegex(ValueError, "overlaps the data"):
+            wdmtoolbox.csvtowdm(self.wdmname, 103, input_ts=csvname, chunksize=4)
+        os.remove(csvname)
+
+    def test_writer(self):
+        wdmtoolbox.createnewwdm(self.wdmname, overwrite=True)
+        wdmtoolbox.createnewdsn(self.wdmname, 101, tcode=4, base_year=1970)
+        index = pd.date_range("2000-01-01", periods=6, freq="D")
+        data = pd.DataFrame({"a": [1.0, 2, 3, 4, 5, 6]}, index=index)
+
+        writer = WDMWriter(self.wdmname, 101)
+        with self.assertRaisesRegex(WDMError, "not open"):
+            writer.append(data.iloc[:2])
+        with writer:
+            writer.append(data.iloc[:2])
+            with self.assertRaisesRegex(ValueError, "overlaps the data"):
+                writer.append(data.iloc[1:3])
+            writer.append(data.iloc[3:4])
+        self.assertEqual(writer.nval, 4)
+
+        # A new writer starts after the data already in the DSN.
+        writer = WDMWriter(self.wdmname, 101).open()
+        with self.assertRaisesRegex(ValueError, "overlaps the data"):
+            writer.append(data.iloc[3:])
+        writer.append(data.iloc[4:])
+        writer.close()
+        ret = wdmtoolbox.extract(self.wdmname, 101)
+        self.assertEqual(ret.iloc[:, 0].fillna(0).tolist(), [1, 2, 0, 4, 5, 6])
+        self.assertFalse(os.path.exists(f"{self.wdmname}.lock"))
+
+    def test_metadata_cache(self):
+        wdm = wdmtoolbox.WDM
+        wdmtoolbox.createnewwdm(self.wdmname, overwrite=True)
+        wdmtoolbox.createnewdsn(self.wdmname, 101, tcode=4, base_year=1970)
+        index = pd.date_range("2000-01-01", periods=4, freq="D")
+        wdm.write_dsn(self.wdmname, 101, pd.DataFrame({"a": [1.0, 2, 3, 4]}, index))
+        wdm.read_dsn(self.wdmname, 101)
+        keys = [
+            key for key in wdm._metadata if key[0] == os.path.realpath(self.wdmname)
+        ]
+        self.assertEqual(len(keys), 1)
+        wdm.read_dsn(self.wdmname, 101)
+        self.assertEqual(list(wdm._metadata)[-1], keys[0])
+
+        index = pd.date_range("2000-01-05", periods=2, freq="D")
+        wdm.write_dsn(self.wdmname, 101, pd.DataFrame({"a": [5.0, 6]}, index))
+        self.assertNotIn(keys[0], wdm._metadata)
+        ret = wdm.read_dsn(self.wdmname, 101)
+        self.assertEqual(ret.iloc[:, 0].tolist(), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(wdm.dsn_metadata(self.wdmname, 101)["lledat"][2], 7)
+
+    def test_multiple_columns(self):
+        wdmtoolbox.createnewwdm(self.wdmname, overwrite=True)
+        for dsn in (101, 102, 103, 201, 203):
+            wdmtoolbox.createnewdsn(
+                self.wdmname, dsn, tcode=2, base_year=1970, tsstep=15
+            )
+        data = tsutils.common_kwds(os.path.join(self.test_dir, "nwisiv_02246000.csv"))
+        data.index = data.index.tz_localize(None)
+        wide = pd.DataFrame(
+            {
+                "flow": data.iloc[:, 0],
+                "half": data.iloc[:, 0] / 2,
+                "late": data.iloc[:, 0].where(data.index >= "2014-02-22"),
+            }
+        )
+        fd, csvname = tempfile.mkstemp(suffix=".csv")
+        os.close(fd)
+        wide.to_csv(csvname)
+
+        # The time step is inferred once, not once for each column.
+        with patch.object(
+            tsutils, "asbestfreq", wraps=tsutils.asbestfreq
+        ) as asbestfreq:
+            wdmtoolbox.csvtowdm(self.wdmname, 101, input_ts=csvname, columns="flow")
+            ncalls = asbestfreq.call_count
+            wdmtoolbox.csvtowdm(self.wdmname, "101:103", input_ts=csvname)
+        self.assertEqual(asbestfreq.call_count, 2 * ncalls)
+        wdmtoolbox.csvtowdm(self.wdmname, "flow=201,late=203", input_ts=csvname)
+        with self.assertRaisesRegex(ValueError, "3 columns, but"):
+            wdmtoolbox.csvtowdm(self.wdmname, "101,102", input_ts=csvname)
+        with self.assertRaisesRegex(ValueError, "only 1 time series"):
+            wdmtoolbox.csvtowdm(self.wdmname, 101, input_ts=csvname)
+        with self.assertRaisesRegex(ValueError, "not in the input"):
+            wdmtoolbox.csvtowdm(self.wdmname, "stage=101", input_ts=csvname)
+        os.remove(csvname)
+
+        ret = wdmtoolbox.extract(self.wdmname, 101, 102, 201)
+        self.assertEqual(ret.iloc[:, 0].tolist(), wide["flow"].tolist())
+        self.assertEqual(ret.iloc[:, 1].tolist(), wide["half"].tolist())
+        self.assertEqual(ret.iloc[:, 2].tolist(), wide["flow"].tolist())
+        ret = wdmtoolbox.extract(self.wdmname, 103)
+        self.assertEqual(ret.index[0], pd.Timestamp("2014-02-22"))
+        self.assertEqual(ret.iloc[:, 0].tolist(), wide["late"].dropna().tolist())
+        self.assertEqual(
+            wdmtoolbox.extract(self.wdmname, 203).iloc[:, 0].tolist(),
+            wide["late"].dropna().tolist(),
+        )
+
+    def test_hydhrseqtowdm(self):
+        wdmtoolbox.createnewwdm(self.wdmname, overwrite=True)
+        wdmtoolbox.createnewdsn(self.wdmname, 101, tcode=3, base_year=1990)
+        fd, hydhrname = tempfile.mkstemp(suffix=".txt")
+        os.close(fd)
+        with open(hydhrname, "w") as fpo:
+            for line, (date, flag) in enumerate(
+                (("99 12 30", 1), ("99 12 30", 2), ("99 12 31", 1), ("99 12 31", 2))
+                + (("00  1  1", 1), ("00  1  1", 2))
+            ):
+                values = " ".join(str(line * 12 + i) for i in range(12))
+                fpo.write(f"STA12345 {date} {flag} {values}\n")
+        wdmtoolbox.hydhrseqtowdm(self.wdmname, 101, input_ts=hydhrname)
+        with open(hydhrname, "w") as fpo:
+            fpo.write("STA12345 99 2 30 1 1 2 3 4 5 6 7 8 9 10 11 12\n")
+        with self.assertRaisesRegex(ValueError, "not in the"):
+            wdmtoolbox.hydhrseqtowdm(self.wdmname, 101, input_ts=hydhrname)
+        with open(hydhrname, "w") as fpo:
+            fpo.write("STA12345 99 13 1 1 1 2 3 4 5 6 7 8 9 10 11 12\n")
+        with self.assertRaisesRegex(ValueError, "has a month"):
+            wdmtoolbox.hydhrseqtowdm(self.wdmname, 101, input_ts=hydhrname)
+        os.remove(hydhrname)
+
+        ret = wdmtoolbox.extract(self.wdmname, 101)
+        self.assertEqual(ret.index[0], pd.Timestamp("1999-12-30"))
+        self.assertEqual(ret.index[-1], pd.Timestamp("2000-01-01 23:00"))
+        self.assertEqual(len(ret), 72)
+        self.assertEqual(ret.iloc[:, 0].tolist(), list(range(72)))
@@ -13,6 +13,8 @@ except Exception:
     from io import StringIO
 
 
+import pandas as pd
+
 from wdmtoolbox import wdmtoolbox
 
 
@@ -30,3 +32,42 @@ def capture(func, *args, **kwds):
 def test_listdsns_verify(request):
     datadir = request.config.rootdir / "tests"
     wdmtoolbox.listdsns(str(datadir / "MA190049.wdm"))
+
+
+def test_enumerate_dsns(request):
+    datadir = request.config.rootdir / "tests"
+    wdmpath = str(datadir / "MA190049.wdm")
+    dsns = wdmtoolbox.WDM.enumerate_dsns(wdmpath)
+    assert [dsn for dsn, _ in dsns] == [1, 3, 6, 1001, 1003, 1005]
+    collect = wdmtoolbox.listdsns(wdmpath)
+    assert list(collect.keys()) == [dsn for dsn, _ in dsns]
+    # listdsns is built on describe_dsns, but has the values of describedsn.
+    for dsn in collect:
+        desc = wdmtoolbox.describedsn(wdmpath, dsn)
+        assert list(collect[dsn]) == list(desc)
+        for key, value in desc.items():
+            if key in ("start_date", "end_date"):
+                assert collect[dsn][key] == str(value)
+            elif key in ("llsdat", "lledat"):
+                assert collect[dsn][key].tolist() == value.tolist()
+            else:
+                assert collect[dsn][key] == value
+                assert str(collect[dsn][key]) == str(value)
+    desc = wdmtoolbox._describe_dicts(wdmpath, [1003], attrs=["TSTYPE", "DCODE"])
+    assert desc[1003]["DCODE"] == "<Not present on dataset>"
+    assert "end_date" not in desc[1003]
+
+
+def test_describe_dsns(request):
+    datadir = request.config.rootdir / "tests"
+    wdmpath = str(datadir / "MA190049.wdm")
+    table = wdmtoolbox.WDM.describe_dsns(wdmpath)
+    assert list(table.index) == [1, 3, 6, 1001, 1003, 1005]
+    assert str(table["TCODE"].dtype) == "Int64"
+    assert str(table["start_date"].dtype).startswith("datetime64")
+    desc = wdmtoolbox.describedsn(wdmpath, 1001)
+    assert table.loc[1001, "IDCONS"] == desc["IDCONS"]
+    assert table.loc[1001, "start_date"] == pd.Timestamp(desc["start_date"].start_time)
+    table = wdmtoolbox.WDM.describe_dsns(wdmpath, [6, 1], attrs=["TSTYPE"])
+    assert list(table.index) == [6, 1]
+    assert list(table["TSTYPE"]) == ["PEVT", "PREC"]
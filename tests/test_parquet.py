@@ -0,0 +1,140 @@
+"""
+test_parquet
+----------------------------------
+
+Tests for the Arrow and Parquet export of WDM files.
+"""
+
+import json
+import os
+import tempfile
+from unittest import TestCase, skipIf
+
+import numpy as np
+import pandas as pd
+
+from wdmtoolbox import wdmtoolbox
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+@skipIf(pq is None, "requires pyarrow")
+class TestParquet(TestCase):
+    def setUp(self):
+        self.fd, self.parquetname = tempfile.mkstemp(suffix=".parquet")
+        os.close(self.fd)
+        self.fd, self.outname = tempfile.mkstemp(suffix=".wdm")
+        os.close(self.fd)
+        wdmtoolbox.createnewwdm(self.outname, overwrite=True)
+        self.test_dir = os.path.abspath(os.path.dirname(__file__))
+        self.wdmname = os.path.join(self.test_dir, "MA190049.wdm")
+
+    def tearDown(self):
+        os.remove(self.parquetname)
+        os.remove(self.outname)
+
+    def test_to_arrow(self):
+        table = wdmtoolbox.WDM.to_arrow(
+            self.wdmname, [3, 6], start_date="1970-01-01", end_date="1971-12-31"
+        )
+        self.assertEqual(table.column_names, ["datetime", "dsn", "value"])
+        self.assertEqual(str(table.schema.field("value").type), "float")
+        attributes = json.loads(table.schema.metadata[b"wdmtoolbox.attributes"])
+        self.assertEqual(attributes["3"]["TCODE"], 3)
+        self.assertEqual(attributes["3"]["IDLOCN"], "MA190049")
+
+        data = table.to_pandas()
+        for dsn in (3, 6):
+            ret = wdmtoolbox.extract(
+                self.wdmname, dsn, start_date="1970-01-01", end_date="1971-12-31"
+            )
+            values = data[data["dsn"] == dsn]
+            self.assertEqual(list(values["datetime"]), list(ret.index))
+            np.testing.assert_array_equal(
+                values["value"].to_numpy(np.float32),
+                ret.iloc[:, 0].to_numpy(np.float32),
+            )
+
+    def test_wdmtoparquet(self):
+        wdmtoolbox.wdmtoparquet(
+            self.wdmname,
+            self.parquetname,
+            3,
+            6,
+            layout="wide",
+            start_date="1970-06-01",
+        )
+        parquet = pq.ParquetFile(self.parquetname)
+        # One row group for each year from 1970 to 1978.
+        self.assertEqual(parquet.metadata.num_row_groups, 9)
+        data = parquet.read().to_pandas().set_index("datetime")
+        self.assertEqual(list(data.columns), ["3", "6"])
+        self.assertEqual(data.index[0].year, 1970)
+        ret = wdmtoolbox.extract(self.wdmname, 3, 6, start_date="1970-06-01")
+        np.testing.assert_array_equal(
+            data.to_numpy(np.float32), ret.to_numpy(np.float32)
+        )
+
+    def test_layout(self):
+        with self.assertRaisesRegex(ValueError, "long"):
+            wdmtoolbox.WDM.to_arrow(self.wdmname, [3], layout="tall")
+
+    def test_parquettowdm(self):
+        wdmtoolbox.wdmtoparquet(
+            self.wdmname, self.parquetname, 3, 1001, end_date="1940-12-31"
+        )
+        wdmtoolbox.parquettowdm(self.outname, self.parquetname)
+        for dsn in (3, 1001):
+            desc = wdmtoolbox.describedsn(self.outname, dsn)
+            self.assertEqual(
+                desc["IDSCEN"], wdmtoolbox.describedsn(self.wdmname, dsn)["IDSCEN"]
+            )
+            ret = wdmtoolbox.extract(self.outname, dsn)
+            expected = wdmtoolbox.extract(self.wdmname, dsn, end_date="1940-12-31")
+            self.assertEqual(list(ret.index), list(expected.index))
+            np.testing.assert_array_equal(
+                ret.to_numpy(np.float32, na_value=np.nan),
+                expected.to_numpy(np.float32, na_value=np.nan),
+            )
+
+    def test_write_arrow(self):
+        wdmtoolbox.createnewdsn(self.outname, 101, tcode=4, base_year=1970)
+        dates = pd.to_datetime(["2000-01-01", "2000-01-02", "2000-01-04"])
+        table = pa.table(
+            {
+                "datetime": dates,
+                "flow": pa.array([1.5, None, 4.0], type=pa.float64()),
+            }
+        )
+        wdmtoolbox.WDM.write_arrow(self.outname, table, dsns={"flow": 101})
+        # The next batch starts after a missing day.
+        wdmtoolbox.WDM.write_arrow(
+            self.outname,
+            pa.table({"datetime": pd.to_datetime(["2000-01-06"]), "101": [6.0]}),
+        )
+        ret = wdmtoolbox.extract(self.outname, 101)
+        self.assertEqual(ret.index[0], pd.Timestamp("2000-01-01"))
+        self.assertEqual(ret.index[-1], pd.Timestamp("2000-01-06"))
+        values = ret.iloc[:, 0].to_numpy(float, na_value=np.nan)
+        self.assertEqual(values[0], 1.5)
+        self.assertTrue(np.isnan(values[1]))
+        self.assertTrue(np.isnan(values[2]))
+        self.assertEqual(values[3], 4.0)
+        self.assertEqual(values[5], 6.0)
+
+        with self.assertRaisesRegex(ValueError, "not on the"):
+            wdmtoolbox.WDM.write_arrow(
+                self.outname,
+                pa.table(
+                    {"datetime": pd.to_datetime(["2001-01-01 12:00"]), "101": [1.0]}
+                ),
+            )
+        with self.assertRaisesRegex(ValueError, "DSN 102 does not exist"):
+            wdmtoolbox.WDM.write_arrow(
+                self.outname,
+                pa.table({"datetime": pd.to_datetime(["2001-01-01"]), "102": [1.0]}),
+            )
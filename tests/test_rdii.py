@@ -49,3 +49,46 @@ class TestDescribe(TestCase):
         )
         wdmtoolbox.copydsn(self.wdmname, 101, self.wdmname, 1101)
         wdmtoolbox.wdmtoswmm5rdii(self.wdmname, 101, 1101)
+
+    def test_rdii_output(self):
+        wdmtoolbox.createnewwdm(self.wdmname, overwrite=True)
+        wdmtoolbox.createnewdsn(
+            self.wdmname, 101, tcode=2, base_year=1970, tsstep=15, location="RCH1"
+        )
+        wdmtoolbox.csvtowdm(
+            self.wdmname,
+            101,
+            input_ts=os.path.join(self.test_dir, "nwisiv_02246000.csv"),
+        )
+        wdmtoolbox.copydsn(self.wdmname, 101, self.wdmname, 1101)
+        fd, outname = tempfile.mkstemp(suffix=".txt")
+        os.close(fd)
+        wdmtoolbox.wdmtoswmm5rdii(self.wdmname, 101, 1101, output=outname)
+        with open(outname) as fpi:
+            lines = fpi.read().splitlines()
+        os.remove(outname)
+
+        data = wdmtoolbox.extract(self.wdmname, 101)
+        self.assertEqual(
+            lines[:2], ["SWMM5", f"RDII dump of DSNS (101, 1101) from {self.wdmname}"]
+        )
+        self.assertEqual(
+            lines[2:9],
+            [
+                "900",
+                "1",
+                "FLOW CFS",
+                "2",
+                "101_RCH1",
+                "1101_RCH1",
+                "Node Year Mon Day Hr Min Sec Flow",
+            ],
+        )
+        self.assertEqual(len(lines), 9 + 2 * len(data))
+        self.assertEqual(lines[9], f"101_RCH1 2014 02 21 00 00 00 {data.iloc[0, 0]:g}")
+        self.assertEqual(
+            lines[10], f"1101_RCH1 2014 02 21 00 00 00 {data.iloc[0, 0]:g}"
+        )
+        self.assertEqual(
+            lines[-1], f"1101_RCH1 2014 02 23 00 00 00 {data.iloc[-1, 0]:g}"
+        )
@@ -0,0 +1,54 @@
+"""
+test_readarray
+----------------------------------
+
+Tests for the NumPy `wdmtoolbox.read_array` API.
+"""
+
+import os
+from unittest import TestCase
+
+import numpy as np
+
+from wdmtoolbox import wdmtoolbox, wdmutil
+
+
+class TestReadArray(TestCase):
+    def setUp(self):
+        self.test_dir = os.path.abspath(os.path.dirname(__file__))
+        self.wdmname = os.path.join(self.test_dir, "MA190049.wdm")
+
+    def test_read_array(self):
+        ret = wdmtoolbox.read_array(self.wdmname, 3, "1970-01-01", "1970-12-31")
+        expected = wdmtoolbox.extract(
+            self.wdmname, 3, start_date="1970-01-01", end_date="1970-12-31"
+        )
+        self.assertEqual(ret.values.dtype, np.float32)
+        self.assertEqual(ret.start, np.datetime64("1970-01-01T00:00:00"))
+        self.assertEqual(ret.step, np.timedelta64(1, "h"))
+        np.testing.assert_array_equal(
+            ret.values, expected.iloc[:, 0].to_numpy(np.float32)
+        )
+        self.assertFalse(ret.missing.any())
+        self.assertEqual(
+            ret.start + ret.step * (len(ret.values) - 1),
+            np.datetime64(expected.index[-1]),
+        )
+
+    def test_out(self):
+        out = np.zeros(100, dtype=np.float32)
+        with wdmutil.WDMFile(self.wdmname, readonly=True) as wdm:
+            ret = wdm.read_array(1005, "1960-01-01", "1960-01-10", out=out)
+            self.assertTrue(np.shares_memory(ret.values, out))
+            self.assertEqual(len(ret.values), 10)
+            self.assertEqual(ret.step, np.timedelta64(1, "D"))
+            np.testing.assert_array_equal(
+                out[:10],
+                wdm.read_dsn(1005, "1960-01-01", "1960-01-10")
+                .iloc[:, 0]
+                .to_numpy(np.float32),
+            )
+            with self.assertRaisesRegex(ValueError, "float32"):
+                wdm.read_array(1005, out=out)
+            with self.assertRaisesRegex(ValueError, "float32"):
+                wdm.read_array(1005, "1960-01-01", "1960-01-10", out=np.zeros(10))
@@ -0,0 +1,124 @@
+"""
+test_wdmfile
+----------------------------------
+
+Tests for the `wdmutil.WDMFile` session.
+"""
+
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from wdmtoolbox.toolbox_utils.src.toolbox_utils import tsutils
+
+from wdmtoolbox import wdmtoolbox, wdmutil
+
+
+class TestWDMFile(TestCase):
+    def setUp(self):
+        self.fd, self.wdmname = tempfile.mkstemp(suffix=".wdm")
+        os.close(self.fd)
+        self.test_dir = os.path.abspath(os.path.dirname(__file__))
+        wdmtoolbox.createnewwdm(self.wdmname, overwrite=True)
+
+    def tearDown(self):
+        os.remove(self.wdmname)
+
+    def test_session(self):
+        data = tsutils.common_kwds(os.path.join(self.test_dir, "nwisiv_02246000.csv"))
+        data.index = data.index.tz_localize(None)
+        data = tsutils.asbestfreq(data)
+        with wdmutil.WDMFile(self.wdmname, wdm=wdmtoolbox.WDM) as wdm:
+            for dsn in range(101, 106):
+                wdm.create_new_dsn(dsn, tcode=2, base_year=1970, tsstep=15)
+                wdm.write_dsn(dsn, data)
+                wdm.set_attribute(dsn, "IDSCEN", "BASE")
+            wdm.renumber_dsn(105, 1105)
+            wdm.delete_dsn(104)
+            self.assertEqual(wdm.describe_dsn(101)["IDSCEN"], "BASE")
+            ret = wdm.read_dsn(103)
+            self.assertTrue(os.path.exists(self.wdmname + ".lock"))
+        self.assertFalse(os.path.exists(self.wdmname + ".lock"))
+        self.assertNotIn(self.wdmname, wdmutil.WDM.openfiles)
+
+        ret.columns = data.columns
+        assert_frame_equal(ret, data, check_index_type=False, check_freq=False)
+        self.assertEqual(wdmtoolbox.describedsn(self.wdmname, 1105)["DSN"], 1105)
+        with self.assertRaises(wdmutil.WDMError):
+            wdmtoolbox.describedsn(self.wdmname, 104)
+
+    def test_readonly(self):
+        wdmtoolbox.createnewdsn(self.wdmname, 101, tcode=2, base_year=1970, tsstep=15)
+        with wdmutil.WDMFile(self.wdmname, readonly=True) as wdm:
+            self.assertEqual(wdm.describe_dsn(101)["TSSTEP"], 15)
+            with self.assertRaisesRegex(wdmutil.WDMError, "read-only"):
+                wdm.set_attribute(101, "IDSCEN", "BASE")
+        self.assertFalse(os.path.exists(self.wdmname + ".lock"))
+
+    def test_lazy_dsn(self):
+        wdmname = os.path.join(self.test_dir, "MA190049.wdm")
+        with wdmutil.WDMFile(wdmname, readonly=True) as wdm:
+            dsn = wdm[3]
+            self.assertEqual(len(dsn), 424440)
+            self.assertEqual(dsn.end, np.datetime64("1978-09-30T23:00:00"))
+            month = dsn.loc["1970-06":"1970-07"]
+            self.assertEqual(len(month), 61 * 24)
+            self.assertEqual(month.index[0], pd.Timestamp("1970-06-01"))
+            self.assertEqual(month.index[-1], pd.Timestamp("1970-07-31 23:00"))
+            self.assertEqual(month.values.dtype, np.float32)
+            expected = wdm.read_dsn(3, "1970-06-01", "1970-07-31 23:00")
+            np.testing.assert_array_equal(
+                month.values, expected.iloc[:, 0].to_numpy(np.float32)
+            )
+            assert_frame_equal(month.to_frame(), expected)
+            self.assertEqual(
+                month.loc["1970-06-15 12:00"],
+                np.float32(expected.loc["1970-06-15 12:00"].iloc[0]),
+            )
+            # Slices narrow the window of the view they are taken from.
+            self.assertEqual(len(month.loc["1970-07-31":"1970-12"]), 24)
+            self.assertEqual(len(dsn.loc["1990":]), 0)
+            self.assertEqual(len(dsn.loc["1990":].values), 0)
+            self.assertEqual(len(dsn.loc["1990":].read_array().missing), 0)
+            self.assertEqual(np.asarray(month, dtype=np.float64).dtype, np.float64)
+            with self.assertRaisesRegex(ValueError, "without a copy"):
+                np.array(month, copy=False)
+            with self.assertRaises(KeyError):
+                month.loc["1971-01-01"]
+
+    def test_record_buffer(self):
+        wdm = wdmutil.WDM(buffer_records=4096)
+        self.addCleanup(wdm.set_buffer_records, 10)
+        wdmname = os.path.join(self.test_dir, "MA190049.wdm")
+        with wdmutil.WDMFile(wdmname, readonly=True, wdm=wdm) as wdmfile:
+            first = wdmfile.read_array(3)
+            stats = wdm.buffer_stats(reset=True)
+            self.assertEqual(stats["records"], 4096)
+            self.assertGreater(stats["reads"], 0)
+            self.assertEqual(stats["reads"], stats["misses"])
+            # Every record of the DSN is still in the buffer.
+            second = wdmfile.read_array(3)
+            stats = wdm.buffer_stats()
+            self.assertEqual(stats["reads"], 0)
+            self.assertGreater(stats["hits"], 0)
+        np.testing.assert_array_equal(first.values, second.values)
+
+        # Labels far into a large buffer are still updated, the copy gets
+        # its own creation date instead of the one of DSN 1.
+        shutil.copy(wdmname, self.wdmname)
+        with wdmutil.WDMFile(self.wdmname, wdm=wdm) as wdmfile:
+            for dsn in (1, 3, 6):
+                wdmfile.read_array(dsn)
+            self.assertGreater(wdm.buffer_stats()["misses"], 512)
+            wdmfile.copy_dsn(1, self.wdmname, 2001)
+        created = wdm.describe_dsn(self.wdmname, 2001, attrs=["DATCRE"])["DATCRE"]
+        self.assertNotEqual(created, "20070123130204")
+
+        wdm.set_buffer_records(10)
+        self.assertEqual(wdm.buffer_stats()["records"], 10)
+        with self.assertRaisesRegex(ValueError, "number of buffer records"):
+            wdm.set_buffer_records(5)
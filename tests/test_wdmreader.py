@@ -0,0 +1,117 @@
+"""
+test_wdmreader
+----------------------------------
+
+Tests for the NumPy `wdmreader.WDMReader`.
+"""
+
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
+from pandas.testing import assert_frame_equal
+
+from wdmtoolbox import WDMReader, wdmtoolbox, wdmutil
+
+
+class TestWDMReader(TestCase):
+    def setUp(self):
+        self.fd, self.wdmname = tempfile.mkstemp(suffix=".wdm")
+        os.close(self.fd)
+        self.test_dir = os.path.abspath(os.path.dirname(__file__))
+        wdmtoolbox.createnewwdm(self.wdmname, overwrite=True)
+        wdmtoolbox.createnewdsn(self.wdmname, 101, tcode=2, base_year=1970, tsstep=15)
+        wdmtoolbox.csvtowdm(
+            self.wdmname,
+            101,
+            input_ts=os.path.join(self.test_dir, "nwisiv_02246000.csv"),
+        )
+        wdmtoolbox.createnewdsn(self.wdmname, 102, tcode=5, base_year=1870)
+        wdmtoolbox.csvtowdm(
+            self.wdmname,
+            102,
+            input_ts=os.path.join(self.test_dir, "sunspot_area_with_missing.csv"),
+        )
+        wdmtoolbox.createnewdsn(self.wdmname, 103, tcode=4, base_year=1970)
+
+    def tearDown(self):
+        os.remove(self.wdmname)
+
+    def test_describe(self):
+        with WDMReader(self.wdmname) as wdm:
+            for dsn in (101, 102, 103):
+                for attrs in ("default", "all", ["TSFILL", "TCODE"]):
+                    ret = wdm.describe_dsn(dsn, attrs=attrs)
+                    base = wdmtoolbox.WDM.describe_dsn(self.wdmname, dsn, attrs=attrs)
+                    self.assertEqual(list(ret), list(base))
+                    for key, value in base.items():
+                        if isinstance(value, np.ndarray):
+                            np.testing.assert_array_equal(ret[key], value)
+                        elif key not in ("start_date", "end_date") or dsn != 103:
+                            self.assertEqual(ret[key], value)
+
+    def test_read(self):
+        with WDMReader(self.wdmname) as wdm:
+            for dsn in (101, 102, 103):
+                base = wdmtoolbox.WDM.read_dsn(self.wdmname, dsn)
+                assert_frame_equal(wdm.read_dsn(dsn), base)
+            assert_frame_equal(
+                wdm.read_dsn(101, start_date="2014-02-22", end_date="2014-02-22T12"),
+                wdmtoolbox.WDM.read_dsn(
+                    self.wdmname, 101, start_date="2014-02-22", end_date="2014-02-22T12"
+                ),
+            )
+
+    def test_read_blocks(self):
+        wdmpath = os.path.join(self.test_dir, "MA190049.wdm")
+        with WDMReader(wdmpath) as wdm:
+            for dsn, _ in wdm.enumerate_dsns():
+                assert_frame_equal(
+                    wdm.read_dsn(dsn), wdmtoolbox.WDM.read_dsn(wdmpath, dsn)
+                )
+                self.assertEqual(
+                    wdm.describe_dsn(dsn)["start_date"],
+                    wdmtoolbox.WDM.describe_dsn(wdmpath, dsn)["start_date"],
+                )
+            assert_frame_equal(
+                wdm.read_dsn(6, start_date="1960-02-03T05", end_date="1961-07-01"),
+                wdmtoolbox.WDM.read_dsn(
+                    wdmpath, 6, start_date="1960-02-03T05", end_date="1961-07-01"
+                ),
+            )
+
+    def test_threads(self):
+        dsns = [101, 102] * 8
+        with WDMReader(self.wdmname) as wdm, ThreadPoolExecutor(4) as pool:
+            rets = list(pool.map(wdm.read_dsn, dsns))
+        for dsn, ret in zip(dsns, rets):
+            assert_frame_equal(ret, wdmtoolbox.WDM.read_dsn(self.wdmname, dsn))
+
+    def test_errors(self):
+        with WDMReader(self.wdmname) as wdm:
+            with self.assertRaisesRegex(wdmutil.WDMError, "error code -81"):
+                wdm.read_dsn(104)
+            with self.assertRaisesRegex(wdmutil.WDMError, "error code -84"):
+                wdm.describe_dsn(32001)
+            self.assertEqual(
+                wdm.enumerate_dsns(), wdmtoolbox.WDM.enumerate_dsns(self.wdmname)
+            )
+            positions = WDMReader._attribute_positions
+            with (
+                patch.object(
+                    WDMReader,
+                    "_attribute_positions",
+                    staticmethod(
+                        lambda label: {
+                            k: v for k, v in positions(label).items() if k != 17
+                        }
+                    ),
+                ),
+                self.assertRaisesRegex(wdmutil.WDMError, "TCODE and TSSTEP"),
+            ):
+                wdm.read_dsn(101)
+        with self.assertRaisesRegex(wdmutil.WDMError, "not a WDM file"):
+            WDMReader(os.path.join(self.test_dir, "sunspot_area.csv"))
@@ -10,8 +10,9 @@ C     Determine the index of the user requested record within
 C     the WDM in memory buffer of records.  The record is read
 C     from the WDM file and pointers are updated, as required.
 C     If the record is already in the buffer, the index is returned.
-C     If the record is not in the buffer, the oldest record in
-C     the buffer is replaced with the record read from the WDM file.
+C     If the record is not in the buffer, the least recently used
+C     record in the buffer is replaced with the record read from the
+C     WDM file.
 C     For a negative RREC, the index of an empty record is returned.
 C
 C     + + + DUMMY ARGUMENTS + + +
@@ -29,14 +30,20 @@ C     + + + SAVES + + +
       SAVE      BADCNT
 C
 C     + + + LOCAL VARIABLES + + +
-      INTEGER   IND,RIND,PIND,NIND,XIND,I,CWDM,DONFG
+      INTEGER   RIND,PIND,NIND,XIND,I,CWDM,DONFG
       CHARACTER(255)STR
       CHARACTER(255)WDNAME
       LOGICAL       OPEN
 C
+C     + + + FUNCTIONS + + +
+      INTEGER   WDBFND
+C
 C     + + + INTRINSICS + + +
       INTRINSIC IABS
 C
+C     + + + EXTERNALS + + +
+      EXTERNAL  WDBFND, WDBFUL, WDBFLK
+C
 C     + + + DATA INITIALIZATIONS + + +
       DATA BADCNT/0/
 C
@@ -67,26 +74,38 @@ C       working with a valid file
         IF (IABS(RREC).LE.MAXREC(CWDM)) THEN
 C         record is within allowable range
           IF (RREC.GE.0) THEN
-C           looking for an existing record
-            IND = 0
- 30         CONTINUE
-C             look for desired record in currently avail records
-              IND= IND+ 1
-              IF (RECNO(IND).EQ.RREC .AND. WDMFUN(IND).EQ.WDMSFL) THEN
-C               its already in memory
-                RIND= IND
-              END IF
-            IF (IND.LT.CONREC.AND.RIND.EQ.0) GO TO 30
+C           looking for an existing record, first the most recently
+C           used one as consecutive calls mostly want the same record
+            RIND= PREPOS(FREPOS)
+            IF (RECNO(RIND).NE.RREC .OR. WDMFUN(RIND).NE.WDMSFL) THEN
+              RIND= WDBFND(WDMSFL,RREC)
+            END IF
+          ELSE
+C           new record, drop any old copy of it from the buffer
+            I= WDBFND(WDMSFL,-RREC)
+            IF (I.GT.0) THEN
+              CALL WDBFUL(I)
+              RECNO(I) = 0
+              WDMFUN(I)= 0
+            END IF
           END IF
 C
           IF (RIND.EQ.0) THEN
 C           record not found, allocate space for it
             RIND= FREPOS
+            IF (WDMFUN(RIND).NE.0) THEN
+C             remove the least recently used record from the buffer
+              CALL WDBFUL(RIND)
+            END IF
+            IF (RREC.GE.0) THEN
+              BUFMIS= BUFMIS+ 1
+            END IF
             IF (RREC.GT.0) THEN
               INQUIRE(UNIT=WDMSFL,NAME=WDNAME,OPENED=OPEN)
               IF (OPEN) THEN
 C               read existing record from file
                 READ (WDMSFL,REC=RREC) (WIBUFF(I,RIND),I=1,512)
+                BUFRD= BUFRD+ 1
               ELSE
                 WRITE(STR,*) 'UTWDMD:NotOpen:',WDMSFL,RREC,TRIM(WDNAME)
 C               CALL LOG_MSG(STR)
@@ -101,8 +120,10 @@ C
             FREPOS      = NXTPOS(FREPOS)
             RECNO(RIND) = IABS(RREC)
             WDMFUN(RIND)= WDMSFL
+            CALL WDBFLK(RIND)
           ELSE
 C           record found, update pointers to use this buffer space last
+            BUFHIT= BUFHIT+ 1
             IF (RIND.EQ.FREPOS .OR. PREPOS(FREPOS).EQ.RIND) THEN
 C             pointers are ok
               IF (RIND.EQ.FREPOS) THEN
@@ -126,7 +147,7 @@ C             now back pointers
         END IF
       END IF
 C
-      IF (RIND .LT. 1 .OR. RIND .GT. CONREC) THEN
+      IF (RIND .LT. 1 .OR. RIND .GT. NBUFF) THEN
 C       we have got a bad problem
         BADCNT = BADCNT + 1
         IF (BADCNT.LT.50) THEN
@@ -352,9 +373,10 @@ C
 C     + + + END SPECIFICATIONS + + +
 C
 C     mark records in buffer as not usable
-      DO 30 I= 1,CONREC
+      DO 30 I= 1,NBUFF
         IF (WDMFUN(I).EQ.WDMSFL) THEN
 C         unusable
+          CALL WDBFUL(I)
           WDMFUN(I)= 0
           RECNO(I) = 0
         END IF
@@ -390,6 +412,7 @@ C     + + + END SPECIFICATIONS + + +
 C
       RREC= RECNO(RIND)
       WRITE (WDMSFL,REC=RREC,ERR=10,IOSTAT=IOS) (WIBUFF(I,RIND),I=1,512)
+      BUFWR= BUFWR+ 1
       GO TO 20
  10   CONTINUE
 C       big problem writing to wdm file
@@ -996,24 +1019,28 @@ C
 C     + + + LOCAL VARIABLES + + +
       INTEGER   I
 C
+C     + + + EXTERNALS + + +
+      EXTERNAL  WDBFRS
+C
 C     + + + END SPECIFICATIONS + + +
 C
-C     initialize  common CFBUFF variables as required
-      DO 10 I= 1, CONREC
-        NXTPOS(I)= I+ 1
-        PREPOS(I)= I- 1
-        RECNO(I) = 0
-        WDMFUN(I)= 0
- 10   CONTINUE
+C     initialize  common CFBUFF variables as required, keeping
+C     a number of buffer records set by WDBSIZ before the first open
+      IF (NBUFF.LT.DEFREC .OR. NBUFF.GT.CONREC) THEN
+        NBUFF= DEFREC
+      END IF
+      CALL WDBFRS
 C
-      NXTPOS(CONREC)= 1
-      PREPOS(1)= CONREC
-      FREPOS= 1
       WDMCNT= 0
       DO 20 I= 1,MXWDM
         WDMOPN(I)= 0
         MAXREC(I)= 0
  20   CONTINUE
+C
+      BUFHIT= 0
+      BUFMIS= 0
+      BUFRD = 0
+      BUFWR = 0
 C
 C     initialize  CDRLOC
       PFNAME= 9
@@ -1026,6 +1053,297 @@ C
       END
 C
 C
+C
+      SUBROUTINE   WDBFRS
+C
+C     + + + PURPOSE + + +
+C     Empty the WDM buffer of records and link the first NBUFF
+C     buffer spaces into the least recently used list.
+C
+C     + + + COMMON BLOCKS + + +
+      INCLUDE 'CFBUFF.INC'
+C
+C     + + + LOCAL VARIABLES + + +
+      INTEGER   I
+C
+C     + + + END SPECIFICATIONS + + +
+C
+      DO 10 I= 1, NBUFF
+        NXTPOS(I)= I+ 1
+        PREPOS(I)= I- 1
+        RECNO(I) = 0
+        WDMFUN(I)= 0
+        HSHNXT(I)= 0
+ 10   CONTINUE
+C
+      NXTPOS(NBUFF)= 1
+      PREPOS(1)= NBUFF
+      FREPOS= 1
+C
+      DO 20 I= 1, HSHSIZ
+        HSHHD(I)= 0
+ 20   CONTINUE
+C
+      RETURN
+      END
+C
+C
+C
+      INTEGER   FUNCTION   WDBHSH
+     I                           (WDMSFL,RREC)
+C
+C     + + + PURPOSE + + +
+C     Return the hash table entry for a record of a WDM file.
+C
+C     + + + DUMMY ARGUMENTS + + +
+      INTEGER   WDMSFL,RREC
+C
+C     + + + ARGUMENT DEFINITIONS + + +
+C     WDMSFL - Fortran unit number of WDM file
+C     RREC   - record number
+C
+C     + + + COMMON BLOCKS + + +
+      INCLUDE 'CFBUFF.INC'
+C
+C     + + + INTRINSICS + + +
+      INTRINSIC   MOD
+C
+C     + + + END SPECIFICATIONS + + +
+C
+C     consecutive records of a file go to consecutive entries
+      WDBHSH= MOD(RREC+ 4099*WDMSFL, HSHSIZ)+ 1
+C
+      RETURN
+      END
+C
+C
+C
+      INTEGER   FUNCTION   WDBFND
+     I                           (WDMSFL,RREC)
+C
+C     + + + PURPOSE + + +
+C     Return the index of a record of a WDM file in the WDM buffer
+C     of records, or 0 if the record is not in the buffer.
+C
+C     + + + DUMMY ARGUMENTS + + +
+      INTEGER   WDMSFL,RREC
+C
+C     + + + ARGUMENT DEFINITIONS + + +
+C     WDMSFL - Fortran unit number of WDM file
+C     RREC   - record number
+C
+C     + + + COMMON BLOCKS + + +
+      INCLUDE 'CFBUFF.INC'
+C
+C     + + + LOCAL VARIABLES + + +
+      INTEGER   IND
+C
+C     + + + FUNCTIONS + + +
+      INTEGER   WDBHSH
+C
+C     + + + EXTERNALS + + +
+      EXTERNAL  WDBHSH
+C
+C     + + + END SPECIFICATIONS + + +
+C
+      WDBFND= 0
+      IND= HSHHD(WDBHSH(WDMSFL,RREC))
+ 10   CONTINUE
+      IF (IND.GT.0) THEN
+        IF (RECNO(IND).EQ.RREC .AND. WDMFUN(IND).EQ.WDMSFL) THEN
+C         its already in memory
+          WDBFND= IND
+        ELSE
+          IND= HSHNXT(IND)
+          GO TO 10
+        END IF
+      END IF
+C
+      RETURN
+      END
+C
+C
+C
+      SUBROUTINE   WDBFLK
+     I                   (RIND)
+C
+C     + + + PURPOSE + + +
+C     Add buffer space RIND to the hash table under its file and
+C     record number.
+C
+C     + + + DUMMY ARGUMENTS + + +
+      INTEGER   RIND
+C
+C     + + + ARGUMENT DEFINITIONS + + +
+C     RIND   - buffer index number of record
+C
+C     + + + COMMON BLOCKS + + +
+      INCLUDE 'CFBUFF.INC'
+C
+C     + + + LOCAL VARIABLES + + +
+      INTEGER   HIND
+C
+C     + + + FUNCTIONS + + +
+      INTEGER   WDBHSH
+C
+C     + + + EXTERNALS + + +
+      EXTERNAL  WDBHSH
+C
+C     + + + END SPECIFICATIONS + + +
+C
+      HIND= WDBHSH(WDMFUN(RIND),RECNO(RIND))
+      HSHNXT(RIND)= HSHHD(HIND)
+      HSHHD(HIND) = RIND
+C
+      RETURN
+      END
+C
+C
+C
+      SUBROUTINE   WDBFUL
+     I                   (RIND)
+C
+C     + + + PURPOSE + + +
+C     Remove buffer space RIND from the hash table.
+C
+C     + + + DUMMY ARGUMENTS + + +
+      INTEGER   RIND
+C
+C     + + + ARGUMENT DEFINITIONS + + +
+C     RIND   - buffer index number of record
+C
+C     + + + COMMON BLOCKS + + +
+      INCLUDE 'CFBUFF.INC'
+C
+C     + + + LOCAL VARIABLES + + +
+      INTEGER   HIND,IND
+C
+C     + + + FUNCTIONS + + +
+      INTEGER   WDBHSH
+C
+C     + + + EXTERNALS + + +
+      EXTERNAL  WDBHSH
+C
+C     + + + END SPECIFICATIONS + + +
+C
+      HIND= WDBHSH(WDMFUN(RIND),RECNO(RIND))
+      IF (HSHHD(HIND).EQ.RIND) THEN
+        HSHHD(HIND)= HSHNXT(RIND)
+      ELSE
+        IND= HSHHD(HIND)
+ 10     CONTINUE
+        IF (IND.GT.0) THEN
+          IF (HSHNXT(IND).EQ.RIND) THEN
+            HSHNXT(IND)= HSHNXT(RIND)
+          ELSE
+            IND= HSHNXT(IND)
+            GO TO 10
+          END IF
+        END IF
+      END IF
+      HSHNXT(RIND)= 0
+C
+      RETURN
+      END
+C
+C
+C
+      SUBROUTINE   WDBSIZ
+     I                   (NREC,
+     O                    RETCOD)
+Cf2py intent(in) NREC
+Cf2py intent(out) RETCOD
+C
+C     + + + PURPOSE + + +
+C     Set the number of records kept in the WDM buffer of records.
+C     The buffer is emptied, records are read again as needed.  The
+C     routines keep several records in the buffer at once, so the
+C     buffer cannot be smaller than the original DEFREC records.
+C
+C     + + + DUMMY ARGUMENTS + + +
+      INTEGER   NREC,RETCOD
+C
+C     + + + ARGUMENT DEFINITIONS + + +
+C     NREC   - number of records in the buffer, DEFREC to CONREC
+C     RETCOD - return code
+C                0 - buffer size set
+C              -90 - number of records out of range
+C
+C     + + + COMMON BLOCKS + + +
+      INCLUDE 'CFBUFF.INC'
+C
+C     + + + EXTERNALS + + +
+      EXTERNAL  WDBFRS
+C
+C     + + + END SPECIFICATIONS + + +
+C
+      IF (NREC.LT.DEFREC .OR. NREC.GT.CONREC) THEN
+        RETCOD= -90
+      ELSE
+        RETCOD= 0
+        NBUFF = NREC
+        CALL WDBFRS
+      END IF
+C
+      RETURN
+      END
+C
+C
+C
+      SUBROUTINE   WDBSTA
+     I                   (RSTFG,
+     O                    NREC,MXREC,HITCNT,MISCNT,RDCNT,WRCNT)
+Cf2py intent(in) RSTFG
+Cf2py intent(out) NREC
+Cf2py intent(out) MXREC
+Cf2py intent(out) HITCNT
+Cf2py intent(out) MISCNT
+Cf2py intent(out) RDCNT
+Cf2py intent(out) WRCNT
+C
+C     + + + PURPOSE + + +
+C     Return the size of and the counters of the WDM buffer of
+C     records.
+C
+C     + + + DUMMY ARGUMENTS + + +
+      INTEGER     RSTFG,NREC,MXREC
+      INTEGER(8)  HITCNT,MISCNT,RDCNT,WRCNT
+C
+C     + + + ARGUMENT DEFINITIONS + + +
+C     RSTFG  - reset flag, 1 - set the counters to 0 after returning them
+C     NREC   - number of records in the buffer
+C     MXREC  - maximum number of records in the buffer
+C     HITCNT - number of records found in the buffer
+C     MISCNT - number of records not found in the buffer
+C     RDCNT  - number of records read from WDM files
+C     WRCNT  - number of records written to WDM files
+C
+C     + + + COMMON BLOCKS + + +
+      INCLUDE 'CFBUFF.INC'
+C
+C     + + + END SPECIFICATIONS + + +
+C
+      NREC= NBUFF
+      IF (NREC.LT.DEFREC .OR. NREC.GT.CONREC) THEN
+C       buffer not initialized yet
+        NREC= DEFREC
+      END IF
+      MXREC = CONREC
+      HITCNT= BUFHIT
+      MISCNT= BUFMIS
+      RDCNT = BUFRD
+      WRCNT = BUFWR
+      IF (RSTFG.EQ.1) THEN
+        BUFHIT= 0
+        BUFMIS= 0
+        BUFRD = 0
+        BUFWR = 0
+      END IF
+C
+      RETURN
+      END
+C
+C
 C
       SUBROUTINE   WDCREA
      I                    (WDMSFL)
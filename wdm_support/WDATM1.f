@@ -633,7 +633,7 @@ C     determine where data set starts
       IF (RETCOD .EQ. 0) THEN
 C       bring label into memory
         RIND= WDRCGO(WDMSFL,TDSFRC)
-        IF ((RIND .LE. 0) .OR. (RIND .GT. 512)) THEN
+        IF ((RIND .LE. 0) .OR. (RIND .GT. NBUFF)) THEN
 C         invalid record
           WRITE (99,*) 'BAD RIND:  WDMSFL,DSN,TDSFRC,RIND',WDMSFL,DSN,
      $                  TDSFRC,RIND